@@ -17,6 +17,9 @@ The main functions are:
 
 * `open()`, which opens the given file for reading/writing
 * `s3_iter_bucket()`, which goes over all keys in an S3 bucket in parallel
+* `gcs_iter_bucket()`, which goes over all blobs in a GCS bucket in parallel
+* `split()`, which splits a single object into line-aligned byte ranges
+* `map_lines()`, which applies a function to the lines of a single object in parallel
 * `register_compressor()`, which registers callbacks for transparent compressor handling
 
 """
@@ -26,7 +29,11 @@ from smart_open import version
 
 from .smart_open_lib import open, smart_open, register_compressor
 from .s3 import iter_bucket as s3_iter_bucket
-__all__ = ['open', 'smart_open', 's3_iter_bucket', 'register_compressor']
+from .gcs import iter_bucket as gcs_iter_bucket
+from .splits import split, map_lines
+__all__ = [
+    'open', 'smart_open', 's3_iter_bucket', 'gcs_iter_bucket', 'register_compressor', 'split', 'map_lines',
+]
 
 
 __version__ = version.__version__
@@ -8,6 +8,16 @@
 """Implements ByteBuffer class for amortizing network transfer overhead."""
 
 import io
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHUNK_SIZE = 8 * 1024**2
+"""The largest chunk size ChunkSizeTuner will grow a buffer to by default."""
+
+DEFAULT_TARGET_SECONDS = 0.1
+"""How long ChunkSizeTuner would like a single fill to take, by default."""
 
 
 class ByteBuffer(object):
@@ -70,6 +80,15 @@ class ByteBuffer(object):
         """Return the number of unread bytes in the buffer as an int"""
         return len(self._bytes) - self._pos
 
+    @property
+    def chunk_size(self):
+        """The number of bytes the buffer tries to read when filled."""
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, value):
+        self._chunk_size = value
+
     def read(self, size=-1):
         """Read bytes from the buffer and advance the read position. Returns
         the bytes in a bytestring.
@@ -151,11 +170,17 @@ class ByteBuffer(object):
         if hasattr(source, 'read'):
             new_bytes = source.read(size)
         else:
-            new_bytes = b''
+            #
+            # Join the parts once at the end, instead of copying the bytes
+            # read so far with each new part.
+            #
+            parts, num_bytes = [], 0
             for more_bytes in source:
-                new_bytes += more_bytes
-                if len(new_bytes) >= size:
+                parts.append(more_bytes)
+                num_bytes += len(more_bytes)
+                if num_bytes >= size:
                     break
+            new_bytes = b''.join(parts)
 
         self._bytes += new_bytes
         return len(new_bytes)
@@ -172,9 +197,98 @@ class ByteBuffer(object):
         :rtype: bytes
 
         """
-        index = self._bytes.find(terminator, self._pos)
+        index = self.find(terminator)
         if index == -1:
             size = len(self)
         else:
-            size = index - self._pos + 1
+            size = index + len(terminator)
         return self.read(size)
+
+    def find(self, sub):
+        """Find a byte sequence among the unread bytes, without copying them.
+
+        :param bytes sub: The byte sequence to look for.
+        :returns: The offset of sub relative to the read position, or -1.
+        :rtype: int
+
+        """
+        index = self._bytes.find(sub, self._pos)
+        return index if index == -1 else index - self._pos
+
+
+class ChunkSizeTuner(object):
+    """Adapts the chunk size of a ByteBuffer to the observed throughput.
+
+    While the reader keeps reading sequentially, the chunk size grows
+    geometrically until a single fill takes about target_seconds, i.e. the
+    chunk size matches the bandwidth-delay product of the link, or until it
+    reaches max_size.  If fills become slow, the chunk size shrinks again.
+    When the reader seeks, it calls reset() to go back to the initial chunk
+    size, because random access benefits from small reads.
+
+    The first fill after a reset is not used for tuning, because it usually
+    includes the cost of setting up a new request.
+
+    Parameters
+    ----------
+    buffer: ByteBuffer
+        The buffer to tune.
+    max_size: int, optional
+        The maximum chunk size.  If this is not larger than the buffer's
+        initial chunk size, the chunk size never changes.
+    target_seconds: float, optional
+        How long a single fill should take.
+    clock: callable, optional
+        Returns the current time in seconds.
+    """
+
+    def __init__(
+            self,
+            buffer,
+            max_size=DEFAULT_MAX_CHUNK_SIZE,
+            target_seconds=DEFAULT_TARGET_SECONDS,
+            clock=time.time,
+            ):
+        self._buffer = buffer
+        self._min_size = buffer.chunk_size
+        self._max_size = max(max_size, self._min_size)
+        self._target_seconds = target_seconds
+        self._clock = clock
+        self._warm = False
+
+    def fill(self, source):
+        """Fill the buffer from source, and adjust the chunk size.
+
+        Returns the number of new bytes added to the buffer."""
+        if self._max_size == self._min_size:
+            return self._buffer.fill(source)
+
+        chunk_size = self._buffer.chunk_size
+        start = self._clock()
+        bytes_read = self._buffer.fill(source)
+        elapsed = self._clock() - start
+
+        #
+        # A short fill means we've hit the end of the stream, so it tells us
+        # nothing about the link.
+        #
+        if self._warm and bytes_read >= chunk_size:
+            if elapsed < self._target_seconds:
+                new_size = min(chunk_size * 2, self._max_size)
+            elif elapsed > self._target_seconds * 2:
+                new_size = max(chunk_size // 2, self._min_size)
+            else:
+                new_size = chunk_size
+            if new_size != chunk_size:
+                logger.debug(
+                    'read %d bytes in %.3fs, changing chunk size to %d',
+                    bytes_read, elapsed, new_size,
+                )
+                self._buffer.chunk_size = new_size
+        self._warm = True
+        return bytes_read
+
+    def reset(self):
+        """Go back to the initial chunk size, e.g. after seeking."""
+        self._buffer.chunk_size = self._min_size
+        self._warm = False
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Radim Rehurek <me@radimrehurek.com>
+#
+# This code is distributed under the terms and conditions
+# from the MIT License (MIT).
+#
+"""Computes checksums incrementally, for verifying the integrity of transfers.
+
+For CRC32C, we use the fastest implementation available, in this order:
+
+- `google_crc32c`, if it has its C extension (which uses the CRC32 instructions of the CPU)
+- `crc32c`, which also uses the CRC32 instructions of the CPU, where available
+- pure Python, which is very slow
+
+"""
+
+import base64
+import hashlib
+import logging
+import struct
+
+import six
+
+logger = logging.getLogger(__name__)
+
+CRC32C = 'crc32c'
+MD5 = 'md5'
+
+_CRC32C_POLYNOMIAL = 0x82F63B78
+"""The reversed Castagnoli polynomial."""
+
+_MASK = 0xFFFFFFFF
+
+
+def _make_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ _CRC32C_POLYNOMIAL
+            else:
+                crc >>= 1
+        table.append(crc)
+    return table
+
+
+def _python_extend(crc, data):
+    table = _TABLE
+    crc ^= _MASK
+    for byte in bytearray(data):
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ _MASK
+
+
+def _to_bytes(data):
+    if isinstance(data, six.binary_type):
+        return data
+    return memoryview(data).tobytes()
+
+
+#
+# CRC32C_IMPLEMENTATION is the name of the CRC32C implementation in use.
+#
+_TABLE = None
+try:
+    import google_crc32c
+except ImportError:
+    google_crc32c = None
+
+if google_crc32c is not None and google_crc32c.implementation == 'c':
+    CRC32C_IMPLEMENTATION = 'google_crc32c'
+
+    def _extend(crc, data):
+        return google_crc32c.extend(crc, _to_bytes(data))
+else:
+    try:
+        import crc32c as _crc32c
+    except ImportError:
+        _crc32c = None
+
+    if _crc32c is not None:
+        CRC32C_IMPLEMENTATION = 'crc32c'
+
+        def _extend(crc, data):
+            return _crc32c.crc32c(_to_bytes(data), crc)
+    else:
+        CRC32C_IMPLEMENTATION = 'python'
+        _TABLE = _make_table()
+        _extend = _python_extend
+
+FAST_CRC32C = CRC32C_IMPLEMENTATION != 'python'
+"""True if computing CRC32C checksums is cheap."""
+
+
+class ChecksumError(IOError):
+    """Raised when the checksum of the transferred data does not match the expected one."""
+    pass
+
+
+class Crc32c(object):
+    """Computes the CRC32C checksum of data, using the same interface as hashlib."""
+
+    name = CRC32C
+    implementation = CRC32C_IMPLEMENTATION
+
+    def __init__(self, data=b''):
+        self._crc = 0
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        self._crc = _extend(self._crc, data)
+
+    def digest(self):
+        """Return the checksum as 4 big-endian bytes, the way GCS expects it."""
+        return struct.pack('>I', self._crc)
+
+    def hexdigest(self):
+        return '%08x' % self._crc
+
+
+def new(algorithm):
+    """Create a new hasher for the specified algorithm.
+
+    Parameters
+    ----------
+    algorithm: str
+        Either CRC32C or MD5.
+
+    """
+    if algorithm == CRC32C:
+        return Crc32c()
+    elif algorithm == MD5:
+        return hashlib.md5()
+    raise ValueError('unsupported checksum algorithm: %r' % algorithm)
+
+
+def describe(hasher):
+    """Return a human-readable description of the algorithm and implementation of the hasher."""
+    if hasher is None:
+        return None
+    return '%s (%s)' % (hasher.name, getattr(hasher, 'implementation', 'hashlib'))
+
+
+def b64encode(digest):
+    """Encode the digest the way HTTP headers (e.g. Content-MD5, x-goog-hash) expect it."""
+    return base64.b64encode(digest).decode('ascii')
+
+
+class Verifier(object):
+    """Checksums a stream as it gets read, and verifies the checksum at the end.
+
+    The reader reports the bytes it reads, and their position, via update.
+    Only contiguous reads from the start of the stream contribute to the
+    checksum: after seeking around, we can only verify the checksum if the
+    caller eventually reads the entire stream in order.
+
+    Parameters
+    ----------
+    size: int
+        The size of the stream in bytes.
+    name: str
+        The name of the stream, for error messages.
+
+    """
+    def __init__(self, size, name):
+        self._size = size
+        self._name = name
+        self._hasher = None
+        self._expected = None
+        self._position = 0
+        self._done = False
+
+    @property
+    def algorithm(self):
+        """A description of the checksum being computed, or None."""
+        return describe(self._hasher)
+
+    def expect(self, algorithm, digest):
+        """Set the expected checksum of the stream, if not already set.
+
+        Parameters
+        ----------
+        algorithm: str
+            The algorithm of the checksum, e.g. MD5.
+        digest: bytes
+            The expected digest of the stream.
+
+        """
+        if self._hasher is None:
+            self._hasher = new(algorithm)
+            self._expected = digest
+
+    def update(self, position, data):
+        """Report data read from the specified position of the stream."""
+        if self._hasher is None or self._done:
+            return
+        if position <= self._position < position + len(data):
+            chunk = data if position == self._position else memoryview(data)[self._position - position:]
+            self._hasher.update(chunk)
+            self._position = position + len(data)
+
+    def verify(self):
+        """Compare the checksum of the stream with the expected one.
+
+        Does nothing if we have not seen the entire stream, or have
+        already verified it.
+
+        Returns
+        -------
+        bool
+            True if the checksum got verified.
+
+        Raises
+        ------
+        ChecksumError
+            If the checksum does not match.
+
+        """
+        if self._hasher is None or self._done:
+            return False
+        if self._position != self._size:
+            logger.debug('%s: did not read the entire stream, not verifying its checksum', self._name)
+            return False
+
+        self._done = True
+        actual = self._hasher.digest()
+        if actual != self._expected:
+            raise ChecksumError(
+                '%s: %s checksum mismatch, expected %s, got %s' % (
+                    self._name, self._hasher.name, b64encode(self._expected), b64encode(actual),
+                )
+            )
+        logger.debug('%s: %s checksum verified', self._name, self._hasher.name)
+        return True
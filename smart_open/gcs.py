@@ -7,20 +7,46 @@
 #
 """Implements file-like objects for reading and writing to/from GCS."""
 
+import base64
+import collections
+import functools
 import io
+import json
 import logging
+import os
 import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
 
 import google.cloud.exceptions
 import google.cloud.storage
 import google.auth.transport.requests as google_requests
+import requests
 import six
+from six.moves.urllib import parse as urlparse
+import urllib3
 
 import smart_open.bytebuffer
+import smart_open.checksums
+import smart_open.http
 import smart_open.s3
 
 logger = logging.getLogger(__name__)
 
+#
+# Python 2 may not have concurrent.futures, in which case composite uploads
+# upload their components one at a time.
+#
+_CONCURRENT_FUTURES = False
+try:
+    import concurrent.futures
+    _CONCURRENT_FUTURES = True
+except ImportError:
+    pass
+
 _READ_BINARY = 'rb'
 _WRITE_BINARY = 'wb'
 
@@ -49,6 +75,15 @@ _DEFAULT_MIN_PART_SIZE = 50 * 1024**2
 DEFAULT_BUFFER_SIZE = 256 * 1024
 """Default buffer size for working with GCS"""
 
+DEFAULT_COMPONENT_SIZE = 32 * 1024**2
+"""Default size of each component of a composite upload"""
+
+DEFAULT_COMPOSITE_WORKERS = 8
+"""Default number of components to upload concurrently in a composite upload"""
+
+_MAX_COMPOSE_SOURCES = 32
+"""The maximum number of source objects a single compose request accepts."""
+
 START = 0
 """Seek to the absolute start of a GCS file"""
 
@@ -62,6 +97,38 @@ _WHENCE_CHOICES = (START, CURRENT, END)
 
 _UPLOAD_INCOMPLETE_STATUS_CODE = 308
 _UPLOAD_COMPLETE_STATUS_CODES = (200, 201)
+_UPLOAD_RETRY_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+_UPLOAD_EXPIRED_STATUS_CODES = (404, 410)
+_UPLOAD_ATTEMPTS = 6
+_SLEEP_SECONDS = 1
+_DOWNLOAD_STATUS_CODES = (200, 206)
+_PARTIAL_CONTENT_STATUS_CODE = 206
+_DECODE_CHUNK_SIZE = 64 * 1024
+
+_DEFAULT_API_BASE_URL = 'https://storage.googleapis.com'
+
+_DOWNLOAD_URL_TEMPLATE = '%(base)s/download/storage/v1/b/%(bucket)s/o/%(blob)s?alt=media'
+"""The JSON API endpoint for downloading the contents of a blob."""
+
+
+def _api_base_url(client):
+    """Return the endpoint the client talks to, e.g. an emulator set via STORAGE_EMULATOR_HOST."""
+    connection = getattr(client, '_connection', None)
+    return getattr(connection, 'API_BASE_URL', None) or _DEFAULT_API_BASE_URL
+
+
+def _make_download_url(bucket_id, blob_id, generation=None, api_base_url=_DEFAULT_API_BASE_URL,
+                       user_project=None):
+    url = _DOWNLOAD_URL_TEMPLATE % dict(
+        base=api_base_url.rstrip('/'),
+        bucket=urlparse.quote(bucket_id, safe=''),
+        blob=urlparse.quote(blob_id, safe=''),
+    )
+    if generation is not None:
+        url += '&generation=%d' % generation
+    if user_project is not None:
+        url += '&userProject=%s' % urlparse.quote(user_project, safe='')
+    return url
 
 
 def _make_range_string(start, stop=None, end=_UNKNOWN_FILE_SIZE):
@@ -109,8 +176,19 @@ def open(
         blob_id,
         mode,
         buffer_size=DEFAULT_BUFFER_SIZE,
+        max_buffer_size=smart_open.bytebuffer.DEFAULT_MAX_CHUNK_SIZE,
         min_part_size=_MIN_MIN_PART_SIZE,
         client=None,  # type: google.cloud.storage.Client
+        range=None,
+        blob_size=None,
+        generation=None,
+        composite_upload=False,
+        component_size=DEFAULT_COMPONENT_SIZE,
+        composite_workers=DEFAULT_COMPOSITE_WORKERS,
+        checkpoint=None,
+        verify_checksum=False,
+        user_project=None,
+        max_skip_size=smart_open.s3.DEFAULT_MAX_SKIP_SIZE,
         ):
     """Open an GCS blob for reading or writing.
 
@@ -124,10 +202,57 @@ def open(
         The mode for opening the object.  Must be either "rb" or "wb".
     buffer_size: int, optional
         The buffer size to use when performing I/O. For reading only.
+    max_buffer_size: int, optional
+        While reading sequentially, the buffer grows from buffer_size up to
+        this size, depending on the observed throughput.  It shrinks back to
+        buffer_size after seeking.  Set to buffer_size to disable.
+        For reading only.
     min_part_size: int, optional
-        The minimum part size for multipart uploads.  For writing only.
+        The minimum part size for multipart uploads.  Blobs no larger than
+        this get uploaded in a single request on close.  For writing only.
     client: google.cloud.storage.Client, optional
         The GCS client to use when working with google-cloud-storage.
+    range: tuple, optional
+        A (start, stop) pair of byte offsets.  If set, the reader only sees
+        the bytes of the blob in the range [start, stop): positions are
+        relative to start, and the reader never requests bytes outside the range.
+        Set stop to None to read until the end of the blob.
+        For reading only.
+    blob_size: int, optional
+        The size of the blob in bytes, if already known (e.g. from listing the
+        bucket).  Saves a request when opening the blob.  For reading only.
+    generation: int, optional
+        The generation of the blob to read.  If None, reads the latest
+        generation, and pins subsequent requests to it.  For reading only.
+    composite_upload: bool, optional
+        If True, upload the output as separate component objects in parallel,
+        and compose them into the blob on close.  The components get deleted
+        afterwards.  For writing only.
+    component_size: int, optional
+        The size of each component of a composite upload.  For writing only.
+    composite_workers: int, optional
+        How many components of a composite upload to upload concurrently.
+        For writing only.
+    checkpoint: str, optional
+        The path to a local file for keeping track of the resumable upload
+        session.  If the file exists, continue the upload it describes: the
+        writer's tell() returns how many bytes GCS has already committed, and
+        the caller should write the rest of the data from that offset.
+        For writing only.
+    verify_checksum: bool, optional
+        If True, checksum the data as it passes through, without reading it
+        again.  When reading, compare the checksum against the one GCS
+        reports, at the end of the blob.  When writing, send the checksum to
+        GCS, which refuses the upload if it does not match.  Uses CRC32C
+        if a fast implementation is available, otherwise MD5.
+        Not supported for composite uploads.
+    user_project: str, optional
+        The project to bill for reading from a requester-pays bucket.
+        For reading only.
+    max_skip_size: int, optional
+        When seeking forward by at most this many bytes, read and discard
+        them from the open stream instead of making a new request.
+        Set to 0 to always make a new request.  For reading only.
 
     """
     if mode == _READ_BINARY:
@@ -137,60 +262,258 @@ def open(
             buffer_size=buffer_size,
             line_terminator=_BINARY_NEWLINE,
             client=client,
+            byte_range=range,
+            max_buffer_size=max_buffer_size,
+            blob_size=blob_size,
+            generation=generation,
+            verify_checksum=verify_checksum,
+            user_project=user_project,
+            max_skip_size=max_skip_size,
         )
     elif mode == _WRITE_BINARY:
+        if range is not None:
+            raise ValueError("range must be None when writing")
+        if composite_upload:
+            if checkpoint is not None:
+                raise ValueError("checkpoint is not supported for composite uploads")
+            if verify_checksum:
+                raise ValueError("verify_checksum is not supported for composite uploads")
+            return CompositeWriter(
+                bucket_id,
+                blob_id,
+                component_size=component_size,
+                workers=composite_workers,
+                client=client,
+            )
         return BufferedOutputBase(
             bucket_id,
             blob_id,
             min_part_size=min_part_size,
             client=client,
+            checkpoint=checkpoint,
+            verify_checksum=verify_checksum,
         )
     else:
         raise NotImplementedError('GCS support for mode %r not implemented' % mode)
 
 
+def _download(session, url, headers):
+    """Start a streaming download, and return the response.
+
+    We always ask for the blob as it is stored.  Otherwise, GCS decompresses
+    blobs stored with Content-Encoding: gzip on the fly, and ignores the
+    Range header when doing so.
+    """
+    headers = dict(headers, **{'Accept-Encoding': 'gzip'})
+    logger.debug('requesting %r headers: %r', url, headers)
+    response = session.get(url, headers=headers, stream=True)
+    if response.status_code not in _DOWNLOAD_STATUS_CODES:
+        raise google.cloud.exceptions.from_http_response(response)
+    if 'Range' in headers and response.status_code != _PARTIAL_CONTENT_STATUS_CODE:
+        #
+        # The response starts at the beginning of the blob, not where we
+        # asked it to, so using it would give the caller the wrong bytes.
+        #
+        response.close()
+        raise IOError('%r ignored our Range header (status %d)' % (url, response.status_code))
+    return response
+
+
+def _parse_blob_size(response):
+    """Return the size of the entire blob, given a response to a download request."""
+    content_range = response.headers.get('Content-Range')
+    if content_range:
+        #
+        # e.g. bytes 0-99/1234
+        #
+        return int(content_range.split('/')[-1])
+    return int(response.headers['Content-Length'])
+
+
+def _parse_hashes(headers):
+    """Return the checksums of a blob, given the headers of a response to a download request.
+
+    Returns
+    -------
+    dict
+        Maps algorithm names (e.g. "md5") to binary digests.
+
+    """
+    #
+    # e.g. x-goog-hash: crc32c=n03x6A==,md5=Ojk9c3dhfxgoKVVHYwFbHQ==
+    # Composite objects don't have an MD5 hash.
+    #
+    hashes = {}
+    for item in headers.get('x-goog-hash', '').split(','):
+        algorithm, _, value = item.strip().partition('=')
+        if value:
+            hashes[algorithm] = base64.b64decode(value)
+    return hashes
+
+
+def _expect_checksum(verifier, headers):
+    """Tell the verifier what checksum to expect, given the headers of a download response."""
+    hashes = _parse_hashes(headers)
+    crc32c, md5 = smart_open.checksums.CRC32C, smart_open.checksums.MD5
+    #
+    # Prefer CRC32C if we can compute it quickly, because it's cheaper than
+    # MD5 then, and because composite objects don't have an MD5 hash.
+    #
+    if crc32c in hashes and (smart_open.checksums.FAST_CRC32C or md5 not in hashes):
+        verifier.expect(crc32c, hashes[crc32c])
+    elif md5 in hashes:
+        verifier.expect(md5, hashes[md5])
+
+
 class _SeekableRawReader(object):
-    """Read an GCS object."""
+    """Read an GCS object.
+
+    Streams the object over a single ranged HTTP response, and only makes a
+    new request after seeking, or if the connection gets dropped.
 
-    def __init__(self, gcs_blob, size):
-        # type: (google.cloud.storage.Blob, int) -> None
-        self._blob = gcs_blob
+    The reader sees size bytes of the blob, starting at offset.  If body is
+    set, it's an already open stream that starts at offset.  If verifier is
+    set, the reader reports everything it reads to it."""
+
+    def __init__(self, session, url, size, offset=0, body=None, verifier=None,
+                 max_skip_size=smart_open.s3.DEFAULT_MAX_SKIP_SIZE):
+        # type: (google_requests.AuthorizedSession, str, int, int, object, object, int) -> None
+        self._session = session
+        self._max_skip_size = max_skip_size
+        self._url = url
         self._size = size
+        self._offset = offset
         self._position = 0
+        self._body = body
+        self._verifier = verifier
 
     def seek(self, position):
         """Seek to the specified position (byte offset) in the GCS key.
 
         :param int position: The byte offset from the beginning of the key.
 
+        If the stream of the current request is open, and position is at
+        most max_skip_size bytes ahead, read up to position instead of
+        making a new request.
+
         Returns the position after seeking.
         """
+        distance = position - self._position
+        if self._body is not None and 0 <= distance <= self._max_skip_size:
+            self._skip(distance)
+            return self._position
+
+        self.close()
         self._position = position
         return self._position
 
+    def _skip(self, size):
+        """Read and discard size bytes."""
+        while size > 0:
+            binary = self.read(min(size, DEFAULT_BUFFER_SIZE))
+            if not binary:
+                break
+            size -= len(binary)
+
+    def close(self):
+        """Release the underlying connection, if any."""
+        if self._body is not None:
+            self._body.close()
+        self._body = None
+
+    def _load_body(self):
+        """Open a streaming response that starts from the current position."""
+        if self._position == self._size:
+            #
+            # When reading, we can't seek to the first byte of an empty file.
+            # Similarly, we can't seek past the last byte.  Do nothing here.
+            #
+            self._body = io.BytesIO()
+            return
+
+        headers = {
+            'Range': smart_open.s3.make_range_string(
+                self._offset + self._position,
+                self._offset + self._size - 1,
+            ),
+        }
+        response = _download(self._session, self._url, headers)
+        content_encoding = smart_open.http._content_encoding(response)
+        if content_encoding is not None:
+            response.close()
+            raise IOError(
+                '%r is stored with Content-Encoding: %s, so it cannot be read by range; '
+                'open it without range or blob_size' % (self._url, content_encoding)
+            )
+        if self._verifier is not None:
+            _expect_checksum(self._verifier, response.headers)
+        self._body = response.raw
+
+    def _read_from_body(self, size=-1):
+        if size == -1:
+            return self._body.read()
+        return self._body.read(size)
+
     def read(self, size=-1):
         if self._position >= self._size:
+            if self._verifier is not None:
+                self._verifier.verify()
             return b''
-        binary = self._download_blob_chunk(size)
-        self._position += len(binary)
-        return binary
+        if self._body is None:
+            self._load_body()
 
-    def _download_blob_chunk(self, size):
-        start = position = self._position
-        if position == self._size:
+        try:
+            binary = self._read_from_body(size)
+        except urllib3.exceptions.HTTPError:
             #
-            # When reading, we can't seek to the first byte of an empty file.
-            # Similarly, we can't seek past the last byte.  Do nothing here.
+            # The connection got dropped.  Reconnect, and try again once.
             #
-            binary = b''
-        elif size == -1:
-            binary = self._blob.download_as_string(start=start)
-        else:
-            end = position + size
-            binary = self._blob.download_as_string(start=start, end=end)
+            logger.debug('lost connection at position %r, reconnecting', self._position)
+            self.close()
+            self._load_body()
+            binary = self._read_from_body(size)
+        if self._verifier is not None:
+            self._verifier.update(self._position, binary)
+        self._position += len(binary)
+        if self._verifier is not None and self._position >= self._size:
+            self._verifier.verify()
         return binary
 
 
+class _DecodingRawReader(object):
+    """Read a GCS object stored with Content-Encoding: gzip (e.g. via gsutil cp -z).
+
+    Decompresses the stored bytes as they arrive, the way google-cloud-storage
+    does when downloading such blobs.  We cannot know the size of the
+    decompressed blob in advance, and positions in it do not correspond to
+    positions in the stored blob, so this reader only reads sequentially."""
+
+    def __init__(self, body):
+        self._body = body
+        self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._eof = False
+
+    def close(self):
+        """Release the underlying connection, if any."""
+        if self._body is not None:
+            self._body.close()
+        self._body = None
+        self._eof = True
+
+    def read(self, size=-1):
+        parts, num_bytes = [], 0
+        while not self._eof and (size < 0 or num_bytes < size):
+            compressed = self._decoder.unconsumed_tail or self._body.read(_DECODE_CHUNK_SIZE)
+            if not compressed:
+                self._eof = True
+                part = self._decoder.flush()
+            else:
+                part = self._decoder.decompress(compressed, 0 if size < 0 else size - num_bytes)
+            parts.append(part)
+            num_bytes += len(part)
+        return b''.join(parts)
+
+
 class SeekableBufferedInputBase(io.BufferedIOBase):
     """Reads bytes from GCS.
 
@@ -198,6 +521,20 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
 
     :raises google.cloud.exceptions.NotFound: Raised when the blob to read from does not exist.
 
+    The reader does not fetch the metadata of the bucket or the blob.  Instead,
+    it learns the size and generation of the blob from the first download
+    response, which also becomes the stream we read from.  If the caller
+    already knows the size, opening the blob makes no requests at all.
+
+    If verify_checksum is True, the reader checksums the blob as it reads it,
+    and compares the result against the x-goog-hash that GCS reports.  It
+    raises smart_open.checksums.ChecksumError at the end of the blob if they
+    differ.  This works only if the reader sees the entire blob (no range),
+    and eventually reads all of it in order.
+
+    Blobs stored with Content-Encoding: gzip get decompressed as we read
+    them.  Such readers are not seekable, and do not support range.
+
     """
     def __init__(
             self,
@@ -206,20 +543,110 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
             buffer_size=DEFAULT_BUFFER_SIZE,
             line_terminator=_BINARY_NEWLINE,
             client=None,  # type: google.cloud.storage.Client
+            byte_range=None,
+            max_buffer_size=smart_open.bytebuffer.DEFAULT_MAX_CHUNK_SIZE,
+            blob_size=None,
+            generation=None,
+            verify_checksum=False,
+            user_project=None,
+            max_skip_size=smart_open.s3.DEFAULT_MAX_SKIP_SIZE,
     ):
         if client is None:
             client = google.cloud.storage.Client()
-        bucket = client.get_bucket(bucket)  # type: google.cloud.storage.Bucket
+        self._bucket_name = bucket
+        self._blob_name = key
+        self._session = google_requests.AuthorizedSession(client._credentials)  # noqa
+        make_url = functools.partial(
+            _make_download_url,
+            bucket,
+            key,
+            api_base_url=_api_base_url(client),
+            user_project=user_project,
+        )
 
-        self._blob = bucket.get_blob(key)
-        if self._blob is None:
-            raise google.cloud.exceptions.NotFound('blob {} not found in {}'.format(key, bucket))
-        self._size = self._blob.size if self._blob.size is not None else 0
+        if byte_range is None:
+            range_start, range_stop = 0, None
+        else:
+            range_start, range_stop = smart_open.s3.check_range(byte_range)
+
+        body = None
+        headers = {}
+        content_encoding = None
+        if blob_size is None:
+            headers = {}
+            if (range_start, range_stop) != (0, None):
+                headers['Range'] = smart_open.s3.make_range_string(
+                    range_start,
+                    None if range_stop is None else range_stop - 1,
+                )
+            url = make_url(generation)
+            try:
+                response = _download(self._session, url, headers)
+            except google.cloud.exceptions.RequestRangeNotSatisfiable:
+                #
+                # The range starts at or past the end of the blob, so there
+                # is nothing for us to read.
+                #
+                blob_size = range_start
+            else:
+                blob_size = _parse_blob_size(response)
+                body = response.raw
+                headers = response.headers
+                content_encoding = smart_open.http._content_encoding(response)
+                if content_encoding is not None and (range_start, range_stop) != (0, None):
+                    response.close()
+                    raise IOError(
+                        'gs://%s/%s is stored with Content-Encoding: %s, '
+                        'so it cannot be read by range' % (bucket, key, content_encoding)
+                    )
+
+                #
+                # Pin the generation we've just seen, so that we never mix the
+                # contents of different generations, even if the blob gets overwritten.
+                #
+                if generation is None and 'x-goog-generation' in response.headers:
+                    generation = int(response.headers['x-goog-generation'])
 
-        self._raw_reader = _SeekableRawReader(self._blob, self._size)
+        #
+        # Confine ourselves to the requested range, if any.
+        #
+        range_start = min(range_start, blob_size)
+        self._size = blob_size if range_stop is None else min(range_stop, blob_size)
+        self._size -= range_start
+        self._generation = generation
+
+        #
+        # We can only verify the checksum if we see the entire blob.
+        #
+        self._verifier = None
+        if content_encoding is not None:
+            #
+            # GCS checksums the stored (compressed) bytes, but we only see
+            # the decompressed ones.
+            #
+            if verify_checksum:
+                logger.info('cannot verify the checksum of compressed gs://%s/%s', bucket, key)
+        elif verify_checksum and range_start == 0 and self._size == blob_size:
+            self._verifier = smart_open.checksums.Verifier(self._size, 'gs://%s/%s' % (bucket, key))
+            _expect_checksum(self._verifier, headers)
+
+        if content_encoding is not None:
+            if content_encoding != 'gzip':
+                body.close()
+                raise IOError(
+                    'unsupported Content-Encoding for gs://%s/%s: %r' % (bucket, key, content_encoding)
+                )
+            self._size = None
+            self._raw_reader = _DecodingRawReader(body)
+        else:
+            self._raw_reader = _SeekableRawReader(
+                self._session, make_url(generation), self._size, offset=range_start, body=body,
+                verifier=self._verifier, max_skip_size=max_skip_size,
+            )
         self._current_pos = 0
         self._current_part_size = buffer_size
         self._current_part = smart_open.bytebuffer.ByteBuffer(buffer_size)
+        self._tuner = smart_open.bytebuffer.ChunkSizeTuner(self._current_part, max_size=max_buffer_size)
         self._eof = False
         self._line_terminator = line_terminator
 
@@ -234,7 +661,8 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
     def close(self):
         """Flush and close this stream."""
         logger.debug("close: called")
-        self._blob = None
+        if self._raw_reader is not None:
+            self._raw_reader.close()
         self._current_part = None
         self._raw_reader = None
 
@@ -246,7 +674,7 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
         """If False, seek(), tell() and truncate() will raise IOError.
 
         We offer only seek support, and no truncate support."""
-        return True
+        return self._size is not None
 
     #
     # io.BufferedIOBase methods.
@@ -265,6 +693,8 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
         logger.debug('seeking to offset: %r whence: %r', offset, whence)
         if whence not in _WHENCE_CHOICES:
             raise ValueError('invalid whence, expected one of %r' % _WHENCE_CHOICES)
+        if not self.seekable():
+            raise io.UnsupportedOperation('cannot seek in a blob stored with a Content-Encoding')
 
         if whence == START:
             new_position = offset
@@ -273,12 +703,19 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
         else:
             new_position = self._size + offset
         new_position = smart_open.s3.clamp(new_position, 0, self._size)
-        self._current_pos = new_position
-        self._raw_reader.seek(new_position)
+        distance = new_position - self._current_pos
+        if 0 <= distance <= len(self._current_part):
+            #
+            # We already have the data at the new position in our buffer.
+            #
+            self._read_from_buffer(distance)
+        else:
+            self._current_pos = new_position
+            self._raw_reader.seek(new_position)
+            self._current_part.empty()
+            self._tuner.reset()
+            self._eof = self._current_pos == self._size
         logger.debug('current_pos: %r', self._current_pos)
-
-        self._current_part.empty()
-        self._eof = self._current_pos == self._size
         return self._current_pos
 
     def tell(self):
@@ -294,8 +731,11 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
         if size == 0:
             return b''
         elif size < 0:
-            self._current_pos = self._size
-            return self._read_from_buffer() + self._raw_reader.read()
+            from_buf = self._read_from_buffer()
+            from_raw = self._raw_reader.read()
+            self._current_pos += len(from_raw)
+            self._eof = True
+            return from_buf + from_raw
 
         #
         # Return unused data first
@@ -351,6 +791,15 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
                 self._fill_buffer()
         return the_line.getvalue()
 
+    @property
+    def checksum_algorithm(self):
+        """The checksum the reader verifies, and its implementation, e.g. "crc32c (google_crc32c)".
+
+        None if the reader does not verify a checksum."""
+        if self._verifier is None:
+            return None
+        return self._verifier.algorithm
+
     #
     # Internal methods.
     #
@@ -364,26 +813,126 @@ class SeekableBufferedInputBase(io.BufferedIOBase):
         return part
 
     def _fill_buffer(self, size=-1):
-        size = size if size >= 0 else self._current_part._chunk_size
+        size = size if size >= 0 else self._current_part.chunk_size
         while len(self._current_part) < size and not self._eof:
-            bytes_read = self._current_part.fill(self._raw_reader)
+            bytes_read = self._tuner.fill(self._raw_reader)
             if bytes_read == 0:
                 logger.debug('reached EOF while filling buffer')
                 self._eof = True
 
     def __str__(self):
-        return "(%s, %r, %r)" % (self.__class__.__name__, self._bucket.name, self._blob.name)
+        return "(%s, %r, %r)" % (self.__class__.__name__, self._bucket_name, self._blob_name)
 
     def __repr__(self):
         return "%s(bucket=%r, blob=%r, buffer_size=%r)" % (
-            self.__class__.__name__, self._bucket.name, self._blob.name, self._current_part_size,
+            self.__class__.__name__, self._bucket_name, self._blob_name, self._current_part_size,
         )
 
 
+def _committed_size(response):
+    """Return how many bytes of a resumable upload GCS has persisted, from its 308 response."""
+    #
+    # e.g. Range: bytes=0-1048575 if GCS has persisted the first 1MB.
+    # The header is absent if GCS has persisted nothing yet.
+    #
+    range_string = response.headers.get('Range')
+    if not range_string:
+        return 0
+    return int(range_string.split('-')[-1]) + 1
+
+
+class _Chunks(object):
+    """Consecutive chunks of data, sent as a single request body without joining them.
+
+    requests sends iterables with a known length chunk by chunk, with a
+    Content-Length header, so the chunks never get copied into one buffer.
+    """
+
+    def __init__(self, views):
+        self._views = views
+        self._size = sum(len(view) for view in views)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return iter(self._views)
+
+    def skip(self, offset):
+        """Return the chunks that follow the first offset bytes, without copying them."""
+        views = list(self._views)
+        while views and offset >= len(views[0]):
+            offset -= len(views.pop(0))
+        if views and offset:
+            views[0] = views[0][offset:]
+        return _Chunks(views)
+
+    def tobytes(self):
+        """Return the data as a single bytes object.  This copies the data."""
+        return b''.join(self._views)
+
+
+class _ChunkBuffer(object):
+    """Holds written data as a list of chunks, so that it never gets copied
+    more than once on its way to the network.
+
+    Bytes objects are immutable, so we keep references to them instead of
+    copying them.  Other binary types (bytearray, memoryview) may get modified
+    by the caller after they're written, so we have to copy them once.
+    """
+
+    def __init__(self):
+        self._chunks = collections.deque()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def tell(self):
+        """Return the number of buffered bytes."""
+        return self._size
+
+    def write(self, b):
+        if not isinstance(b, six.binary_type):
+            b = memoryview(b).tobytes()
+        if b:
+            self._chunks.append(memoryview(b))
+            self._size += len(b)
+
+    def take(self, size=-1):
+        """Remove up to size bytes from the front of the buffer, and return them.
+
+        Returns the bytes as _Chunks: memoryviews of the written chunks,
+        without copying them.
+        """
+        if size < 0 or size > self._size:
+            size = self._size
+
+        views = []
+        remaining = size
+        while remaining:
+            chunk = self._chunks.popleft()
+            if len(chunk) > remaining:
+                #
+                # Keep the rest of the chunk for later.  Slicing a memoryview
+                # does not copy the underlying bytes.
+                #
+                self._chunks.appendleft(chunk[remaining:])
+                chunk = chunk[:remaining]
+            views.append(chunk)
+            remaining -= len(chunk)
+        self._size -= size
+        return _Chunks(views)
+
+
 class BufferedOutputBase(io.BufferedIOBase):
     """Writes bytes to GCS.
 
-    Implements the io.BufferedIOBase interface of the standard library."""
+    Implements the io.BufferedIOBase interface of the standard library.
+
+    If verify_checksum is True, the writer checksums the data as it gets
+    written, and sends the checksum with the request that completes the
+    upload.  GCS then refuses to create the blob if the checksums differ."""
 
     def __init__(
             self,
@@ -391,6 +940,8 @@ class BufferedOutputBase(io.BufferedIOBase):
             blob,
             min_part_size=_DEFAULT_MIN_PART_SIZE,
             client=None,  # type: google.cloud.storage.Client
+            checkpoint=None,
+            verify_checksum=False,
     ):
         if client is None:
             client = google.cloud.storage.Client()
@@ -405,14 +956,30 @@ class BufferedOutputBase(io.BufferedIOBase):
         self._total_size = 0
         self._total_parts = 0
         self._bytes_uploaded = 0
-        self._current_part = io.BytesIO()
+        self._current_part = _ChunkBuffer()
 
         self._session = google_requests.AuthorizedSession(self._credentials)
 
         #
-        # https://cloud.google.com/storage/docs/json_api/v1/how-tos/resumable-upload#start-resumable
+        # We create the resumable upload session once we have a part to upload.
+        # Blobs smaller than min_part_size never need one: we upload them in a
+        # single request when closing.
         #
-        self._resumable_upload_url = self._blob.create_resumable_upload_session()
+        self._checkpoint = checkpoint
+        self._resumable_upload_url = None
+        if checkpoint is not None:
+            self._resumable_upload_url = self._resume()
+
+        self._hasher = None
+        if verify_checksum and self._bytes_uploaded:
+            #
+            # The data uploaded by a previous process never passed through us.
+            #
+            logger.warning('cannot verify the checksum of a resumed upload')
+        elif verify_checksum:
+            self._hasher = smart_open.checksums.new(
+                smart_open.checksums.CRC32C if smart_open.checksums.FAST_CRC32C else smart_open.checksums.MD5
+            )
 
         #
         # This member is part of the io.BufferedIOBase interface.
@@ -428,11 +995,14 @@ class BufferedOutputBase(io.BufferedIOBase):
     def close(self):
         logger.debug("closing")
         if not self.closed:
-            if self._total_size == 0:  # empty files
+            if self._resumable_upload_url is None:
+                self._upload_whole_blob()
+            elif self._total_size == 0:  # empty files
                 self._upload_empty_part()
             else:
                 self._upload_final_part()
             self._client = None
+            self._remove_checkpoint()
         logger.debug("successfully closed")
 
     @property
@@ -447,6 +1017,13 @@ class BufferedOutputBase(io.BufferedIOBase):
         """Return the current stream position."""
         return self._total_size
 
+    @property
+    def checksum_algorithm(self):
+        """The checksum the writer sends, and its implementation, e.g. "crc32c (google_crc32c)".
+
+        None if the writer does not send a checksum."""
+        return smart_open.checksums.describe(self._hasher)
+
     #
     # io.BufferedIOBase methods.
     #
@@ -464,6 +1041,8 @@ class BufferedOutputBase(io.BufferedIOBase):
 
         self._current_part.write(b)
         self._total_size += len(b)
+        if self._hasher is not None:
+            self._hasher.update(b)
 
         #
         # If the size of this part is precisely equal to the minimum part size,
@@ -481,11 +1060,251 @@ class BufferedOutputBase(io.BufferedIOBase):
         #
         # https://cloud.google.com/storage/docs/xml-api/resumable-upload#example_cancelling_an_upload
         #
-        self._session.delete(self._resumable_upload_url)
+        if self._resumable_upload_url is not None:
+            self._session.delete(self._resumable_upload_url)
+        self._remove_checkpoint()
 
     #
     # Internal methods.
     #
+    def _start_session(self):
+        #
+        # https://cloud.google.com/storage/docs/json_api/v1/how-tos/resumable-upload#start-resumable
+        #
+        self._resumable_upload_url = self._blob.create_resumable_upload_session()
+        self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        if self._checkpoint is None:
+            return
+        state = {
+            'bucket': self._bucket.name,
+            'blob': self._blob.name,
+            'url': self._resumable_upload_url,
+            'offset': self._bytes_uploaded,
+        }
+        #
+        # Write a temporary file next to the checkpoint, and then move it into
+        # place, so that a crash never leaves a half-written checkpoint behind.
+        #
+        directory = os.path.dirname(os.path.abspath(self._checkpoint))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.smart_open-checkpoint-')
+        try:
+            with io.open(fd, 'w') as fout:
+                fout.write(six.text_type(json.dumps(state)))
+                fout.flush()
+                os.fsync(fout.fileno())
+            smart_open.http._replace(temp_path, self._checkpoint)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def _remove_checkpoint(self):
+        if self._checkpoint is not None and os.path.isfile(self._checkpoint):
+            os.unlink(self._checkpoint)
+
+    def _resume(self):
+        """Continue the upload session recorded in the checkpoint, if any.
+
+        Returns
+        -------
+        str or None
+            The URL of the resumable upload session, or None if there is
+            no session worth continuing.
+
+        """
+        try:
+            with io.open(self._checkpoint, 'r') as fin:
+                state = json.loads(fin.read())
+            url = state['url']
+        except (IOError, OSError):
+            return None
+        except (ValueError, KeyError, TypeError):
+            logger.warning('ignoring unreadable checkpoint %r', self._checkpoint)
+            return None
+
+        if (state.get('bucket'), state.get('blob')) != (self._bucket.name, self._blob.name):
+            raise ValueError(
+                'checkpoint %r belongs to gs://%s/%s' % (
+                    self._checkpoint, state.get('bucket'), state.get('blob'),
+                )
+            )
+
+        self._resumable_upload_url = url
+        try:
+            committed = self._query_committed()
+        except UploadFailedError as err:
+            if err.status_code not in _UPLOAD_EXPIRED_STATUS_CODES:
+                raise
+            logger.warning('upload session %r has expired, starting over', url)
+            return None
+
+        if committed is None:
+            #
+            # The previous process finished the upload, but died before
+            # removing the checkpoint.  We can't tell whether the caller
+            # intends to write the same data, so start over.
+            #
+            logger.info('upload session %r already complete, starting over', url)
+            return None
+
+        logger.info('resuming upload session %r at offset %d', url, committed)
+        self._total_size = self._bytes_uploaded = committed
+        return url
+
+    def _query_committed(self):
+        """Ask GCS how many bytes of the resumable upload it has persisted.
+
+        Returns
+        -------
+        int or None
+            The number of bytes committed, or None if the upload is complete.
+
+        """
+        #
+        # https://cloud.google.com/storage/docs/performing-resumable-uploads#status-check
+        #
+        headers = {
+            'Content-Length': '0',
+            'Content-Range': 'bytes */%s' % _UNKNOWN_FILE_SIZE,
+        }
+        response = self._session.put(self._resumable_upload_url, headers=headers)
+        if response.status_code in _UPLOAD_COMPLETE_STATUS_CODES:
+            return None
+        elif response.status_code != _UPLOAD_INCOMPLETE_STATUS_CODE:
+            raise UploadFailedError(
+                'upload status check failed (status code: %d, response text: %s)' % (
+                    response.status_code, response.text,
+                ),
+                response.status_code,
+                response.text,
+            )
+        return _committed_size(response)
+
+    def _check_committed(self, committed, start, size):
+        """Make sure GCS committed part of the size bytes we sent from start."""
+        if not start <= committed <= start + size:
+            raise UploadFailedError(
+                'GCS committed %d bytes, expected between %d and %d' % (
+                    committed, start, start + size,
+                ),
+                _UPLOAD_INCOMPLETE_STATUS_CODE,
+                '',
+            )
+        return committed
+
+    def _put_part(self, data, part_num, end=_UNKNOWN_FILE_SIZE, extra_headers=None):
+        """Upload data, starting at the current offset of the upload session.
+
+        Recovers from transient failures by asking GCS how much of the data
+        it has committed, and sending the rest.
+
+        Parameters
+        ----------
+        data: _Chunks
+            The data to upload.
+        part_num: int
+            The number of this part, for logging.
+        end: int or str, optional
+            The total size of the blob, if this is the final part.
+        extra_headers: dict, optional
+            Additional headers to send with the data.
+
+        """
+        start = self._bytes_uploaded
+        if end == _UNKNOWN_FILE_SIZE:
+            expected_status_codes = (_UPLOAD_INCOMPLETE_STATUS_CODE, )
+        else:
+            expected_status_codes = _UPLOAD_COMPLETE_STATUS_CODES
+
+        attempt = 0
+        while True:
+            chunk = data.skip(self._bytes_uploaded - start)
+            if len(chunk):
+                stop = self._bytes_uploaded + len(chunk) - 1
+                content_range = _make_range_string(self._bytes_uploaded, stop, end)
+            else:
+                #
+                # Everything got committed, but we never heard back about the
+                # final part.  This finalizes the upload without sending any data.
+                #
+                content_range = 'bytes */%s' % end
+            headers = dict(extra_headers or {})
+            headers.update({
+                'Content-Length': str(len(chunk)),
+                'Content-Range': content_range,
+            })
+
+            logger.info(
+                "uploading part #%i, %i bytes (total %.3fGB) headers %r",
+                part_num, len(chunk), (start + len(data)) / 1024.0 ** 3, headers,
+            )
+
+            #
+            # requests sends an empty iterable with chunked transfer encoding,
+            # on top of our Content-Length, so send empty bytes instead.
+            #
+            body = chunk if len(chunk) else b''
+            error = None
+            try:
+                response = self._session.put(self._resumable_upload_url, data=body, headers=headers)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                error = err
+            else:
+                if response.status_code == _UPLOAD_INCOMPLETE_STATUS_CODE:
+                    #
+                    # GCS may persist less than we sent, and tells us how much
+                    # in the Range header.  We then send the rest.
+                    #
+                    committed = self._check_committed(_committed_size(response), start, len(data))
+                    if end == _UNKNOWN_FILE_SIZE and committed == start + len(data):
+                        break
+                    if committed > self._bytes_uploaded:
+                        logger.info('GCS committed %d bytes, sending the rest', committed)
+                        self._bytes_uploaded = committed
+                        continue
+                if response.status_code in expected_status_codes:
+                    break
+                error = UploadFailedError.from_response(
+                    response,
+                    part_num,
+                    len(chunk),
+                    self._total_size,
+                    headers,
+                )
+                #
+                # A 308 that commits nothing more is worth another try, too.
+                #
+                if (
+                    response.status_code not in _UPLOAD_RETRY_STATUS_CODES
+                    and response.status_code != _UPLOAD_INCOMPLETE_STATUS_CODE
+                ):
+                    raise error
+
+            if attempt == _UPLOAD_ATTEMPTS - 1:
+                raise error
+
+            sleep_seconds = _SLEEP_SECONDS * 2 ** attempt
+            logger.warning(
+                'upload of part #%i failed (%s), retrying in %d seconds',
+                part_num, error, sleep_seconds,
+            )
+            time.sleep(sleep_seconds)
+            attempt += 1
+
+            committed = self._query_committed()
+            if committed is None:
+                if end == _UNKNOWN_FILE_SIZE:
+                    raise UploadFailedError('upload completed prematurely', 200, '')
+                break
+            self._bytes_uploaded = self._check_committed(committed, start, len(data))
+            logger.info('GCS committed %d bytes, resuming from there', committed)
+
+        logger.debug("upload of part #%i finished" % part_num)
+        self._total_parts += 1
+        self._bytes_uploaded = start + len(data)
+        self._save_checkpoint()
+
     def _upload_next_part(self):
         part_num = self._total_parts + 1
 
@@ -501,90 +1320,257 @@ class BufferedOutputBase(io.BufferedIOBase):
         if size_of_leftovers == 0:
             content_length -= _REQUIRED_CHUNK_MULTIPLE
 
-        total_size = self._bytes_uploaded + content_length
-
-        start = self._bytes_uploaded
-        stop = total_size - 1
-
-        self._current_part.seek(0)
-
-        headers = {
-            'Content-Length': str(content_length),
-            'Content-Range': _make_range_string(start, stop, _UNKNOWN_FILE_SIZE),
-        }
+        if self._resumable_upload_url is None:
+            self._start_session()
+        self._put_part(self._current_part.take(content_length), part_num)
 
-        logger.info(
-            "uploading part #%i, %i bytes (total %.3fGB) headers %r",
-            part_num, content_length, total_size / 1024.0 ** 3, headers,
-        )
+    def _upload_final_part(self):
+        part_num = self._total_parts + 1
+        extra_headers = {}
+        if self._hasher is not None:
+            #
+            # https://cloud.google.com/storage/docs/xml-api/reference-headers#xgooghash
+            #
+            extra_headers['X-Goog-Hash'] = '%s=%s' % (
+                self._hasher.name, smart_open.checksums.b64encode(self._hasher.digest()),
+            )
+        self._put_part(self._current_part.take(), part_num, end=self._total_size, extra_headers=extra_headers)
 
-        response = self._session.put(
-            self._resumable_upload_url,
-            data=self._current_part.read(content_length),
-            headers=headers,
+    def _upload_whole_blob(self):
+        #
+        # A single multipart upload request, instead of starting a resumable
+        # upload session and then uploading the data in a separate request.
+        #
+        # https://cloud.google.com/storage/docs/uploading-objects#uploading-an-object
+        #
+        logger.debug("uploading %d bytes in a single request", self._total_size)
+        kwargs = {}
+        if self._hasher is not None:
+            #
+            # The client computes the checksum itself, and sends it along.
+            #
+            kwargs['checksum'] = self._hasher.name
+        #
+        # The client accepts only bytes (or str), so this copies the data once.
+        # The blob is small, so that's cheap.
+        #
+        self._blob.upload_from_string(
+            self._current_part.take().tobytes(),
+            content_type='application/octet-stream',
+            **kwargs
         )
+        self._total_parts += 1
+        self._bytes_uploaded = self._total_size
 
-        if response.status_code != _UPLOAD_INCOMPLETE_STATUS_CODE:
-            raise UploadFailedError.from_response(
-                response,
-                part_num,
-                content_length,
-                self._total_size,
-                headers,
-            )
-        logger.debug("upload of part #%i finished" % part_num)
+    def _upload_empty_part(self):
+        logger.debug("creating empty file")
+        headers = {'Content-Length': '0'}
+        response = self._session.put(self._resumable_upload_url, headers=headers)
+        assert response.status_code in _UPLOAD_COMPLETE_STATUS_CODES
 
         self._total_parts += 1
-        self._bytes_uploaded += content_length
-        # handle the leftovers
-        self._current_part = io.BytesIO(self._current_part.read())
-        self._current_part.seek(0, io.SEEK_END)
 
-    def _upload_final_part(self):
-        part_num = self._total_parts + 1
-        content_length = self._current_part.tell()
-        stop = self._total_size - 1
-        start = self._bytes_uploaded
+    def __enter__(self):
+        return self
 
-        headers = {
-            'Content-Length': str(content_length),
-            'Content-Range': _make_range_string(start, stop, self._total_size),
-        }
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        elif self._checkpoint is None:
+            self.terminate()
+        else:
+            #
+            # Keep the upload session alive, so that the next process can
+            # continue from the checkpoint, but make sure nobody finalizes it
+            # with incomplete data.
+            #
+            logger.info('leaving upload session open for checkpoint %r', self._checkpoint)
+            self._client = None
 
-        logger.info(
-            "uploading part #%i, %i bytes (total %.3fGB) headers %r",
-            part_num, content_length, self._total_size / 1024.0 ** 3, headers,
+    def __str__(self):
+        return "(%s, %r, %r)" % (self.__class__.__name__, self._bucket.name, self._blob.name)
+
+    def __repr__(self):
+        return "%s(bucket=%r, blob=%r, min_part_size=%r)" % (
+            self.__class__.__name__, self._bucket.name, self._blob.name, self._min_part_size,
         )
 
-        self._current_part.seek(0)
 
-        response = self._session.put(
-            self._resumable_upload_url,
-            data=self._current_part,
-            headers=headers,
-        )
+class CompositeWriter(io.BufferedIOBase):
+    """Writes bytes to GCS by uploading components in parallel.
 
-        if response.status_code not in _UPLOAD_COMPLETE_STATUS_CODES:
-            raise UploadFailedError.from_response(
-                response,
-                part_num,
-                content_length,
-                self._total_size,
-                headers,
-            )
-        logger.debug("upload of part #%i finished" % part_num)
+    Each component_size bytes of output get uploaded as a separate temporary
+    object, while the caller keeps writing.  On close, the components get
+    composed into the destination blob, and deleted.  GCS composes at most 32
+    objects per request, so larger outputs get composed hierarchically.
 
-        self._total_parts += 1
-        self._bytes_uploaded += content_length
+    At most workers components are buffered or uploading at any given time.
+
+    Implements the io.BufferedIOBase interface of the standard library."""
+
+    def __init__(
+            self,
+            bucket,
+            blob,
+            component_size=DEFAULT_COMPONENT_SIZE,
+            workers=DEFAULT_COMPOSITE_WORKERS,
+            client=None,  # type: google.cloud.storage.Client
+    ):
+        if client is None:
+            client = google.cloud.storage.Client()
+        self._client = client
+        self._bucket = self._client.bucket(bucket)  # type: google.cloud.storage.Bucket
+        self._blob = self._bucket.blob(blob)  # type: google.cloud.storage.Blob
+        self._component_size = component_size
+        self._workers = workers
+
+        #
+        # Keep the temporary objects next to the destination, with a unique
+        # prefix so that concurrent writers do not clash.
+        #
+        self._component_prefix = '%s.smart_open-%s/' % (blob, uuid.uuid4().hex)
+        self._components = []
+        self._futures = []
+        if _CONCURRENT_FUTURES and workers > 1:
+            self._executor = concurrent.futures.ThreadPoolExecutor(workers)
+        else:
+            self._executor = None
+
+        self._total_size = 0
         self._current_part = io.BytesIO()
 
-    def _upload_empty_part(self):
-        logger.debug("creating empty file")
-        headers = {'Content-Length': '0'}
-        response = self._session.put(self._resumable_upload_url, headers=headers)
-        assert response.status_code in _UPLOAD_COMPLETE_STATUS_CODES
+        #
+        # This member is part of the io.BufferedIOBase interface.
+        #
+        self.raw = None
 
-        self._total_parts += 1
+    def flush(self):
+        pass
+
+    #
+    # Override some methods from io.IOBase.
+    #
+    def close(self):
+        logger.debug("closing")
+        if self.closed:
+            return
+
+        try:
+            if not self._components:
+                #
+                # Everything fits into a single component, so upload it directly.
+                #
+                self._blob.upload_from_string(self._current_part.getvalue())
+            else:
+                if self._current_part.tell():
+                    self._upload_next_component()
+                self._wait(0)
+                self._compose(self._components, self._blob)
+        finally:
+            self._cleanup()
+        logger.debug("successfully closed")
+
+    @property
+    def closed(self):
+        return self._client is None
+
+    def writable(self):
+        """Return True if the stream supports writing."""
+        return True
+
+    def tell(self):
+        """Return the current stream position."""
+        return self._total_size
+
+    #
+    # io.BufferedIOBase methods.
+    #
+    def detach(self):
+        raise io.UnsupportedOperation("detach() not supported")
+
+    def write(self, b):
+        """Write the given bytes (binary string) to the GCS file.
+
+        There's buffering happening under the covers, so this may not actually
+        do any HTTP transfer right away."""
+        if not isinstance(b, _BINARY_TYPES):
+            raise TypeError("input must be one of %r, got: %r" % (_BINARY_TYPES, type(b)))
+
+        self._current_part.write(b)
+        self._total_size += len(b)
+
+        if self._current_part.tell() >= self._component_size:
+            self._upload_next_component()
+
+        return len(b)
+
+    def terminate(self):
+        """Cancel the upload, and delete any components uploaded so far."""
+        if not self.closed:
+            self._cleanup()
+
+    #
+    # Internal methods.
+    #
+    def _upload_next_component(self):
+        component = self._bucket.blob('%s%08d' % (self._component_prefix, len(self._components)))
+        self._components.append(component)
+        data = self._current_part.getvalue()
+        self._current_part = io.BytesIO()
+
+        logger.info(
+            "uploading component #%i, %i bytes (total %.3fGB)",
+            len(self._components), len(data), self._total_size / 1024.0 ** 3,
+        )
+        if self._executor is None:
+            component.upload_from_string(data)
+        else:
+            #
+            # Wait for a free worker, so that we don't buffer more than
+            # workers components at a time.
+            #
+            self._wait(self._workers - 1)
+            self._futures.append(self._executor.submit(component.upload_from_string, data))
+
+    def _wait(self, max_pending):
+        """Wait until at most max_pending uploads are still running."""
+        while len(self._futures) > max_pending:
+            future = self._futures.pop(0)
+            future.result()
+
+    def _compose(self, sources, destination):
+        """Compose sources into destination, in rounds of at most 32 objects."""
+        level = 0
+        while len(sources) > _MAX_COMPOSE_SOURCES:
+            intermediates = []
+            for i in range(0, len(sources), _MAX_COMPOSE_SOURCES):
+                intermediate = self._bucket.blob(
+                    '%scompose-%d-%08d' % (self._component_prefix, level, len(intermediates))
+                )
+                intermediate.compose(sources[i:i + _MAX_COMPOSE_SOURCES])
+                intermediates.append(intermediate)
+            self._components.extend(intermediates)
+            sources = intermediates
+            level += 1
+        logger.info("composing %i objects into %r", len(sources), destination.name)
+        destination.compose(sources)
+
+    def _cleanup(self):
+        """Stop uploading, and delete all temporary objects."""
+        for future in self._futures:
+            future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._futures = []
+
+        for component in self._components:
+            try:
+                component.delete()
+            except google.cloud.exceptions.NotFound:
+                pass
+        self._components = []
+        self._current_part = None
+        self._client = None
 
     def __enter__(self):
         return self
@@ -599,6 +1585,151 @@ class BufferedOutputBase(io.BufferedIOBase):
         return "(%s, %r, %r)" % (self.__class__.__name__, self._bucket.name, self._blob.name)
 
     def __repr__(self):
-        return "%s(bucket=%r, blob=%r, min_part_size=%r)" % (
-            self.__class__.__name__, self._bucket.name, self._blob.name, self._min_part_size,
+        return "%s(bucket=%r, blob=%r, component_size=%r, workers=%r)" % (
+            self.__class__.__name__, self._bucket.name, self._blob.name,
+            self._component_size, self._workers,
         )
+
+
+def _accept_all(blob_name):
+    return True
+
+
+def iter_bucket(
+        bucket_name,
+        prefix='',
+        accept_key=None,
+        key_limit=None,
+        workers=16,
+        retries=3,
+        client=None,  # type: google.cloud.storage.Client
+        ):
+    """
+    Iterate and download all GCS blobs under `gs://bucket_name/prefix`.
+
+    Parameters
+    ----------
+    bucket_name: str
+        The name of the bucket.
+    prefix: str, optional
+        Limits the iteration to blobs starting with the prefix.
+    accept_key: callable, optional
+        This is a function that accepts a blob name (unicode string) and
+        returns True/False, signalling whether the given blob should be downloaded.
+        The default behavior is to accept all blobs.
+    key_limit: int, optional
+        If specified, the iterator will stop after yielding this many results.
+    workers: int, optional
+        The number of threads to use.
+    retries: int, optional
+        The number of time to retry a failed download.
+    client: google.cloud.storage.Client, optional
+        The GCS client to use for listing the bucket.  The workers download
+        using its credentials.
+
+    Yields
+    ------
+    str
+        The full blob name (does not include the bucket name).
+    bytes
+        The full contents of the blob.
+
+    Notes
+    -----
+    The blobs are downloaded in parallel, using `workers` threads (default: 16).
+    Each thread keeps its own HTTP session, and reuses it for all the blobs
+    it downloads.  At most a few blobs per worker are in flight at any time,
+    so stopping early (e.g. because of key_limit) does not download the rest
+    of the bucket.
+
+    Examples
+    --------
+
+      >>> # get all JSON files under "mybucket/foo/"
+      >>> for blob_name, content in iter_bucket(
+      ...         bucket_name, prefix='foo/',
+      ...         accept_key=lambda name: name.endswith('.json')):
+      ...     print(blob_name, len(content))
+
+    """
+    if accept_key is None:
+        accept_key = _accept_all
+    if client is None:
+        client = google.cloud.storage.Client()
+
+    try:
+        bucket_name = bucket_name.name
+    except AttributeError:
+        pass
+
+    total_size, key_no = 0, -1
+    blob_iterator = (
+        blob.name
+        for blob in client.bucket(bucket_name).list_blobs(prefix=prefix)
+        if accept_key(blob.name)
+    )
+    download_blob = functools.partial(
+        _download_blob,
+        bucket_name=bucket_name,
+        credentials=client._credentials,  # noqa
+        retries=retries,
+        api_base_url=_api_base_url(client),
+    )
+
+    with smart_open.s3._create_process_pool(processes=workers, threads=True) as pool:
+        result_iterator = pool.imap_unordered(download_blob, blob_iterator)
+        for key_no, (blob_name, content) in enumerate(result_iterator):
+            if key_no % 1000 == 0:
+                logger.info(
+                    "yielding blob #%i: %s, size %i (total %.1fMB)",
+                    key_no, blob_name, len(content), total_size / 1024.0 ** 2
+                )
+            yield blob_name, content
+            total_size += len(content)
+
+            if key_limit is not None and key_no + 1 >= key_limit:
+                # we were asked to output only a limited number of blobs => we're done
+                break
+    logger.info("processed %i blobs, total size %i" % (key_no + 1, total_size))
+
+
+_WORKER_STATE = threading.local()
+"""The HTTP session of each iter_bucket worker thread."""
+
+
+def _worker_session(credentials):
+    if getattr(_WORKER_STATE, 'credentials', None) is not credentials:
+        _WORKER_STATE.session = google_requests.AuthorizedSession(credentials)
+        _WORKER_STATE.credentials = credentials
+    return _WORKER_STATE.session
+
+
+def _download_blob(blob_name, bucket_name=None, credentials=None, retries=3,
+                   api_base_url=_DEFAULT_API_BASE_URL):
+    if bucket_name is None:
+        raise ValueError('bucket_name may not be None')
+
+    session = _worker_session(credentials)
+    url = _make_download_url(bucket_name, blob_name, api_base_url=api_base_url)
+    for x in range(retries + 1):
+        try:
+            response = _download(session, url, {})
+            try:
+                if smart_open.http._content_encoding(response) == 'gzip':
+                    content_bytes = _DecodingRawReader(response.raw).read()
+                else:
+                    content_bytes = response.raw.read()
+            finally:
+                response.close()
+        except (
+            google.cloud.exceptions.GoogleCloudError,
+            requests.exceptions.RequestException,
+            urllib3.exceptions.HTTPError,
+        ):
+            # Actually fail on last pass through the loop
+            if x == retries:
+                raise
+            # Otherwise, try again, as this might be a transient error
+            logger.warning('failed to download %r, retrying', blob_name)
+        else:
+            return blob_name, content_bytes
@@ -5,17 +5,106 @@
 # This code is distributed under the terms and conditions
 # from the MIT License (MIT).
 #
-"""Implements file-like objects for reading from http."""
+"""Implements file-like objects for reading from and writing to http."""
 
+import collections
+import functools
+import hashlib
 import io
+import json
 import logging
+import os
+import tempfile
+import threading
+import time
 
 import requests
+import requests.adapters
+import six
+from six.moves import queue
+from six.moves.urllib import parse as urlparse
+from urllib3.util import retry as urllib3_retry
 
 from smart_open import bytebuffer, s3
 
+#
+# Python 2 may not have concurrent.futures, in which case readers always
+# download over a single connection.
+#
+_CONCURRENT_FUTURES = False
+try:
+    import concurrent.futures
+    _CONCURRENT_FUTURES = True
+except ImportError:
+    pass
+
 DEFAULT_BUFFER_SIZE = 128 * 1024
 
+DEFAULT_POOL_SIZE = 10
+"""The maximum number of keep-alive connections we keep open to each host."""
+
+DEFAULT_RETRIES = 3
+"""How many times we retry failed connections and transient errors."""
+
+DEFAULT_SEGMENT_SIZE = 8 * 1024**2
+"""The size of the ranges we download concurrently, if using several connections."""
+
+DEFAULT_MAX_RESUMES = 5
+"""How many times in a row a reader resumes a broken download before giving up."""
+
+DEFAULT_CACHE_SIZE = 1024**3
+"""The default size budget of a Cache, in bytes."""
+
+_CACHE_DATA_SUFFIX = '.data'
+
+_replace = getattr(os, 'replace', os.rename)
+"""Atomically replace a file.  os.replace is missing on Python 2, where os.rename does the same on POSIX."""
+
+MAX_SESSIONS = 32
+"""The maximum number of shared sessions we keep.
+
+When there are more, we close the least recently used one.
+"""
+
+_RETRY_STATUS_CODES = (500, 502, 503, 504)
+_RETRY_BACKOFF_FACTOR = 0.5
+
+_RESUME_SLEEP_SECONDS = 1
+"""How long we wait before resuming a broken download.  We double it for
+each further attempt in a row."""
+
+_BROKEN_STREAM_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+"""The errors we get when the connection breaks while we read a response."""
+
+_DRAIN_LIMIT = 128 * 1024
+"""How much unread data we are willing to discard to keep a connection alive.
+
+urllib3 only returns a connection to its pool once the response has been read
+to the end: closing a response with unread data closes the connection, and the
+next request then has to pay for a new TCP/TLS handshake.  Reading a little
+more data is cheaper than that.
+"""
+
+_MIN_RANGE_SIZE = 256 * 1024
+_MAX_RANGE_SIZE = 64 * 1024**2
+"""After seeking, we request bounded ranges that start at _MIN_RANGE_SIZE and
+double with each subsequent request, up to _MAX_RANGE_SIZE.  Random access
+then only leaves a small remainder unread, which we can drain."""
+
+_UPLOAD_QUEUE_SIZE = 4
+"""How many chunks of buffer_size bytes the writer queues up for sending."""
+
+_UPLOAD_POLL_SECONDS = 0.5
+
+_BINARY_TYPES = (six.binary_type, bytearray, memoryview)
+
+_ABORT = object()
+"""Tells the thread that sends the body of an upload to give up."""
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,9 +116,127 @@ Sometimes, servers compress the file for more efficient transfer, in which case
 the client (us) has to decompress them with the appropriate algorithm.
 """
 
+_COMPRESSED_ENCODINGS = 'gzip, deflate'
+"""The encodings we accept if the caller asks for compressed transfers."""
+
+#
+# The shared sessions, keyed by host and authentication, least recently used
+# first.  Each session keeps a pool of keep-alive connections to its host, so
+# that seeking (or reopening the same resource) does not have to pay for a new
+# TCP/TLS connection, and a new Kerberos handshake, each time.  The keys
+# contain a hash of the credentials, never the credentials themselves.
+#
+_SESSIONS = collections.OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _make_auth(kerberos=False, user=None, password=None):
+    if kerberos:
+        import requests_kerberos
+        return requests_kerberos.HTTPKerberosAuth()
+    elif user is not None and password is not None:
+        return (user, password)
+    return None
+
+
+def _auth_key(kerberos=False, user=None, password=None):
+    if kerberos:
+        return 'kerberos'
+    elif user is not None and password is not None:
+        credentials = u'%s:%s' % (user, password)
+        return hashlib.sha256(credentials.encode('utf-8')).hexdigest()
+    return None
+
+
+def get_session(url, kerberos=False, user=None, password=None,
+                pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES):
+    """Return the shared session for talking to the host of the specified URL.
+
+    Readers (and writers) that talk to the same host with the same credentials
+    share a session, and therefore its connection pool and its authentication
+    state.  We keep at most MAX_SESSIONS sessions, and close the least recently
+    used one to make room for a new one.  Use close_sessions to close all of
+    them.
+
+    Parameters
+    ----------
+    url: str
+        The URL to connect to.  Only its scheme and host matter.
+    kerberos: boolean, optional
+        If True, authenticate using the local Kerberos credentials.
+    user: str, optional
+        The username for basic HTTP authentication.
+    password: str, optional
+        The password for basic HTTP authentication.
+    pool_size: int, optional
+        The maximum number of keep-alive connections to keep open to the host.
+    retries: int, optional
+        How many times to retry failed connections, and requests that failed
+        with a transient server error.
 
-def open(uri, mode, kerberos=False, user=None, password=None, headers=None):
-    """Implement streamed reader from a web site.
+    Returns
+    -------
+    requests.Session
+        The shared session.
+
+    """
+    split = urlparse.urlsplit(url)
+    auth_key = _auth_key(kerberos=kerberos, user=user, password=password)
+    key = (split.scheme, split.netloc, auth_key, pool_size, retries)
+
+    with _SESSIONS_LOCK:
+        try:
+            #
+            # Move the session to the end, because it is now the most
+            # recently used one.
+            #
+            session = _SESSIONS.pop(key)
+            _SESSIONS[key] = session
+            return session
+        except KeyError:
+            pass
+
+        while len(_SESSIONS) >= MAX_SESSIONS:
+            _, evicted = _SESSIONS.popitem(last=False)
+            evicted.close()
+
+        logger.debug('creating session for %s://%s', split.scheme, split.netloc)
+        max_retries = urllib3_retry.Retry(
+            total=retries,
+            backoff_factor=_RETRY_BACKOFF_FACTOR,
+            status_forcelist=_RETRY_STATUS_CODES,
+            raise_on_status=False,
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=max_retries,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.auth = _make_auth(kerberos=kerberos, user=user, password=password)
+        _SESSIONS[key] = session
+        return session
+
+
+def close_sessions():
+    """Close all the shared sessions, and their keep-alive connections.
+
+    Streams that are still open keep working: their session opens new
+    connections as needed.
+    """
+    with _SESSIONS_LOCK:
+        while _SESSIONS:
+            _, session = _SESSIONS.popitem()
+            session.close()
+
+
+def open(uri, mode, kerberos=False, user=None, password=None, headers=None, range=None,
+         buffer_size=DEFAULT_BUFFER_SIZE, max_buffer_size=bytebuffer.DEFAULT_MAX_CHUNK_SIZE,
+         session=None, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES,
+         max_skip_size=s3.DEFAULT_MAX_SKIP_SIZE, method='PUT', content_length=None,
+         compress_transfer=False, connections=1, segment_size=DEFAULT_SEGMENT_SIZE,
+         cache=None, lazy=False, max_resumes=DEFAULT_MAX_RESUMES):
+    """Implement streamed reader from, and streamed writer to, a web site.
 
     Supports Kerberos and Basic HTTP authentication.
 
@@ -47,8 +254,81 @@ def open(uri, mode, kerberos=False, user=None, password=None, headers=None):
         The password for authenticating over HTTP
     headers: dict, optional
         Any headers to send in the request. If ``None``, the default headers are sent:
-        ``{'Accept-Encoding': 'identity'}``. To use no headers at all,
-        set this variable to an empty dict, ``{}``.
+        ``{'Accept-Encoding': 'identity'}`` when reading, and none when writing.
+        To use no headers at all, set this variable to an empty dict, ``{}``.
+    range: tuple, optional
+        A (start, stop) pair of byte offsets.  If set, the reader only sees
+        the bytes of the resource in the range [start, stop): positions are
+        relative to start, and the reader never requests bytes outside the range.
+        Set stop to None to read until the end of the resource.
+        The server must support range requests.  For reading only.
+    buffer_size: int, optional
+        The buffer size to use when performing I/O.  When writing, this is
+        the size of the chunks of the body we send.
+    max_buffer_size: int, optional
+        While reading sequentially, the buffer grows from buffer_size up to
+        this size, depending on the observed throughput.  It shrinks back to
+        buffer_size after seeking.  Set to buffer_size to disable.
+    session: requests.Session, optional
+        The session to send requests with.  If None, we use a session shared
+        with all the other streams talking to the same host with the same
+        credentials.  If you pass your own session, we use it as is, except
+        that kerberos, user and password (if set) override its authentication.
+    pool_size: int, optional
+        The maximum number of keep-alive connections the shared session keeps
+        open to the host.  Ignored if you pass your own session.
+    retries: int, optional
+        How many times the shared session retries failed connections, and
+        requests that failed with a transient server error.
+        Ignored if you pass your own session.  For reading only: a streamed
+        body cannot be sent again.
+    max_skip_size: int, optional
+        When seeking forward by at most this many bytes, read and discard
+        them from the open response instead of making a new request.
+        Set to 0 to always make a new request.  For reading only.
+    compress_transfer: bool, optional
+        If True, allow the server to compress the data in transit, with gzip
+        or deflate, and decompress it as we read it.  This saves a lot of
+        bandwidth for text, but positions in the decompressed data do not
+        correspond to positions in the transfer, so the reader can then
+        only seek forward, by decompressing and discarding the data in
+        between.  Cannot be combined with range.  For reading only.
+    connections: int, optional
+        If larger than 1, and the server supports range requests, download
+        the resource as consecutive segments over this many connections at
+        once.  This helps with servers that limit the speed of each
+        connection.  Keep it no larger than pool_size.  Ignored with range
+        or compress_transfer.  For reading only.
+    segment_size: int, optional
+        The size of the segments to download over several connections.
+        Up to connections + 1 segments are in memory at any time.
+        For reading only.
+    cache: smart_open.http.Cache, optional
+        If set, read the resource from this local cache, which downloads it
+        only if the cached copy is missing or stale.  The reader is then a
+        local file.  Ignored with range.  For reading only.
+    lazy: bool, optional
+        If True, find out the size of the resource with a HEAD request (or,
+        failing that, by requesting its first byte) when opening it, and
+        only request the data on the first read, from wherever the caller
+        has seeked to by then.  This saves downloading data that is never
+        read, e.g. when reading a zip file from its end.  Resources that
+        cannot be read by range are requested right away, as usual.
+        Cannot be combined with compress_transfer.  For reading only.
+    max_resumes: int, optional
+        If the connection breaks while reading a resource that supports range
+        requests, request the rest of it again, with exponential backoff, up
+        to this many times in a row.  The request uses If-Range, so that we
+        raise IOError instead of mixing up two versions of the resource.
+        Set to 0 to disable.  For reading only.
+    method: str, optional
+        The method of the request that uploads the data, e.g. PUT or POST.
+        For writing only.
+    content_length: int, optional
+        The number of bytes the caller is going to write.  If set, we send
+        the data with this Content-Length, which e.g. presigned S3 and GCS
+        URLs require.  Otherwise, we send it with chunked transfer encoding.
+        For writing only.
 
     Note
     ----
@@ -56,10 +336,26 @@ def open(uri, mode, kerberos=False, user=None, password=None, headers=None):
     unauthenticated, unless set separately in headers.
 
     """
-    if mode == 'rb':
+    if mode == 'rb' and cache is not None and range is None:
+        session, auth = _session_and_auth(uri, session, kerberos, user, password, pool_size, retries)
+        return cache.open(uri, session=session, auth=auth, headers=headers)
+    elif mode == 'rb':
         return SeekableBufferedInputBase(
             uri, mode, kerberos=kerberos,
-            user=user, password=password, headers=headers
+            user=user, password=password, headers=headers,
+            byte_range=range, buffer_size=buffer_size,
+            max_buffer_size=max_buffer_size, session=session,
+            pool_size=pool_size, retries=retries, max_skip_size=max_skip_size,
+            compress_transfer=compress_transfer, connections=connections,
+            segment_size=segment_size, lazy=lazy, max_resumes=max_resumes,
+        )
+    elif mode == 'wb':
+        if range is not None:
+            raise ValueError('range must be None when writing')
+        return BufferedOutputBase(
+            uri, method=method, headers=headers, content_length=content_length,
+            buffer_size=buffer_size, kerberos=kerberos, user=user, password=password,
+            session=session, pool_size=pool_size,
         )
     else:
         raise NotImplementedError('http support for mode %r not implemented' % mode)
@@ -67,14 +363,12 @@ def open(uri, mode, kerberos=False, user=None, password=None, headers=None):
 
 class BufferedInputBase(io.BufferedIOBase):
     def __init__(self, url, mode='r', buffer_size=DEFAULT_BUFFER_SIZE,
-                 kerberos=False, user=None, password=None, headers=None):
-        if kerberos:
-            import requests_kerberos
-            auth = requests_kerberos.HTTPKerberosAuth()
-        elif user is not None and password is not None:
-            auth = (user, password)
-        else:
-            auth = None
+                 kerberos=False, user=None, password=None, headers=None,
+                 max_buffer_size=bytebuffer.DEFAULT_MAX_CHUNK_SIZE, session=None,
+                 pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES):
+        self.session, auth = _session_and_auth(
+            url, session, kerberos, user, password, pool_size, retries,
+        )
 
         self.buffer_size = buffer_size
         self.mode = mode
@@ -84,15 +378,24 @@ class BufferedInputBase(io.BufferedIOBase):
         else:
             self.headers = headers
 
-        self.response = requests.get(url, auth=auth, stream=True, headers=self.headers)
+        self.response = self.session.get(url, auth=auth, stream=True, headers=self.headers)
 
         if not self.response.ok:
             self.response.raise_for_status()
 
         self._read_iter = self.response.iter_content(self.buffer_size)
         self._read_buffer = bytebuffer.ByteBuffer(buffer_size)
+        self._tuner = bytebuffer.ChunkSizeTuner(self._read_buffer, max_size=max_buffer_size)
         self._current_pos = 0
 
+        #
+        # The current response ends where the resource does, so once it runs
+        # out of data, we are at the end of the stream.
+        #
+        self._response_bounded = False
+        self._eof = False
+        self._resumes = 0
+
         #
         # This member is part of the io.BufferedIOBase interface.
         #
@@ -104,8 +407,8 @@ class BufferedInputBase(io.BufferedIOBase):
     def close(self):
         """Flush and close this stream."""
         logger.debug("close: called")
-        self.response = None
-        self._read_iter = None
+        self._release_response()
+        self._eof = True
 
     def readable(self):
         """Return True if the stream can be read from."""
@@ -126,35 +429,37 @@ class BufferedInputBase(io.BufferedIOBase):
         Mimics the read call to a filehandle object.
         """
         logger.debug("reading with size: %d", size)
-        if self.response is None:
-            return b''
-
         if size == 0:
             return b''
-        elif size < 0 and len(self._read_buffer) == 0:
-            retval = self.response.raw.read()
         elif size < 0:
-            retval = self._read_buffer.read() + self.response.raw.read()
+            #
+            # Keep the position up to date as we go, because the next
+            # response starts where the previous one stopped.
+            #
+            chunks = [self._read_buffer.read()]
+            self._current_pos += len(chunks[0])
+            while self._ensure_response():
+                try:
+                    for chunk in self._read_iter:
+                        chunks.append(chunk)
+                        self._current_pos += len(chunk)
+                        self._resumes = 0
+                except _BROKEN_STREAM_ERRORS as error:
+                    self._resume(error)
+                    continue
+                self._end_of_response()
+            return b''.join(chunks)
         else:
             while len(self._read_buffer) < size:
                 logger.debug(
                     "http reading more content at current_pos: %d with size: %d",
                     self._current_pos, size,
                 )
-                bytes_read = self._read_buffer.fill(self._read_iter)
-                if bytes_read == 0:
+                if not self._fill_buffer():
                     # Oops, ran out of data early.
-                    retval = self._read_buffer.read()
-                    self._current_pos += len(retval)
-
-                    return retval
-
-            # If we got here, it means we have enough data in the buffer
-            # to return to the caller.
-            retval = self._read_buffer.read(size)
+                    break
 
-        self._current_pos += len(retval)
-        return retval
+            return self._read_from_buffer(size)
 
     def read1(self, size=-1):
         """This is the same as read()."""
@@ -169,6 +474,87 @@ class BufferedInputBase(io.BufferedIOBase):
         b[:len(data)] = data
         return len(data)
 
+    def readline(self, limit=-1):
+        """Read up to and including the next newline, but at most limit bytes
+        if limit is not negative.  Returns the bytes read."""
+        if limit is None:
+            limit = -1
+
+        #
+        # A single line may span multiple buffers.
+        #
+        line = io.BytesIO()
+        while limit < 0 or line.tell() < limit:
+            index = self._read_buffer.find(b'\n')
+            size = len(self._read_buffer) if index == -1 else index + 1
+            if limit >= 0:
+                size = min(size, limit - line.tell())
+            line.write(self._read_from_buffer(size))
+
+            if index != -1 or not self._fill_buffer():
+                break
+
+        return line.getvalue()
+
+    def _read_from_buffer(self, size):
+        part = self._read_buffer.read(size)
+        self._current_pos += len(part)
+        return part
+
+    def _fill_buffer(self):
+        """Read more data into the buffer.
+
+        Returns False if there is no more data to read."""
+        while self._ensure_response():
+            try:
+                filled = self._tuner.fill(self._read_iter)
+            except _BROKEN_STREAM_ERRORS as error:
+                self._resume(error)
+                continue
+            if filled:
+                self._resumes = 0
+                return True
+            self._end_of_response()
+        return False
+
+    def _ensure_response(self):
+        """Make sure there is a response to read from.
+
+        Returns False if we are at the end of the stream."""
+        if self.response is not None:
+            return True
+        elif self._eof:
+            return False
+        return self._open_next_response()
+
+    def _open_next_response(self):
+        """Request the data following the current response.
+
+        We only ever send one request, so there is no next response."""
+        self._eof = True
+        return False
+
+    def _end_of_response(self):
+        """Handle the current response running out of data."""
+        if not self._response_bounded:
+            self._eof = True
+        self._release_response()
+
+    def _resume(self, error):
+        """Handle the connection breaking while we read the current response.
+
+        We cannot request the rest of the data, so we give up."""
+        self._release_response()
+        raise error
+
+    def _release_response(self):
+        if isinstance(self.response, _ParallelDownload):
+            self.response.close()
+        else:
+            _release_response(self.response)
+        self.response = None
+        self._read_iter = None
+
 
 class SeekableBufferedInputBase(BufferedInputBase):
     """
@@ -177,53 +563,184 @@ class SeekableBufferedInputBase(BufferedInputBase):
     """
 
     def __init__(self, url, mode='r', buffer_size=DEFAULT_BUFFER_SIZE,
-                 kerberos=False, user=None, password=None, headers=None):
+                 kerberos=False, user=None, password=None, headers=None,
+                 byte_range=None, max_buffer_size=bytebuffer.DEFAULT_MAX_CHUNK_SIZE,
+                 session=None, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES,
+                 max_skip_size=s3.DEFAULT_MAX_SKIP_SIZE, compress_transfer=False,
+                 connections=1, segment_size=DEFAULT_SEGMENT_SIZE, lazy=False,
+                 max_resumes=DEFAULT_MAX_RESUMES):
         """
         If Kerberos is True, will attempt to use the local Kerberos credentials.
         Otherwise, will try to use "basic" HTTP authentication via username/password.
 
         If none of those are set, will connect unauthenticated.
+
+        If byte_range is set, the reader is confined to the (start, stop)
+        byte range of the resource.
+
+        If session is set, requests go through it instead of the session
+        shared with the other streams talking to the same host.
+
+        Seeking forward by at most max_skip_size bytes reads and discards
+        them from the open response, instead of making a new request.
+
+        If compress_transfer is True, the server may compress the data in
+        transit.  If it does, the reader decompresses the data as it reads
+        it, and positions refer to the decompressed data, so the reader can
+        only seek forward.
+
+        If connections is larger than 1, and the server supports range
+        requests, the reader downloads segment_size segments of the resource
+        over that many connections at once.  After seeking, the reader
+        first requests small ranges, and goes back to downloading segments
+        once it has read sequentially for a while.
+
+        If lazy is True, the reader only probes the resource when opening
+        it, and requests the data on the first read.
+
+        If the connection breaks while reading, the reader requests the rest
+        of the resource again, up to max_resumes times in a row.
         """
         self.url = url
+        self._max_skip_size = max_skip_size
+        self._connections = connections
+        self._segment_size = segment_size
+        self._parallel = False
+        self._max_resumes = max_resumes
+        self._resumes = 0
+        self.session, self.auth = _session_and_auth(
+            url, session, kerberos, user, password, pool_size, retries,
+        )
 
-        if kerberos:
-            import requests_kerberos
-            self.auth = requests_kerberos.HTTPKerberosAuth()
-        elif user is not None and password is not None:
-            self.auth = (user, password)
-        else:
-            self.auth = None
-
+        #
+        # We add Range and If-Range to our headers, so copy them: the caller
+        # may share their dict between several readers.
+        #
         if headers is None:
             self.headers = _HEADERS.copy()
         else:
-            self.headers = headers
+            self.headers = dict(headers)
+        if compress_transfer:
+            if byte_range is not None:
+                raise ValueError('range cannot be combined with compress_transfer')
+            if lazy:
+                raise ValueError('lazy cannot be combined with compress_transfer')
+            self.headers = dict(self.headers, **{'Accept-Encoding': _COMPRESSED_ENCODINGS})
 
         self.buffer_size = buffer_size
         self.mode = mode
-        self.response = self._partial_request()
+        self._read_buffer = bytebuffer.ByteBuffer(buffer_size)
+        self._tuner = bytebuffer.ChunkSizeTuner(self._read_buffer, max_size=max_buffer_size)
+        self._current_pos = 0
+        self._response_bounded = False
+        self._eof = False
+
+        #
+        # The size of the next bounded range we request, or None to request
+        # everything up to the end of the resource.
+        #
+        self._range_size = None
+
+        #
+        # This member is part of the io.BufferedIOBase interface.
+        #
+        self.raw = None
+
+        if byte_range is None:
+            self._range_start, self._range_stop = 0, None
+        else:
+            self._range_start, self._range_stop = s3.check_range(byte_range)
+
+        if self._range_start == self._range_stop:
+            #
+            # There is nothing to read, so don't bother the server.
+            #
+            self.response = None
+            self._read_iter = None
+            self._seekable = True
+            self.content_length = 0
+            self._content_encoding = None
+            self._eof = True
+            return
+
+        if lazy:
+            total_size = self._probe()
+            if total_size is not None:
+                #
+                # Leave the request for the data to the first read, which
+                # requests it from the current position, like after a seek.
+                #
+                stop = total_size if self._range_stop is None else min(self._range_stop, total_size)
+                self.response = None
+                self._read_iter = None
+                self._seekable = True
+                self.content_length = max(stop - self._range_start, 0)
+                self._content_encoding = None
+                self._parallel = connections > 1 and byte_range is None and _CONCURRENT_FUTURES
+                return
+            logger.debug('%r cannot be read by range, so requesting it right away', url)
+
+        if connections > 1 and byte_range is None and not compress_transfer and _CONCURRENT_FUTURES:
+            #
+            # Ask for the first segment only.  If the server supports range
+            # requests, it tells us the size of the resource, and we download
+            # the other segments concurrently.
+            #
+            self.response = self._partial_request(0, segment_size)
+        else:
+            self.response = self._partial_request(None if byte_range is None else 0)
 
         if not self.response.ok:
             self.response.raise_for_status()
 
         logger.debug('self.response: %r, raw: %r', self.response, self.response.raw)
+        self._remember_version(self.response)
 
         self._seekable = True
 
         self.content_length = int(self.response.headers.get("Content-Length", -1))
-        if self.content_length < 0:
-            self._seekable = False
-        if self.response.headers.get("Accept-Ranges", "none").lower() != "bytes":
+        if byte_range is not None:
+            #
+            # If the server ignored our Range header, then it is sending us
+            # the entire resource, and we have no way to stay within the range.
+            #
+            if self.response.status_code != requests.codes.partial_content:
+                raise IOError('%r does not support range requests' % url)
+        elif self.response.status_code == requests.codes.partial_content:
+            self.content_length = _parse_total_size(self.response)
+            if self.content_length is None:
+                #
+                # We cannot split a resource of unknown size into segments,
+                # so stream it instead.
+                #
+                self.response.close()
+                del self.headers['range']
+                self.response = self._partial_request()
+                if not self.response.ok:
+                    self.response.raise_for_status()
+                self.content_length = -1
+            else:
+                self._parallel = True
+                self._response_bounded = segment_size < self.content_length
+        elif self.response.headers.get("Accept-Ranges", "none").lower() != "bytes":
             self._seekable = False
 
-        self._read_iter = self.response.iter_content(self.buffer_size)
-        self._read_buffer = bytebuffer.ByteBuffer(buffer_size)
-        self._current_pos = 0
-
         #
-        # This member is part of the io.BufferedIOBase interface.
+        # If the server compressed the data, Content-Length and any ranges
+        # refer to the compressed data, which we never see.
         #
-        self.raw = None
+        self._content_encoding = _content_encoding(self.response)
+        if self._content_encoding is not None:
+            if byte_range is not None:
+                raise IOError(
+                    '%r sent Content-Encoding: %s, so it cannot be read by range'
+                    % (url, self._content_encoding)
+                )
+            self.content_length = -1
+        if self.content_length < 0:
+            self._seekable = False
+
+        self._read_iter = self.response.iter_content(self.buffer_size)
 
     def seek(self, offset, whence=0):
         """Seek to the specified position.
@@ -237,7 +754,9 @@ class SeekableBufferedInputBase(BufferedInputBase):
             raise ValueError('invalid whence, expected one of %r' % s3.WHENCE_CHOICES)
 
         if not self.seekable():
-            raise OSError
+            if self._content_encoding is None or whence == s3.END:
+                raise OSError
+            return self._seek_forward(offset if whence == s3.START else self._current_pos + offset)
 
         if whence == s3.START:
             new_pos = offset
@@ -253,20 +772,26 @@ class SeekableBufferedInputBase(BufferedInputBase):
 
         logger.debug("http seeking from current_pos: %d to new_pos: %d", self._current_pos, new_pos)
 
-        self._current_pos = new_pos
+        distance = new_pos - self._current_pos
+        if 0 < distance <= len(self._read_buffer) or (
+            self.response is not None
+            and 0 < distance - len(self._read_buffer) <= self._max_skip_size
+        ):
+            self._skip(distance)
+            return self._current_pos
 
-        if new_pos == self.content_length:
-            self.response = None
-            self._read_iter = None
-            self._read_buffer.empty()
-        else:
-            response = self._partial_request(new_pos)
-            if response.ok:
-                self.response = response
-                self._read_iter = self.response.iter_content(self.buffer_size)
-                self._read_buffer.empty()
-            else:
-                self.response = None
+        #
+        # We request the data at the new position on the next read.  Until
+        # we know how much the caller is going to read from there, we request
+        # small ranges, so that we do not leave much data unread if the
+        # caller seeks again.
+        #
+        self._current_pos = new_pos
+        self._release_response()
+        self._read_buffer.empty()
+        self._tuner.reset()
+        self._range_size = _MIN_RANGE_SIZE
+        self._eof = False
 
         return self._current_pos
 
@@ -280,9 +805,796 @@ class SeekableBufferedInputBase(BufferedInputBase):
         """Unsupported."""
         raise io.UnsupportedOperation
 
-    def _partial_request(self, start_pos=None):
+    def _seek_forward(self, new_pos):
+        """Emulate seeking in compressed data, by decompressing our way forward."""
+        if new_pos < self._current_pos:
+            raise OSError(
+                'cannot seek backwards in %r, which the server sent with Content-Encoding: %s'
+                % (self.url, self._content_encoding)
+            )
+        self._skip(new_pos - self._current_pos)
+        return self._current_pos
+
+    def _skip(self, size):
+        """Read and discard size bytes."""
+        while size > 0:
+            if not len(self._read_buffer) and not self._fill_buffer():
+                break
+            size -= len(self._read_from_buffer(size))
+
+    def _open_next_response(self):
+        """Request the data following the data we have already received.
+
+        Returns False if there is no more data to request."""
+        position = self._current_pos + len(self._read_buffer)
+        if not self._seekable or position >= self.content_length:
+            self._eof = True
+            return False
+
+        if self._parallel and (self._range_size is None or self._range_size >= self._segment_size):
+            self.response = _ParallelDownload(
+                self._fetch_segment, position, self.content_length,
+                self._segment_size, self._connections,
+            )
+            self._read_iter = iter(self.response)
+            self._response_bounded = False
+            return True
+
+        stop = None
+        if self._range_size is not None:
+            if position + self._range_size < self.content_length:
+                stop = position + self._range_size
+            self._range_size = min(2 * self._range_size, _MAX_RANGE_SIZE)
+
+        response = self._partial_request(position, stop)
+        if not response.ok:
+            response.raise_for_status()
+        if 'If-Range' in self.headers and response.status_code != requests.codes.partial_content:
+            response.close()
+            raise IOError('%r changed while we were reading it' % self.url)
+
+        self.response = response
+        self._read_iter = response.iter_content(self.buffer_size)
+        self._response_bounded = stop is not None
+        return True
+
+    def _end_of_response(self):
+        """Handle the current response running out of data.
+
+        A response that ends before the resource does was cut short."""
+        position = self._current_pos + len(self._read_buffer)
+        if not self._response_bounded and self._seekable and position < self.content_length:
+            self._resume(IOError(
+                '%r ended after %d of %d bytes' % (self.url, position, self.content_length)
+            ))
+        else:
+            super(SeekableBufferedInputBase, self)._end_of_response()
+
+    def _resume(self, error):
+        """Request the rest of the data after the connection broke.
+
+        Raises error if we cannot, or if we have already tried too often."""
+        self._release_response()
+        while True:
+            if not self._seekable or self._resumes >= self._max_resumes:
+                raise error
+
+            sleep_seconds = _RESUME_SLEEP_SECONDS * 2 ** self._resumes
+            self._resumes += 1
+            logger.warning(
+                'reading %r broke off at byte %d (%s), resuming in %d seconds',
+                self.url, self._current_pos + len(self._read_buffer), error, sleep_seconds,
+            )
+            time.sleep(sleep_seconds)
+
+            try:
+                self._open_next_response()
+            except _BROKEN_STREAM_ERRORS as e:
+                error = e
+            else:
+                return
+
+    def _remember_version(self, response):
+        """Make sure that later range requests get the same version of the resource.
+
+        With If-Range, the server sends the entire resource instead of the
+        range if the resource has changed since the response."""
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            #
+            # Weak ETags cannot be used with If-Range.
+            #
+            self.headers['If-Range'] = etag
+        elif 'Last-Modified' in response.headers:
+            self.headers['If-Range'] = response.headers['Last-Modified']
+
+    def _probe(self):
+        """Find out the size of the resource without downloading it.
+
+        Returns None if the resource cannot be read by range."""
+        response = self.session.head(self.url, auth=self.auth, headers=self.headers, allow_redirects=True)
+        if (
+            response.ok
+            and response.headers.get('Accept-Ranges', 'none').lower() == 'bytes'
+            and _content_encoding(response) is None
+        ):
+            try:
+                total_size = int(response.headers['Content-Length'])
+            except (KeyError, ValueError):
+                pass
+            else:
+                self._remember_version(response)
+                return total_size
+
+        #
+        # Some servers do not support HEAD, or leave out the headers we need,
+        # so ask for the first byte instead, which tells us the size too.
+        #
+        headers = dict(self.headers, range=s3.make_range_string(0, 0))
+        response = self.session.get(self.url, auth=self.auth, stream=True, headers=headers)
+        try:
+            if not response.ok:
+                response.raise_for_status()
+            if (
+                response.status_code == requests.codes.partial_content
+                and _content_encoding(response) is None
+            ):
+                self._remember_version(response)
+                return _parse_total_size(response)
+            return None
+        finally:
+            _release_response(response)
+
+    def _fetch_segment(self, start_pos, stop_pos):
+        """Download the bytes between the two positions, in a single request."""
+        headers = dict(self.headers)
+        headers['range'] = s3.make_range_string(
+            self._range_start + start_pos, self._range_start + stop_pos - 1,
+        )
+        response = self.session.get(self.url, auth=self.auth, headers=headers)
+        if not response.ok:
+            response.raise_for_status()
+        if response.status_code != requests.codes.partial_content:
+            raise IOError('%r ignored our range request' % self.url)
+        if len(response.content) != stop_pos - start_pos:
+            raise IOError(
+                '%r sent %d bytes instead of %d' % (self.url, len(response.content), stop_pos - start_pos)
+            )
+        return response.content
+
+    def _partial_request(self, start_pos=None, stop_pos=None):
         if start_pos is not None:
-            self.headers.update({"range": s3.make_range_string(start_pos)})
+            if stop_pos is not None:
+                stop = self._range_start + stop_pos - 1
+            elif self._range_stop is not None:
+                stop = self._range_stop - 1
+            else:
+                stop = None
+            self.headers.update({
+                "range": s3.make_range_string(self._range_start + start_pos, stop),
+            })
 
-        response = requests.get(self.url, auth=self.auth, stream=True, headers=self.headers)
+        response = self.session.get(self.url, auth=self.auth, stream=True, headers=self.headers)
         return response
+
+
+class BufferedOutputBase(io.BufferedIOBase):
+    """Writes bytes to a web site with a single streaming request.
+
+    Implements the io.BufferedIOBase interface of the standard library.
+
+    A background thread sends the request, and takes the body from a bounded
+    queue of chunks, which write() fills.  The upload therefore runs in
+    constant memory, whatever its size, and write() blocks while the
+    connection is slower than the caller.
+
+    If content_length is None, the body is sent with chunked transfer
+    encoding.  Otherwise, it is sent with that Content-Length, as required
+    by e.g. presigned S3 and GCS URLs, and the caller must write exactly
+    that many bytes.  Outputs that never fill the buffer are sent in a
+    single, ordinary request on close.
+
+    The server only responds once it has received the entire body, so it is
+    close() that raises requests.HTTPError if the server rejects the upload.
+    """
+
+    def __init__(self, url, method='PUT', headers=None, content_length=None,
+                 buffer_size=DEFAULT_BUFFER_SIZE, kerberos=False, user=None, password=None,
+                 session=None, pool_size=DEFAULT_POOL_SIZE):
+        #
+        # We cannot replay a streamed body, so the shared session must not
+        # retry requests.
+        #
+        self._session, self._auth = _session_and_auth(
+            url, session, kerberos, user, password, pool_size, 0,
+        )
+        self._url = url
+        self._method = method
+        self.headers = {} if headers is None else headers
+        self._content_length = content_length
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._queue = queue.Queue(maxsize=_UPLOAD_QUEUE_SIZE)
+        self._thread = None
+        self._response = None
+        self._error = None
+        self._total_size = 0
+        self._closed = False
+
+        #
+        # This member is part of the io.BufferedIOBase interface.
+        #
+        self.raw = None
+
+    #
+    # Override some methods from io.IOBase.
+    #
+    def close(self):
+        """Send the rest of the body, and wait for the server's response."""
+        logger.debug("close: called")
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._content_length is not None and self._total_size != self._content_length:
+            self._abort()
+            raise ValueError(
+                'wrote %d bytes to %r, expected content_length=%d' % (
+                    self._total_size, self._url, self._content_length,
+                )
+            )
+
+        if self._thread is None:
+            self._send_request(bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._send_buffer()
+            self._put(None)
+            self._thread.join()
+        self._buffer = bytearray()
+        self._check_response()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def writable(self):
+        """Return True if the stream supports writing."""
+        return True
+
+    def tell(self):
+        """Return the number of bytes written so far."""
+        return self._total_size
+
+    #
+    # io.BufferedIOBase methods.
+    #
+    def detach(self):
+        """Unsupported."""
+        raise io.UnsupportedOperation
+
+    def write(self, b):
+        """Write the given bytes to the body of the request.
+
+        There's buffering happening under the covers, so this may not actually
+        do any HTTP transfer right away."""
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        if not isinstance(b, _BINARY_TYPES):
+            raise TypeError('input must be one of %r, got: %r' % (_BINARY_TYPES, type(b)))
+
+        if isinstance(b, memoryview):
+            b = b.tobytes()
+        if self._content_length is not None and self._total_size + len(b) > self._content_length:
+            raise ValueError('cannot write more than content_length=%d bytes' % self._content_length)
+
+        self._buffer += b
+        self._total_size += len(b)
+        if len(self._buffer) >= self._buffer_size:
+            self._send_buffer()
+        return len(b)
+
+    def terminate(self):
+        """Cancel the upload.  The server receives an incomplete body."""
+        if self._closed:
+            return
+        self._closed = True
+        self._abort()
+        self._buffer = bytearray()
+
+    #
+    # Internal methods.
+    #
+    def _send_buffer(self):
+        chunk, self._buffer = bytes(self._buffer), bytearray()
+        if self._thread is None:
+            if self._content_length is None:
+                body = self._body()
+            else:
+                body = _SizedBody(self._body(), self._content_length)
+            self._thread = threading.Thread(target=self._send_request, args=(body, ))
+            self._thread.daemon = True
+            self._thread.start()
+        self._put(chunk)
+
+    def _put(self, chunk):
+        """Queue up a chunk of the body, waiting for room in the queue."""
+        while True:
+            if not self._thread.is_alive():
+                #
+                # The request is over, although we have not sent the
+                # entire body yet.
+                #
+                self._check_response()
+                raise IOError('%r responded before receiving the entire body' % self._url)
+            try:
+                self._queue.put(chunk, timeout=_UPLOAD_POLL_SECONDS)
+                return
+            except queue.Full:
+                pass
+
+    def _body(self):
+        """Yield the chunks of the body from the queue, until the writer closes."""
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            elif chunk is _ABORT:
+                raise IOError('upload to %r cancelled' % self._url)
+            yield chunk
+
+    def _send_request(self, body):
+        try:
+            self._response = self._session.request(
+                self._method, self._url, data=body, headers=self.headers, auth=self._auth,
+            )
+        except Exception as e:
+            self._error = e
+
+    def _abort(self):
+        if self._thread is None:
+            return
+        try:
+            self._put(_ABORT)
+        except Exception as e:
+            logger.debug('upload to %r already over: %r', self._url, e)
+        self._thread.join()
+
+    def _check_response(self):
+        if self._error is not None:
+            raise self._error
+        if not self._response.ok:
+            self._response.raise_for_status()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.terminate()
+        else:
+            self.close()
+
+
+class _SizedBody(object):
+    """An iterable request body of a known length.
+
+    requests sends such bodies with a Content-Length header, instead of
+    chunked transfer encoding."""
+
+    def __init__(self, chunks, length):
+        self._chunks = chunks
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+
+class Cache(object):
+    """A local cache of HTTP resources, validated with ETag and Last-Modified.
+
+    Readers opened with a cache get the resource as a local file.  While the
+    cached copy is fresh, according to the Cache-Control: max-age the server
+    sent with it, opening the resource makes no requests at all.  After that,
+    we revalidate the copy with a conditional request (If-None-Match and
+    If-Modified-Since), which costs a single, tiny 304 response if the
+    resource has not changed.  Responses with Cache-Control: no-store
+    never get cached.
+
+    The cache keeps at most max_size bytes in the directory, and evicts the
+    least recently used resources to stay within that budget.  Entries are
+    keyed by URL only, so share a cache only between callers that may see
+    each other's resources.
+
+    Parameters
+    ----------
+    directory: str
+        The directory to keep the cached resources in.  Created if missing.
+    max_size: int, optional
+        The maximum total size of the cached resources, in bytes.
+
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def open(self, url, session=None, auth=None, headers=None):
+        """Return the resource as a local, seekable binary file.
+
+        Downloads the resource only if the cached copy is missing or stale.
+
+        Parameters
+        ----------
+        url: str
+            The URL of the resource.
+        session: requests.Session, optional
+            The session to send requests with.  Defaults to the shared
+            session for the host.
+        auth: object, optional
+            The authentication to send with each request.
+        headers: dict, optional
+            The headers to send with each request.
+
+        """
+        if session is None:
+            session = get_session(url)
+        data_path, meta_path = self._paths(url)
+        meta = self._load_metadata(meta_path) if os.path.isfile(data_path) else None
+
+        now = time.time()
+        if meta is not None and now < meta['expires']:
+            logger.debug('serving %r from the cache', url)
+            return self._hit(data_path)
+
+        request_headers = dict(_HEADERS if headers is None else headers)
+        if meta is not None:
+            if meta['etag'] is not None:
+                request_headers['If-None-Match'] = meta['etag']
+            if meta['last_modified'] is not None:
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, auth=auth, headers=request_headers, stream=True)
+        try:
+            if meta is not None and response.status_code == requests.codes.not_modified:
+                logger.debug('revalidated %r in the cache', url)
+                meta['expires'] = _expiry_time(response, now)
+                self._save_metadata(meta_path, meta)
+                return self._hit(data_path)
+
+            if not response.ok:
+                response.raise_for_status()
+
+            if 'no-store' in _cache_control(response):
+                fout = tempfile.TemporaryFile()
+                _download_to(response, fout)
+                fout.seek(0)
+                return fout
+
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.smart_open-')
+            try:
+                with io.open(fd, 'wb') as fout:
+                    _download_to(response, fout)
+                _replace(temp_path, data_path)
+            except Exception:
+                os.unlink(temp_path)
+                raise
+        finally:
+            response.close()
+
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'expires': _expiry_time(response, now),
+        }
+        self._save_metadata(meta_path, meta)
+        self._evict(keep=data_path)
+        return io.open(data_path, 'rb')
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        path = os.path.join(self.directory, key)
+        return path + _CACHE_DATA_SUFFIX, path + '.json'
+
+    def _hit(self, data_path):
+        #
+        # The modification time of the data keeps track of when we last
+        # used it, for evicting the least recently used resources.
+        #
+        os.utime(data_path, None)
+        return io.open(data_path, 'rb')
+
+    def _load_metadata(self, meta_path):
+        try:
+            with io.open(meta_path, 'r') as fin:
+                return json.load(fin)
+        except (IOError, OSError, ValueError) as e:
+            logger.debug('ignoring unreadable cache metadata %r: %r', meta_path, e)
+            return None
+
+    def _save_metadata(self, meta_path, meta):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.smart_open-')
+        try:
+            with io.open(fd, 'w') as fout:
+                fout.write(six.text_type(json.dumps(meta)))
+            _replace(temp_path, meta_path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def _evict(self, keep):
+        """Remove the least recently used resources, until we are within budget."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_CACHE_DATA_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            logger.debug('evicting %r from the cache', path)
+            try:
+                os.unlink(path)
+                os.unlink(path[:-len(_CACHE_DATA_SUFFIX)] + '.json')
+            except OSError as e:
+                logger.debug('could not evict %r: %r', path, e)
+            total_size -= size
+
+
+def _download_to(response, fout):
+    for chunk in response.iter_content(DEFAULT_BUFFER_SIZE):
+        fout.write(chunk)
+
+
+def _cache_control(response):
+    """Parse the Cache-Control header of the response into a dict of directives."""
+    directives = {}
+    for directive in response.headers.get('Cache-Control', '').split(','):
+        name, _, value = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _expiry_time(response, now):
+    """Return the time until which the response is fresh, according to its max-age."""
+    directives = _cache_control(response)
+    if 'no-cache' in directives:
+        return now
+    try:
+        max_age = int(directives.get('max-age', 0))
+        age = int(response.headers.get('Age', 0))
+    except ValueError:
+        return now
+    return now + max(max_age - age, 0)
+
+
+def iter_urls(urls, workers=16, map_fn=None, per_host=DEFAULT_POOL_SIZE, retries=3,
+              kerberos=False, user=None, password=None, headers=None):
+    """Download many resources concurrently.
+
+    Parameters
+    ----------
+    urls: iterable of str
+        The URLs of the resources to download.
+    workers: int, optional
+        The number of threads to use.
+    map_fn: callable, optional
+        If set, the workers call map_fn(url, content) with each downloaded
+        resource, and we yield what it returns instead of the content.
+    per_host: int, optional
+        The maximum number of concurrent requests to each host.  It is also
+        the number of keep-alive connections we keep open to each host.
+    retries: int, optional
+        The number of times to retry a download that failed, or that broke off.
+    kerberos: boolean, optional
+        If True, authenticate using the local Kerberos credentials.
+    user: str, optional
+        The username for basic HTTP authentication.
+    password: str, optional
+        The password for basic HTTP authentication.
+    headers: dict, optional
+        The headers to send with each request.
+
+    Yields
+    ------
+    str
+        The URL.
+    bytes
+        The full contents of the resource.
+
+    Or, if map_fn is set, whatever map_fn returns.
+
+    Notes
+    -----
+    The results are yielded in the order the downloads finish, not in the
+    order of urls.  The workers share the sessions of the readers, and so
+    their keep-alive connections.  At most a few resources per worker are
+    in flight at any time, so memory usage does not grow with the number
+    of URLs, and stopping early does not download the rest.  Use map_fn to
+    keep only what you need from each resource.
+
+    Examples
+    --------
+
+      >>> urls = ('https://example.com/shard-%05d.jsonl' % i for i in range(1000))
+      >>> for url, content in iter_urls(urls, workers=32):
+      ...     print(url, len(content))
+
+    """
+    download_url = functools.partial(
+        _download_url,
+        map_fn=map_fn,
+        limits=_HostLimits(per_host),
+        pool_size=per_host,
+        retries=retries,
+        kerberos=kerberos,
+        user=user,
+        password=password,
+        headers=_HEADERS.copy() if headers is None else headers,
+    )
+
+    with s3._create_process_pool(processes=workers, threads=True) as pool:
+        for result in pool.imap_unordered(download_url, urls):
+            yield result
+
+
+class _HostLimits(object):
+    """Limits the number of concurrent requests to each host."""
+
+    def __init__(self, limit):
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def __call__(self, url):
+        """Return the semaphore for the host of the URL."""
+        netloc = urlparse.urlsplit(url).netloc
+        with self._lock:
+            try:
+                return self._semaphores[netloc]
+            except KeyError:
+                semaphore = self._semaphores[netloc] = threading.BoundedSemaphore(self._limit)
+                return semaphore
+
+
+def _download_url(url, map_fn=None, limits=None, pool_size=DEFAULT_POOL_SIZE, retries=3,
+                  kerberos=False, user=None, password=None, headers=None):
+    session, auth = _session_and_auth(
+        url, None, kerberos, user, password, pool_size, DEFAULT_RETRIES,
+    )
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            sleep_seconds = _RESUME_SLEEP_SECONDS * 2 ** (attempt - 1)
+            logger.warning('failed to download %r (%s), retrying in %d seconds', url, error, sleep_seconds)
+            time.sleep(sleep_seconds)
+
+        try:
+            with limits(url):
+                response = session.get(url, auth=auth, headers=headers)
+        except _BROKEN_STREAM_ERRORS as e:
+            error = e
+            continue
+
+        if not response.ok:
+            response.raise_for_status()
+
+        #
+        # urllib3 does not complain about responses that end early.
+        #
+        content = response.content
+        length = response.headers.get('Content-Length')
+        if length is None or _content_encoding(response) is not None or len(content) == int(length):
+            break
+        error = IOError('%r ended after %d of %s bytes' % (url, len(content), length))
+    else:
+        raise error
+
+    if map_fn is None:
+        return url, content
+    return map_fn(url, content)
+
+
+def _session_and_auth(url, session, kerberos, user, password, pool_size, retries):
+    """Return the session to use, and the authentication to send with each request.
+
+    The shared sessions already carry their authentication, so we need to
+    send it with each request only when the caller gave us their own session.
+    """
+    if session is None:
+        session = get_session(
+            url, kerberos=kerberos, user=user, password=password,
+            pool_size=pool_size, retries=retries,
+        )
+        return session, session.auth
+    return session, _make_auth(kerberos=kerberos, user=user, password=password)
+
+
+class _ParallelDownload(object):
+    """Downloads the [start, stop) bytes of a resource over several connections.
+
+    Splits the bytes into segments, downloads up to workers segments at once,
+    and yields them in order.  fetch(start, stop) downloads a single segment.
+    We never download more than workers segments ahead of the one the
+    caller is reading, which bounds our memory usage."""
+
+    def __init__(self, fetch, start, stop, segment_size, workers):
+        self._fetch = fetch
+        self._segments = (
+            (position, min(position + segment_size, stop))
+            for position in six.moves.range(start, stop, segment_size)
+        )
+        self._workers = workers
+        self._pending = collections.deque()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    def __iter__(self):
+        while True:
+            while len(self._pending) < self._workers and self._submit_next():
+                pass
+            if not self._pending:
+                return
+            yield self._pending.popleft().result()
+
+    def close(self):
+        """Cancel the downloads that have not started yet."""
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+    def _submit_next(self):
+        for start, stop in self._segments:
+            self._pending.append(self._executor.submit(self._fetch, start, stop))
+            return True
+        return False
+
+
+def _parse_total_size(response):
+    """Return the size of the resource from the Content-Range of a partial response.
+
+    Returns None if the server did not send it."""
+    try:
+        total = response.headers['Content-Range'].rsplit('/', 1)[1]
+        return int(total)
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def _content_encoding(response):
+    """Return the Content-Encoding of the response, or None if it is not encoded."""
+    encoding = response.headers.get('Content-Encoding', '').strip().lower()
+    return None if encoding in ('', 'identity') else encoding
+
+
+def _release_response(response, drain_limit=_DRAIN_LIMIT):
+    """Close the response, returning its connection to the pool if we can.
+
+    If the response has at most drain_limit bytes left, we read and discard
+    them, so that the connection can be reused.  Otherwise, closing the
+    response closes its connection.
+    """
+    if response is None:
+        return
+    remaining = getattr(response.raw, 'length_remaining', None)
+    if remaining is not None and 0 < remaining <= drain_limit:
+        try:
+            response.raw.read(remaining, decode_content=False)
+        except Exception as e:
+            logger.debug('could not drain %r: %r', response, e)
+    response.close()
@@ -7,6 +7,7 @@
 #
 """Implements file-like objects for reading and writing from/to S3."""
 
+import binascii
 import io
 import contextlib
 import functools
@@ -20,6 +21,7 @@ import botocore.exceptions
 import six
 
 import smart_open.bytebuffer
+import smart_open.checksums
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +61,11 @@ SUPPORTED_SCHEMES = ("s3", "s3n", 's3u', "s3a")
 
 DEFAULT_BUFFER_SIZE = 128 * 1024
 
+DEFAULT_MAX_SKIP_SIZE = 1024**2
+"""When seeking forward by at most this many bytes, readers read and discard
+the bytes from the open stream instead of making a new request.  Discarding
+a megabyte is faster than waiting for the first byte of a new response."""
+
 START = 0
 CURRENT = 1
 END = 2
@@ -81,12 +88,38 @@ def make_range_string(start, stop=None):
     return 'bytes=%d-%d' % (start, stop)
 
 
+def check_range(byte_range):
+    """Validate a (start, stop) byte range, as passed by the user.
+
+    Parameters
+    ----------
+    byte_range: tuple
+        The offset of the first byte in the range, and the offset of the byte
+        after the last byte in the range, or None to read until the end.
+
+    Returns
+    -------
+    tuple
+        The (start, stop) pair.
+    """
+    try:
+        start, stop = byte_range
+    except (TypeError, ValueError):
+        raise ValueError('expected a (start, stop) tuple, got %r' % (byte_range, ))
+    if start is None:
+        start = 0
+    if start < 0 or (stop is not None and stop < start):
+        raise ValueError('invalid byte range: %r' % (byte_range, ))
+    return start, stop
+
+
 def open(
         bucket_id,
         key_id,
         mode,
         version_id=None,
         buffer_size=DEFAULT_BUFFER_SIZE,
+        max_buffer_size=smart_open.bytebuffer.DEFAULT_MAX_CHUNK_SIZE,
         min_part_size=DEFAULT_MIN_PART_SIZE,
         session=None,
         resource_kwargs=None,
@@ -94,6 +127,9 @@ def open(
         multipart_upload=True,
         singlepart_upload_kwargs=None,
         object_kwargs=None,
+        range=None,
+        verify_checksum=False,
+        max_skip_size=DEFAULT_MAX_SKIP_SIZE,
         ):
     """Open an S3 object for reading or writing.
 
@@ -107,6 +143,11 @@ def open(
         The mode for opening the object.  Must be either "rb" or "wb".
     buffer_size: int, optional
         The buffer size to use when performing I/O.
+    max_buffer_size: int, optional
+        While reading sequentially, the buffer grows from buffer_size up to
+        this size, depending on the observed throughput.  It shrinks back to
+        buffer_size after seeking.  Set to buffer_size to disable.
+        For reading only.
     min_part_size: int, optional
         The minimum part size for multipart uploads.  For writing only.
     session: object, optional
@@ -114,7 +155,8 @@ def open(
     resource_kwargs: dict, optional
         Keyword arguments to use when accessing the S3 resource for reading or writing.
     multipart_upload_kwargs: dict, optional
-        Additional parameters to pass to boto3's initiate_multipart_upload function.
+        Additional parameters to pass to boto3's initiate_multipart_upload function
+        (or to S3.Object.put, if the output fits into a single part).
         For writing only.
     singlepart_upload_kwargs: dict, optional
         Additional parameters to pass to boto3's S3.Object.put function when using single
@@ -122,16 +164,38 @@ def open(
         For writing only.
     multipart_upload: bool, optional
         Default: `True`
-        If set to `True`, will use multipart upload for writing to S3. If set
+        If set to `True`, will use multipart upload for writing to S3, but
+        only once more than `min_part_size` bytes have been written: smaller
+        outputs are sent with a single PUT request on close. If set
         to `False`, S3 upload will use the S3 Single-Part Upload API, which
-        is more ideal for small file sizes.
+        buffers the entire output in memory, and never uses multipart
+        uploads, e.g. for S3-compatible stores that do not support them.
         For writing only.
     version_id: str, optional
         Version of the object, used when reading object.
-        If None, will fetch the most recent version.
+        If None, will fetch the most recent version.  Subsequent requests
+        made by the same reader are pinned to the version (or ETag) of the
+        object seen by the first request.
     object_kwargs: dict, optional
         Additional parameters to pass to boto3's object.get function.
         Used during reading only.
+    range: tuple, optional
+        A (start, stop) pair of byte offsets.  If set, the reader only sees
+        the bytes of the object in the range [start, stop): positions are
+        relative to start, and the reader never requests bytes outside the range.
+        Set stop to None to read until the end of the object.
+        For reading only.
+    verify_checksum: bool, optional
+        If True, compute the MD5 of the data as it passes through, without
+        reading it again.  When reading, compare it against the ETag at the
+        end of the object.  That's only possible for objects uploaded in a
+        single part without KMS or customer-provided keys, so the check is
+        skipped for other objects.  When writing, send the MD5 of each
+        request's body as Content-MD5, so S3 rejects corrupted parts.
+    max_skip_size: int, optional
+        When seeking forward by at most this many bytes, read and discard
+        them from the open stream instead of making a new request.
+        Set to 0 to always make a new request.  For reading only.
 
     """
     logger.debug('%r', locals())
@@ -141,15 +205,22 @@ def open(
     if (mode == WRITE_BINARY) and (version_id is not None):
         raise ValueError("version_id must be None when writing")
 
+    if (mode == WRITE_BINARY) and (range is not None):
+        raise ValueError("range must be None when writing")
+
     if mode == READ_BINARY:
         fileobj = Reader(
             bucket_id,
             key_id,
             version_id=version_id,
             buffer_size=buffer_size,
+            max_buffer_size=max_buffer_size,
             session=session,
             resource_kwargs=resource_kwargs,
             object_kwargs=object_kwargs,
+            byte_range=range,
+            verify_checksum=verify_checksum,
+            max_skip_size=max_skip_size,
         )
     elif mode == WRITE_BINARY:
         if multipart_upload:
@@ -160,6 +231,7 @@ def open(
                 session=session,
                 upload_kwargs=multipart_upload_kwargs,
                 resource_kwargs=resource_kwargs,
+                verify_checksum=verify_checksum,
             )
         else:
             fileobj = SinglepartWriter(
@@ -168,6 +240,7 @@ def open(
                 session=session,
                 upload_kwargs=singlepart_upload_kwargs,
                 resource_kwargs=resource_kwargs,
+                verify_checksum=verify_checksum,
             )
     else:
         assert False, 'unexpected mode: %r' % mode
@@ -187,38 +260,109 @@ def _get(s3_object, version=None, **kwargs):
         )
 
 
+def _etag_to_md5(response):
+    """Return the MD5 digest of the object, if its ETag is one, or None otherwise."""
+    etag = response.get('ETag')
+    if not etag or response.get('ServerSideEncryption') == 'aws:kms' or response.get('SSECustomerAlgorithm'):
+        return None
+    etag = etag.strip('"')
+    #
+    # Objects uploaded in multiple parts have ETags like "<md5 of md5s>-<num_parts>".
+    #
+    if len(etag) != 32 or '-' in etag:
+        return None
+    try:
+        return binascii.unhexlify(etag)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_content_range(content_range):
+    """Return the number of bytes in a Content-Range, e.g. "bytes 0-9/100"."""
+    byte_range = content_range.split()[-1].split('/')[0]
+    start, stop = byte_range.split('-')
+    return int(stop) - int(start) + 1
+
+
 class _SeekableRawReader(object):
     """Read an S3 object.
 
     This class is internal to the S3 submodule.
+
+    If bounded is True, the reader sees only content_length bytes of the
+    object starting at offset, and requests exactly those bytes.  If verifier
+    is set, the reader reports everything it reads to it.  If body is set, it
+    is the stream of an already issued request, starting at position zero.
     """
 
-    def __init__(self, s3_object, content_length, version_id=None, object_kwargs=None):
+    def __init__(self, s3_object, content_length, version_id=None, object_kwargs=None, etag=None,
+                 offset=0, bounded=False, verifier=None, body=None,
+                 max_skip_size=DEFAULT_MAX_SKIP_SIZE):
         self._object = s3_object
+        self._max_skip_size = max_skip_size
+        self._verifier = verifier
         self._content_length = content_length
         self._version_id = version_id
+        self._offset = offset
+        self._bounded = bounded
         self._position = 0
-        self._body = None
+        self._body = body
         self._object_kwargs = object_kwargs if object_kwargs else {}
 
+        #
+        # If we know which version of the object we're reading, then S3 will
+        # always give us data from that version.  Otherwise, use the ETag to
+        # make sure that the object does not get replaced between requests.
+        #
+        if version_id is None and etag is not None:
+            self._object_kwargs = dict(self._object_kwargs)
+            self._object_kwargs.setdefault('IfMatch', etag)
+
     def seek(self, position):
         """Seek to the specified position (byte offset) in the S3 key.
 
         :param int position: The byte offset from the beginning of the key.
+
+        If the stream of the current request is open, and position is at
+        most max_skip_size bytes ahead, read up to position instead of
+        making a new request.
         """
+        distance = position - self._position
+        if self._body is not None and 0 <= distance <= self._max_skip_size:
+            self._skip(distance)
+            return
+
         #
         # Close old body explicitly.
         # When first seek() after __init__(), self._body is not exist.
         #
+        self.close()
+        self._position = position
+
+    def _skip(self, size):
+        """Read and discard size bytes."""
+        while size > 0:
+            binary = self.read(min(size, DEFAULT_BUFFER_SIZE))
+            if not binary:
+                break
+            size -= len(binary)
+
+    def close(self):
+        """Close the stream of the current request, if any."""
         if self._body is not None:
             self._body.close()
         self._body = None
-        self._position = position
 
     def _load_body(self):
         """Build a continuous connection with the remote peer starts from the current postion.
         """
-        range_string = make_range_string(self._position)
+        if self._bounded:
+            range_string = make_range_string(
+                self._offset + self._position,
+                self._offset + self._content_length - 1,
+            )
+        else:
+            range_string = make_range_string(self._offset + self._position)
         logger.debug('content_length: %r range_string: %r', self._content_length, range_string)
 
         if self._position == self._content_length == 0 or self._position == self._content_length:
@@ -245,6 +389,8 @@ class _SeekableRawReader(object):
     def read(self, size=-1):
         """Read from the continuous connection with the remote peer."""
         if self._position >= self._content_length:
+            if self._verifier is not None:
+                self._verifier.verify()
             return b''
         if self._body is None:
             # When the first read() after __init__() or seek(), self._body is not exist.
@@ -256,18 +402,30 @@ class _SeekableRawReader(object):
             # The underlying connection of the self._body was closed by the remote peer.
             self._load_body()
             binary = self._read_from_body(size)
+        if self._verifier is not None:
+            self._verifier.update(self._position, binary)
         self._position += len(binary)
+        if self._verifier is not None and self._position >= self._content_length:
+            self._verifier.verify()
         return binary
 
 
 class Reader(io.BufferedIOBase):
     """Reads bytes from S3.
 
-    Implements the io.BufferedIOBase interface of the standard library."""
+    Implements the io.BufferedIOBase interface of the standard library.
+
+    If verify_checksum is True, the reader computes the MD5 of the object as
+    it reads it, and compares it against the ETag.  It raises
+    smart_open.checksums.ChecksumError at the end of the object if they
+    differ.  This works only if the reader sees the entire object (no range),
+    and eventually reads all of it in order."""
 
     def __init__(self, bucket, key, version_id=None, buffer_size=DEFAULT_BUFFER_SIZE,
                  line_terminator=BINARY_NEWLINE, session=None, resource_kwargs=None,
-                 object_kwargs=None):
+                 object_kwargs=None, byte_range=None,
+                 max_buffer_size=smart_open.bytebuffer.DEFAULT_MAX_CHUNK_SIZE,
+                 verify_checksum=False, max_skip_size=DEFAULT_MAX_SKIP_SIZE):
 
         self._buffer_size = buffer_size
 
@@ -285,20 +443,66 @@ class Reader(io.BufferedIOBase):
         s3 = session.resource('s3', **resource_kwargs)
         self._object = s3.Object(bucket, key)
         self._version_id = version_id
-        self._content_length = _get(
-            self._object,
-            version=self._version_id,
-            **self._object_kwargs
-        )['ContentLength']
+
+        get_kwargs = dict(self._object_kwargs)
+        if byte_range is None:
+            range_start, range_stop = 0, None
+        else:
+            range_start, range_stop = check_range(byte_range)
+            get_kwargs['Range'] = make_range_string(
+                range_start,
+                None if range_stop is None else range_stop - 1,
+            )
+
+        if range_start == range_stop:
+            #
+            # There is nothing to read, so don't bother the server.
+            #
+            response = {'ContentLength': 0, 'Body': None}
+        else:
+            response = _get(
+                self._object,
+                version=self._version_id,
+                **get_kwargs
+            )
+        if 'ContentRange' in response:
+            self._content_length = _parse_content_range(response['ContentRange'])
+        else:
+            self._content_length = response['ContentLength']
+        self._etag = response.get('ETag')
+        self._last_modified = response.get('LastModified')
+
+        #
+        # Pin subsequent range requests to the version we've just seen, if
+        # the bucket is versioned.  This costs us nothing extra, and protects
+        # us from reading parts of different objects if the key gets overwritten.
+        #
+        if self._version_id is None:
+            self._version_id = response.get('VersionId')
+
+        self._verifier = None
+        expected_md5 = _etag_to_md5(response) if verify_checksum else None
+        if expected_md5 is not None and range_start == 0 and range_stop is None:
+            self._verifier = smart_open.checksums.Verifier(self._content_length, 's3://%s/%s' % (bucket, key))
+            self._verifier.expect(smart_open.checksums.MD5, expected_md5)
+        elif verify_checksum:
+            logger.info('cannot verify the checksum of s3://%s/%s', bucket, key)
 
         self._raw_reader = _SeekableRawReader(
             self._object,
             self._content_length,
             self._version_id,
             self._object_kwargs,
+            etag=self._etag,
+            offset=range_start,
+            bounded=byte_range is not None,
+            verifier=self._verifier,
+            body=response['Body'],
+            max_skip_size=max_skip_size,
         )
         self._current_pos = 0
         self._buffer = smart_open.bytebuffer.ByteBuffer(buffer_size)
+        self._tuner = smart_open.bytebuffer.ChunkSizeTuner(self._buffer, max_size=max_buffer_size)
         self._eof = False
         self._line_terminator = line_terminator
 
@@ -315,6 +519,7 @@ class Reader(io.BufferedIOBase):
         """Flush and close this stream."""
         logger.debug("close: called")
         self._object = None
+        self._raw_reader.close()
 
     def readable(self):
         """Return True if the stream can be read from."""
@@ -402,12 +607,19 @@ class Reader(io.BufferedIOBase):
         else:
             new_position = self._content_length + offset
         new_position = clamp(new_position, 0, self._content_length)
-        self._current_pos = new_position
-        self._raw_reader.seek(new_position)
+        distance = new_position - self._current_pos
+        if 0 <= distance <= len(self._buffer):
+            #
+            # We already have the data at the new position in our buffer.
+            #
+            self._read_from_buffer(distance)
+        else:
+            self._current_pos = new_position
+            self._raw_reader.seek(new_position)
+            self._buffer.empty()
+            self._tuner.reset()
+            self._eof = self._current_pos == self._content_length
         logger.debug('new_position: %r', self._current_pos)
-
-        self._buffer.empty()
-        self._eof = self._current_pos == self._content_length
         return self._current_pos
 
     def tell(self):
@@ -438,6 +650,30 @@ class Reader(io.BufferedIOBase):
         s3 = self._session.resource('s3', **self._resource_kwargs)
         return s3.Object(self._object.bucket_name, self._object.key)
 
+    @property
+    def etag(self):
+        """The ETag of the object being read, as reported by the first GET request."""
+        return self._etag
+
+    @property
+    def version_id(self):
+        """The version of the object being read, or None if the bucket is not versioned."""
+        return self._version_id
+
+    @property
+    def last_modified(self):
+        """The modification time of the object being read, as a datetime."""
+        return self._last_modified
+
+    @property
+    def checksum_algorithm(self):
+        """The checksum the reader verifies, and its implementation, e.g. "md5 (hashlib)".
+
+        None if the reader does not verify a checksum."""
+        if self._verifier is None:
+            return None
+        return self._verifier.algorithm
+
     #
     # Internal methods.
     #
@@ -451,9 +687,9 @@ class Reader(io.BufferedIOBase):
         return part
 
     def _fill_buffer(self, size=-1):
-        size = max(size, self._buffer._chunk_size)
+        size = max(size, self._buffer.chunk_size)
         while len(self._buffer) < size and not self._eof:
-            bytes_read = self._buffer.fill(self._raw_reader)
+            bytes_read = self._tuner.fill(self._raw_reader)
             if bytes_read == 0:
                 logger.debug('reached EOF while filling buffer')
                 self._eof = True
@@ -487,7 +723,14 @@ class Reader(io.BufferedIOBase):
 class MultipartWriter(io.BufferedIOBase):
     """Writes bytes to S3 using the multi part API.
 
-    Implements the io.BufferedIOBase interface of the standard library."""
+    Implements the io.BufferedIOBase interface of the standard library.
+
+    The multipart upload is initiated lazily, once the buffered data exceeds
+    min_part_size.  If the stream gets closed before that happens, the data is
+    written with a single PUT request instead.
+
+    If verify_checksum is True, the writer computes the MD5 of each part as it
+    gets written, and sends it as the Content-MD5 of the part."""
 
     def __init__(
             self,
@@ -497,6 +740,7 @@ class MultipartWriter(io.BufferedIOBase):
             session=None,
             resource_kwargs=None,
             upload_kwargs=None,
+            verify_checksum=False,
             ):
         if min_part_size < MIN_MIN_PART_SIZE:
             logger.warning("S3 requires minimum part size >= 5MB; \
@@ -514,22 +758,16 @@ multipart upload may fail")
         self._upload_kwargs = upload_kwargs
 
         s3 = session.resource('s3', **resource_kwargs)
-        try:
-            self._object = s3.Object(bucket, key)
-            self._min_part_size = min_part_size
-            partial = functools.partial(self._object.initiate_multipart_upload, **self._upload_kwargs)
-            self._mp = _retry_if_failed(partial)
-        except botocore.client.ClientError as error:
-            raise ValueError(
-                'the bucket %r does not exist, or is forbidden for access (%r)' % (
-                    bucket, error
-                )
-            )
+        self._object = s3.Object(bucket, key)
+        self._min_part_size = min_part_size
+        self._mp = None
+        self._closed = False
 
         self._buf = io.BytesIO()
         self._total_bytes = 0
         self._total_parts = 0
         self._parts = []
+        self._hasher = smart_open.checksums.new(smart_open.checksums.MD5) if verify_checksum else None
 
         #
         # This member is part of the io.BufferedIOBase interface.
@@ -544,31 +782,32 @@ multipart upload may fail")
     #
     def close(self):
         logger.debug("closing")
-        if self._buf.tell():
-            self._upload_next_part()
+        if self._closed:
+            return
 
-        if self._total_bytes and self._mp:
+        if self._mp is None:
+            #
+            # We never got enough data to justify a multipart upload, so
+            # send everything we have in a single request.  This also takes
+            # care of empty input: AWS refuses to complete a multipart upload
+            # with no parts, but is happy to PUT an empty object.
+            #
+            self._upload_single_part()
+        else:
+            if self._buf.tell():
+                self._upload_next_part()
             partial = functools.partial(self._mp.complete, MultipartUpload={'Parts': self._parts})
             _retry_if_failed(partial)
             logger.debug("completed multipart upload")
-        elif self._mp:
-            #
-            # AWS complains with "The XML you provided was not well-formed or
-            # did not validate against our published schema" when the input is
-            # completely empty => abort the upload, no file created.
-            #
-            # We work around this by creating an empty file explicitly.
-            #
-            logger.info("empty input, ignoring multipart upload")
-            assert self._mp, "no multipart upload in progress"
-            self._mp.abort()
-            self._object.put(Body=b'')
+
         self._mp = None
+        self._buf = None
+        self._closed = True
         logger.debug("successfully closed")
 
     @property
     def closed(self):
-        return self._mp is None
+        return self._closed
 
     def writable(self):
         """Return True if the stream supports writing."""
@@ -595,6 +834,8 @@ multipart upload may fail")
 
         length = self._buf.write(b)
         self._total_bytes += length
+        if self._hasher is not None:
+            self._hasher.update(b)
 
         if self._buf.tell() >= self._min_part_size:
             self._upload_next_part()
@@ -602,10 +843,12 @@ multipart upload may fail")
         return length
 
     def terminate(self):
-        """Cancel the underlying multipart upload."""
-        assert self._mp, "no multipart upload in progress"
-        self._mp.abort()
+        """Cancel the underlying multipart upload, if one is in progress."""
+        if self._mp is not None:
+            self._mp.abort()
         self._mp = None
+        self._buf = None
+        self._closed = True
 
     def to_boto3(self):
         """Create an **independent** `boto3.s3.Object` instance that points to
@@ -619,10 +862,55 @@ multipart upload may fail")
         s3 = self._session.resource('s3', **self._resource_kwargs)
         return s3.Object(self._object.bucket_name, self._object.key)
 
+    @property
+    def checksum_algorithm(self):
+        """The checksum the writer sends, and its implementation, e.g. "md5 (hashlib)".
+
+        None if the writer does not send a checksum."""
+        return smart_open.checksums.describe(self._hasher)
+
     #
     # Internal methods.
     #
+    def _checksum_kwargs(self):
+        """Return the Content-MD5 of the buffered data, and start checksumming the next part."""
+        if self._hasher is None:
+            return {}
+        kwargs = {'ContentMD5': smart_open.checksums.b64encode(self._hasher.digest())}
+        self._hasher = smart_open.checksums.new(smart_open.checksums.MD5)
+        return kwargs
+
+    def _initiate_multipart_upload(self):
+        logger.debug("initiating multipart upload")
+        partial = functools.partial(self._object.initiate_multipart_upload, **self._upload_kwargs)
+        try:
+            self._mp = _retry_if_failed(partial)
+        except botocore.client.ClientError as error:
+            raise ValueError(
+                'the bucket %r does not exist, or is forbidden for access (%r)' % (
+                    self._object.bucket_name, error
+                )
+            )
+
+    def _upload_single_part(self):
+        logger.info("uploading %i bytes in a single part", self._buf.tell())
+        self._buf.seek(0)
+        kwargs = dict(self._upload_kwargs, **self._checksum_kwargs())
+        partial = functools.partial(self._object.put, Body=self._buf, **kwargs)
+        try:
+            _retry_if_failed(partial)
+        except botocore.client.ClientError as error:
+            raise ValueError(
+                'the bucket %r does not exist, or is forbidden for access (%r)' % (
+                    self._object.bucket_name, error
+                )
+            )
+        logger.debug("single part upload finished")
+
     def _upload_next_part(self):
+        if self._mp is None:
+            self._initiate_multipart_upload()
+
         part_num = self._total_parts + 1
         logger.info("uploading part #%i, %i bytes (total %.3fGB)",
                     part_num, self._buf.tell(), self._total_bytes / 1024.0 ** 3)
@@ -635,7 +923,7 @@ multipart upload may fail")
         # of a temporary connection problem, so this part needs to be
         # especially robust.
         #
-        upload = _retry_if_failed(functools.partial(part.upload, Body=self._buf))
+        upload = _retry_if_failed(functools.partial(part.upload, Body=self._buf, **self._checksum_kwargs()))
 
         self._parts.append({'ETag': upload['ETag'], 'PartNumber': part_num})
         logger.debug("upload of part #%i finished" % part_num)
@@ -677,7 +965,13 @@ class SinglepartWriter(io.BufferedIOBase):
     Implements the io.BufferedIOBase interface of the standard library.
 
     This class buffers all of its input in memory until its `close` method is called. Only then will
-    the data be written to S3 and the buffer is released."""
+    the data be written to S3 and the buffer is released.  The single part
+    API needs the entire body in one request, so unlike MultipartWriter,
+    this writer cannot stream.  Like MultipartWriter, it does not talk to S3
+    before then, so a missing bucket raises ValueError on close.
+
+    If verify_checksum is True, the writer computes the MD5 of the data as it
+    gets written, and sends it as the Content-MD5 of the upload."""
 
     def __init__(
             self,
@@ -686,6 +980,7 @@ class SinglepartWriter(io.BufferedIOBase):
             session=None,
             resource_kwargs=None,
             upload_kwargs=None,
+            verify_checksum=False,
             ):
 
         self._session = session
@@ -701,14 +996,11 @@ class SinglepartWriter(io.BufferedIOBase):
         self._upload_kwargs = upload_kwargs
 
         s3 = session.resource('s3', **resource_kwargs)
-        try:
-            self._object = s3.Object(bucket, key)
-            s3.meta.client.head_bucket(Bucket=bucket)
-        except botocore.client.ClientError:
-            raise ValueError('the bucket %r does not exist, or is forbidden for access' % bucket)
+        self._object = s3.Object(bucket, key)
 
         self._buf = io.BytesIO()
         self._total_bytes = 0
+        self._hasher = smart_open.checksums.new(smart_open.checksums.MD5) if verify_checksum else None
 
         #
         # This member is part of the io.BufferedIOBase interface.
@@ -727,8 +1019,11 @@ class SinglepartWriter(io.BufferedIOBase):
 
         self._buf.seek(0)
 
+        kwargs = dict(self._upload_kwargs)
+        if self._hasher is not None:
+            kwargs['ContentMD5'] = smart_open.checksums.b64encode(self._hasher.digest())
         try:
-            self._object.put(Body=self._buf, **self._upload_kwargs)
+            self._object.put(Body=self._buf, **kwargs)
         except botocore.client.ClientError:
             raise ValueError(
                 'the bucket %r does not exist, or is forbidden for access' % self._object.bucket_name)
@@ -763,12 +1058,21 @@ class SinglepartWriter(io.BufferedIOBase):
 
         length = self._buf.write(b)
         self._total_bytes += length
+        if self._hasher is not None:
+            self._hasher.update(b)
         return length
 
     def terminate(self):
         """Nothing to cancel in single-part uploads."""
         return
 
+    @property
+    def checksum_algorithm(self):
+        """The checksum the writer sends, and its implementation, e.g. "md5 (hashlib)".
+
+        None if the writer does not send a checksum."""
+        return smart_open.checksums.describe(self._hasher)
+
     #
     # Internal methods.
     #
@@ -1006,13 +1310,27 @@ class DummyPool(object):
 
 
 class ConcurrentFuturesPool(object):
-    """A class that mimics multiprocessing.pool.Pool but uses concurrent futures instead of processes."""
-    def __init__(self, max_workers):
+    """A class that mimics multiprocessing.pool.Pool but uses concurrent futures instead of processes.
+
+    Keeps at most `window` items in flight, so that a slow consumer (or one
+    that stops iterating early) does not cause the pool to work through all
+    the items and hold on to their results.
+    """
+    def __init__(self, max_workers, window=None):
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        self.window = window if window else max_workers * 2
 
     def imap_unordered(self, function, items):
-        futures = [self.executor.submit(function, item) for item in items]
-        for future in concurrent.futures.as_completed(futures):
+        pending = set()
+        for item in items:
+            pending.add(self.executor.submit(function, item))
+            if len(pending) >= self.window:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    yield future.result()
+        for future in concurrent.futures.as_completed(pending):
             yield future.result()
 
     def terminate(self):
@@ -1020,8 +1338,19 @@ class ConcurrentFuturesPool(object):
 
 
 @contextlib.contextmanager
-def _create_process_pool(processes=1):
-    if _MULTIPROCESSING and processes:
+def _create_process_pool(processes=1, threads=False):
+    """Create a pool of workers.
+
+    Parameters
+    ----------
+    processes: int, optional
+        The number of workers.
+    threads: bool, optional
+        If True, use threads instead of processes.  Necessary when the work
+        items or the function refer to objects that cannot be pickled.
+
+    """
+    if _MULTIPROCESSING and processes and not threads:
         logger.info("creating multiprocessing pool with %i workers", processes)
         pool = multiprocessing.pool.Pool(processes=processes)
     elif _CONCURRENT_FUTURES and processes:
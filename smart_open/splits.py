@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Radim Rehurek <me@radimrehurek.com>
+#
+# This code is distributed under the terms and conditions
+# from the MIT License (MIT).
+#
+"""Split a single large object into record-aligned byte ranges for parallel processing.
+
+The main entry points are the :func:`~smart_open.splits.split` and
+:func:`~smart_open.splits.map_lines` functions.
+
+"""
+
+import functools
+import io
+import logging
+import os.path as P
+
+import six
+
+import smart_open.bytebuffer
+import smart_open.s3
+import smart_open.smart_open_lib
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_SIZE = 64 * 1024
+"""How many bytes to read at a time when looking for a record boundary."""
+
+DEFAULT_MAX_SPLIT_SIZE = 64 * 1024**2
+"""The largest split map_lines hands to a single worker task, in bytes."""
+
+_BINARY_NEWLINE = b'\n'
+
+_RANGE_SCHEMES = smart_open.s3.SUPPORTED_SCHEMES + ('gs', 'http', 'https')
+"""Transports that accept the range transport parameter."""
+
+
+class InputSplit(object):
+    """A contiguous, record-aligned byte range [start, stop) of an object.
+
+    Instances are cheap, picklable descriptions of the range: they hold no
+    open connections, so they can be sent to other threads or processes.
+    Use the :meth:`open` method to actually read the range.
+    """
+
+    def __init__(self, uri, start, stop, transport_params=None, line_terminator=_BINARY_NEWLINE):
+        self.uri = uri
+        self.start = start
+        self.stop = stop
+        self.transport_params = transport_params
+        self.line_terminator = line_terminator
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, InputSplit)
+            and (self.uri, self.start, self.stop) == (other.uri, other.start, other.stop)
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "smart_open.splits.InputSplit(uri=%r, start=%r, stop=%r)" % (
+            self.uri, self.start, self.stop,
+        )
+
+    def open(self):
+        """Open the range for reading.
+
+        Returns
+        -------
+        BoundedReader
+            A binary file-like object that yields the bytes of this range only.
+        """
+        transport_params = dict(self.transport_params or {})
+
+        #
+        # Where possible, ask the transport for exactly the bytes we need, so
+        # that the server does not send us any data past the end of the split.
+        #
+        if self._supports_range():
+            transport_params['range'] = (self.start, self.stop)
+            start, stop = 0, self.stop - self.start
+        else:
+            start, stop = self.start, self.stop
+
+        fileobj = smart_open.smart_open_lib.open(
+            self.uri,
+            'rb',
+            ignore_ext=True,
+            transport_params=transport_params,
+        )
+        return BoundedReader(fileobj, start, stop, line_terminator=self.line_terminator)
+
+    def _supports_range(self):
+        if not isinstance(self.uri, six.string_types):
+            return False
+        scheme = smart_open.smart_open_lib._parse_uri(self.uri).scheme
+        return scheme in _RANGE_SCHEMES
+
+
+class BoundedReader(io.BufferedIOBase):
+    """Confines reads from a seekable binary stream to the [start, stop) window.
+
+    Positions reported by tell() and accepted by seek() are relative to start.
+    Lines returned by readline() and iteration end with line_terminator.
+
+    Implements the io.BufferedIOBase interface of the standard library."""
+
+    def __init__(self, fileobj, start, stop, line_terminator=_BINARY_NEWLINE,
+                 buffer_size=DEFAULT_PROBE_SIZE):
+        self._fileobj = fileobj
+        self._start = start
+        self._stop = stop
+        self._position = 0
+        self._line_terminator = line_terminator
+
+        #
+        # Holds the bytes following _position that readline has fetched
+        # from fileobj, but not returned yet.
+        #
+        self._buffer = smart_open.bytebuffer.ByteBuffer(buffer_size)
+
+        if start:
+            self._fileobj.seek(start)
+
+        #
+        # This member is part of the io.BufferedIOBase interface.
+        #
+        self.raw = None
+
+    #
+    # Override some methods from io.IOBase.
+    #
+    def close(self):
+        """Flush and close this stream."""
+        if self._fileobj is not None:
+            self._fileobj.close()
+            self._fileobj = None
+
+    @property
+    def closed(self):
+        return self._fileobj is None
+
+    def readable(self):
+        """Return True if the stream can be read from."""
+        return True
+
+    def seekable(self):
+        """If False, seek(), tell() and truncate() will raise IOError.
+
+        We offer only seek support, and no truncate support."""
+        return True
+
+    #
+    # io.BufferedIOBase methods.
+    #
+    def detach(self):
+        """Unsupported."""
+        raise io.UnsupportedOperation
+
+    def seek(self, offset, whence=smart_open.s3.START):
+        """Seek to the specified position, relative to the start of the window.
+
+        :param int offset: The offset in bytes.
+        :param int whence: Where the offset is from.
+
+        Returns the position after seeking."""
+        if whence not in smart_open.s3.WHENCE_CHOICES:
+            raise ValueError('invalid whence, expected one of %r' % smart_open.s3.WHENCE_CHOICES)
+
+        if whence == smart_open.s3.START:
+            new_position = offset
+        elif whence == smart_open.s3.CURRENT:
+            new_position = self._position + offset
+        else:
+            new_position = self._stop - self._start + offset
+        new_position = smart_open.s3.clamp(new_position, 0, self._stop - self._start)
+
+        if new_position != self._position:
+            self._fileobj.seek(self._start + new_position)
+            self._position = new_position
+            self._buffer.empty()
+        return self._position
+
+    def tell(self):
+        """Return the current position within the window."""
+        return self._position
+
+    def truncate(self, size=None):
+        """Unsupported."""
+        raise io.UnsupportedOperation
+
+    def read(self, size=-1):
+        """Read up to size bytes from the window and return them."""
+        remaining = self._stop - self._start - self._position
+        if size < 0 or size > remaining:
+            size = remaining
+        if size == 0:
+            return b''
+
+        data = self._buffer.read(size)
+        if len(data) < size:
+            data += self._fileobj.read(size - len(data))
+        self._position += len(data)
+        return data
+
+    def read1(self, size=-1):
+        """This is the same as read()."""
+        return self.read(size=size)
+
+    def readinto(self, b):
+        """Read up to len(b) bytes into b, and return the number of bytes
+        read."""
+        data = self.read(len(b))
+        if not data:
+            return 0
+        b[:len(data)] = data
+        return len(data)
+
+    def readline(self, limit=-1):
+        """Read up to and including the next line terminator, but at most limit
+        bytes if limit is not negative.  Returns the bytes read."""
+        terminator = self._line_terminator
+        #
+        # A terminator may straddle two fills of the buffer, so keep this many
+        # bytes in the buffer until we know they do not start a terminator.
+        #
+        keep = len(terminator) - 1
+
+        line = io.BytesIO()
+        while limit < 0 or line.tell() < limit:
+            index = self._buffer.find(terminator)
+            if index != -1:
+                size = index + len(terminator)
+            else:
+                size = max(len(self._buffer) - keep, 0)
+            if limit >= 0:
+                size = min(size, limit - line.tell())
+            line.write(self._read_from_buffer(size))
+
+            if index != -1:
+                break
+            if self._fill_buffer() == 0:
+                #
+                # The window is over, so what we kept is not a terminator.
+                #
+                size = len(self._buffer)
+                if limit >= 0:
+                    size = min(size, limit - line.tell())
+                line.write(self._read_from_buffer(size))
+                break
+
+        return line.getvalue()
+
+    def _read_from_buffer(self, size):
+        part = self._buffer.read(size)
+        self._position += len(part)
+        return part
+
+    def _fill_buffer(self):
+        """Read more of the window into the buffer, and return the number of bytes read."""
+        unbuffered = self._stop - self._start - self._position - len(self._buffer)
+        if unbuffered <= 0:
+            return 0
+        return self._buffer.fill(self._fileobj, size=unbuffered)
+
+
+def split(
+        uri,
+        num_splits,
+        line_terminator=_BINARY_NEWLINE,
+        probe_size=DEFAULT_PROBE_SIZE,
+        transport_params=None,
+        max_split_size=None,
+        ):
+    """Split an object into byte ranges that start and end on record boundaries.
+
+    Parameters
+    ----------
+    uri: str
+        The object to split.  Works with any transport that supports seeking,
+        e.g. local files, S3, GCS and HTTP servers that support range requests.
+    num_splits: int
+        The desired number of splits.
+    line_terminator: bytes, optional
+        The byte sequence that terminates each record.
+    probe_size: int, optional
+        How many bytes to read at a time when looking for a record boundary
+        near each split point.
+    transport_params: dict, optional
+        Additional parameters for the transport layer.  These also get used
+        when opening each split.
+    max_split_size: int, optional
+        If set, create more than num_splits splits where necessary, so that
+        each split is roughly at most this many bytes long.
+
+    Returns
+    -------
+    list of InputSplit
+        Non-empty, contiguous splits covering the entire object.  There may be
+        fewer than num_splits of them if the object contains few records,
+        and none at all if the object is empty.
+
+    Notes
+    -----
+    Each split point is moved forward to the start of the next record, so a
+    record always belongs to the split that contains its first byte.  Only a
+    small window around each split point gets read.
+
+    Compressed objects cannot be split, because their byte offsets do not
+    correspond to record boundaries.
+
+    Examples
+    --------
+
+      >>> for s in split('s3://bucket/big.jsonl', 4):
+      ...     with s.open() as fin:
+      ...         for line in fin:
+      ...             process(line)
+
+    """
+    if num_splits < 1:
+        raise ValueError('num_splits must be a positive integer, got %r' % num_splits)
+    if not line_terminator:
+        raise ValueError('line_terminator must not be empty')
+
+    if isinstance(uri, six.string_types):
+        _, extension = P.splitext(uri.split('?')[0])
+        if extension in smart_open.smart_open_lib._COMPRESSOR_REGISTRY:
+            raise ValueError('compressed objects cannot be split: %r' % uri)
+
+    with smart_open.smart_open_lib.open(
+        uri,
+        'rb',
+        ignore_ext=True,
+        transport_params=dict(transport_params or {}),
+    ) as fin:
+        if not fin.seekable():
+            raise ValueError('%r does not support seeking, so it cannot be split' % uri)
+        size = fin.seek(0, smart_open.s3.END)
+        if max_split_size:
+            num_splits = max(num_splits, -(-size // max_split_size))
+
+        boundaries = [0]
+        for i in range(1, num_splits):
+            nominal = size * i // num_splits
+            if nominal <= boundaries[-1]:
+                continue
+            boundary = _find_boundary(fin, nominal, size, line_terminator, probe_size)
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+        if size > boundaries[-1]:
+            boundaries.append(size)
+
+    logger.debug('split %r (%d bytes) at %r', uri, size, boundaries)
+    return [
+        InputSplit(uri, start, stop, transport_params=transport_params, line_terminator=line_terminator)
+        for (start, stop) in zip(boundaries, boundaries[1:])
+    ]
+
+
+def _find_boundary(fin, position, size, line_terminator, probe_size):
+    """Return the start of the first record that starts at or after position."""
+    #
+    # Start looking a little before the nominal position, so that we notice
+    # the case where a record starts exactly at that position.
+    #
+    start = max(position - len(line_terminator), 0)
+    fin.seek(start)
+
+    window = b''
+    window_start = start
+    while window_start + len(window) < size:
+        probe = fin.read(probe_size)
+        if not probe:
+            break
+        window += probe
+
+        index = window.find(line_terminator)
+        if index != -1:
+            return window_start + index + len(line_terminator)
+
+        #
+        # Keep a tail in case the terminator straddles two probes.
+        #
+        keep = len(line_terminator) - 1
+        window_start += len(window) - keep
+        window = window[len(window) - keep:] if keep else b''
+
+    return size
+
+
+def _map_split(input_split, function=None):
+    with input_split.open() as fin:
+        return [function(line) for line in fin]
+
+
+def map_lines(
+        uri,
+        function,
+        workers=16,
+        line_terminator=_BINARY_NEWLINE,
+        transport_params=None,
+        max_split_size=DEFAULT_MAX_SPLIT_SIZE,
+        ):
+    """Apply a function to each line of an object, processing splits in parallel.
+
+    Parameters
+    ----------
+    uri: str
+        The object to process.  See :func:`split` for what objects are supported.
+    function: callable
+        Accepts a single line (bytes, including the terminator) and returns
+        the result.  Must be picklable (i.e. defined at the top level of a
+        module) if multiprocessing is available.
+    workers: int, optional
+        The number of workers to process the splits with.  We create at least
+        this many splits.
+    line_terminator: bytes, optional
+        The byte sequence that terminates each line.
+    transport_params: dict, optional
+        Additional parameters for the transport layer.  Must be picklable if
+        multiprocessing is available.
+    max_split_size: int, optional
+        The largest split, in bytes, to process in a single worker task.
+        A task returns the results for its entire split at once, so this
+        bounds how many results a worker holds (and sends back) at a time.
+
+    Yields
+    ------
+    object
+        The result of calling function on each line.  Lines within a split
+        are processed in order, but splits are yielded as soon as they are
+        done, so the overall order is not guaranteed.
+
+    """
+    input_splits = split(
+        uri,
+        workers,
+        line_terminator=line_terminator,
+        transport_params=transport_params,
+        max_split_size=max_split_size,
+    )
+    map_split = functools.partial(_map_split, function=function)
+    with smart_open.s3._create_process_pool(processes=workers) as pool:
+        for results in pool.imap_unordered(map_split, input_splits):
+            for result in results:
+                yield result
@@ -187,3 +187,82 @@ class ByteBufferTest(unittest.TestCase):
         expected = [b'one!', b'two.', b'three,']
         actual = [buf.readline(b'!'), buf.readline(b'.'), buf.readline(b',')]
         self.assertEqual(expected, actual)
+
+    def test_readline_multibyte_terminator(self):
+        buf = smart_open.bytebuffer.ByteBuffer()
+        buf.fill([b'ab\r\ncd\r\nef'])
+        self.assertEqual(buf.readline(b'\r\n'), b'ab\r\n')
+        self.assertEqual(buf.readline(b'\r\n'), b'cd\r\n')
+        self.assertEqual(buf.readline(b'\r\n'), b'ef')
+
+    def test_find(self):
+        buf = smart_open.bytebuffer.ByteBuffer()
+        buf.fill([b'hello, world'])
+        buf.read(3)
+        self.assertEqual(buf.find(b'o'), 1)
+        self.assertEqual(buf.find(b'world'), 4)
+        self.assertEqual(buf.find(b'h'), -1)
+
+
+class FakeClock(object):
+    """Advances by a fixed number of seconds every other call, i.e. every fill."""
+
+    def __init__(self, seconds_per_fill):
+        self.seconds_per_fill = seconds_per_fill
+        self.now = 0.0
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls % 2 == 0:
+            self.now += self.seconds_per_fill
+        return self.now
+
+
+class ChunkSizeTunerTest(unittest.TestCase):
+    def tune(self, seconds_per_fill, num_fills=10, max_size=CHUNK_SIZE * 8):
+        buf = smart_open.bytebuffer.ByteBuffer(CHUNK_SIZE)
+        tuner = smart_open.bytebuffer.ChunkSizeTuner(
+            buf, max_size=max_size, target_seconds=0.1, clock=FakeClock(seconds_per_fill),
+        )
+        source = io.BytesIO(random_byte_string(CHUNK_SIZE * 100))
+        for _ in range(num_fills):
+            tuner.fill(source)
+            buf.read()
+        return buf, tuner
+
+    def test_grows_when_fast(self):
+        buf, _ = self.tune(seconds_per_fill=0.01, num_fills=2)
+        self.assertEqual(buf.chunk_size, CHUNK_SIZE * 2)
+
+    def test_grows_up_to_max(self):
+        buf, _ = self.tune(seconds_per_fill=0.01)
+        self.assertEqual(buf.chunk_size, CHUNK_SIZE * 8)
+
+    def test_steady_when_on_target(self):
+        buf, _ = self.tune(seconds_per_fill=0.15)
+        self.assertEqual(buf.chunk_size, CHUNK_SIZE)
+
+    def test_ignores_first_fill(self):
+        buf, _ = self.tune(seconds_per_fill=0.01, num_fills=1)
+        self.assertEqual(buf.chunk_size, CHUNK_SIZE)
+
+    def test_reset(self):
+        buf, tuner = self.tune(seconds_per_fill=0.01)
+        tuner.reset()
+        self.assertEqual(buf.chunk_size, CHUNK_SIZE)
+
+    def test_disabled(self):
+        buf, _ = self.tune(seconds_per_fill=0.01, max_size=CHUNK_SIZE)
+        self.assertEqual(buf.chunk_size, CHUNK_SIZE)
+
+    def test_fill_does_not_lose_data(self):
+        contents = random_byte_string(CHUNK_SIZE * 20)
+        buf = smart_open.bytebuffer.ByteBuffer(CHUNK_SIZE)
+        tuner = smart_open.bytebuffer.ChunkSizeTuner(buf, max_size=CHUNK_SIZE * 4, target_seconds=10)
+        source = io.BytesIO(contents)
+
+        actual = b''
+        while tuner.fill(source):
+            actual += buf.read()
+        self.assertEqual(actual, contents)
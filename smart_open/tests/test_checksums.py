@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Radim Rehurek <me@radimrehurek.com>
+#
+# This code is distributed under the terms and conditions
+# from the MIT License (MIT).
+#
+import hashlib
+import unittest
+
+import smart_open.checksums
+
+CONTENTS = b'123456789'
+CONTENTS_CRC32C = 'e3069283'
+
+
+class Crc32cTest(unittest.TestCase):
+    def test_known_value(self):
+        self.assertEqual(smart_open.checksums.Crc32c(CONTENTS).hexdigest(), CONTENTS_CRC32C)
+
+    def test_empty(self):
+        self.assertEqual(smart_open.checksums.Crc32c().digest(), b'\x00\x00\x00\x00')
+
+    def test_incremental(self):
+        crc = smart_open.checksums.Crc32c()
+        crc.update(CONTENTS[:4])
+        crc.update(bytearray(CONTENTS[4:7]))
+        crc.update(memoryview(CONTENTS)[7:])
+        self.assertEqual(crc.hexdigest(), CONTENTS_CRC32C)
+
+    def test_python_implementation(self):
+        table = smart_open.checksums._TABLE
+        smart_open.checksums._TABLE = smart_open.checksums._make_table()
+        try:
+            crc = smart_open.checksums._python_extend(0, CONTENTS[:4])
+            crc = smart_open.checksums._python_extend(crc, CONTENTS[4:])
+        finally:
+            smart_open.checksums._TABLE = table
+        self.assertEqual('%08x' % crc, CONTENTS_CRC32C)
+
+    def test_new(self):
+        crc32c = smart_open.checksums.new(smart_open.checksums.CRC32C)
+        self.assertEqual(crc32c.name, 'crc32c')
+        md5 = smart_open.checksums.new(smart_open.checksums.MD5)
+        self.assertEqual(md5.name, 'md5')
+        self.assertRaises(ValueError, smart_open.checksums.new, 'sha1024')
+
+    def test_describe(self):
+        crc32c = smart_open.checksums.new(smart_open.checksums.CRC32C)
+        self.assertEqual(
+            smart_open.checksums.describe(crc32c),
+            'crc32c (%s)' % smart_open.checksums.CRC32C_IMPLEMENTATION,
+        )
+        self.assertEqual(smart_open.checksums.describe(hashlib.md5()), 'md5 (hashlib)')
+        self.assertIsNone(smart_open.checksums.describe(None))
+
+
+class VerifierTest(unittest.TestCase):
+    def setUp(self):
+        self.verifier = smart_open.checksums.Verifier(len(CONTENTS), 'test')
+        self.verifier.expect(smart_open.checksums.MD5, hashlib.md5(CONTENTS).digest())
+
+    def test_sequential(self):
+        self.verifier.update(0, CONTENTS[:5])
+        self.verifier.update(5, CONTENTS[5:])
+        self.assertTrue(self.verifier.verify())
+        self.assertEqual(self.verifier.algorithm, 'md5 (hashlib)')
+
+    def test_mismatch(self):
+        self.verifier.update(0, CONTENTS[:5])
+        self.verifier.update(5, b'xxxx')
+        self.assertRaises(smart_open.checksums.ChecksumError, self.verifier.verify)
+
+    def test_incomplete(self):
+        self.verifier.update(0, CONTENTS[:5])
+        self.assertFalse(self.verifier.verify())
+
+    def test_gap(self):
+        self.verifier.update(0, CONTENTS[:3])
+        self.verifier.update(5, CONTENTS[5:])
+        self.assertFalse(self.verifier.verify())
+
+    def test_overlapping_reads(self):
+        self.verifier.update(0, CONTENTS[:5])
+        self.verifier.update(2, CONTENTS[2:7])
+        self.verifier.update(0, CONTENTS[:3])
+        self.verifier.update(7, CONTENTS[7:])
+        self.assertTrue(self.verifier.verify())
+
+    def test_no_expected_checksum(self):
+        verifier = smart_open.checksums.Verifier(len(CONTENTS), 'test')
+        verifier.update(0, CONTENTS)
+        self.assertFalse(verifier.verify())
+        self.assertIsNone(verifier.algorithm)
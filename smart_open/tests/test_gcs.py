@@ -5,11 +5,16 @@
 # This code is distributed under the terms and conditions
 # from the MIT License (MIT).
 #
+import base64
 import gzip
+import hashlib
 import inspect
 import io
+import json
 import logging
 import os
+import re
+import tempfile
 import time
 import uuid
 import unittest
@@ -18,13 +23,15 @@ try:
 except ImportError:
     import mock
 import warnings
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 
 import google.cloud
 import google.api_core.exceptions
+import requests
 import six
 
 import smart_open
+import smart_open.checksums
 
 BUCKET_NAME = 'test-smartopen-{}'.format(uuid.uuid4().hex)
 BLOB_NAME = 'test-blob'
@@ -38,9 +45,23 @@ RESUMABLE_SESSION_URI_TEMPLATE = (
     '%(upload_id)s'
 )
 
+DOWNLOAD_URL_REGEX = re.compile(
+    r'https?://[^/]+/download/storage/v1/b/(?P<bucket>[^/]+)/o/(?P<blob>[^?]+)'
+    r'\?alt=media(&generation=(?P<generation>\d+))?(&userProject=(?P<user_project>[^&]+))?$'
+)
+
 logger = logging.getLogger(__name__)
 
 
+def make_goog_hash(contents):
+    crc32c = smart_open.checksums.Crc32c(contents).digest()
+    md5 = hashlib.md5(contents).digest()
+    return 'crc32c=%s,md5=%s' % (
+        base64.b64encode(crc32c).decode('ascii'),
+        base64.b64encode(md5).decode('ascii'),
+    )
+
+
 def ignore_resource_warnings():
     if six.PY2:
         return
@@ -77,8 +98,8 @@ class FakeBucket(object):
         except KeyError:
             raise google.cloud.exceptions.NotFound('Blob {} not found'.format(blob_id))
 
-    def list_blobs(self):
-        return list(self.blobs.values())
+    def list_blobs(self, prefix=None):
+        return [blob for blob in self.blobs.values() if blob.name.startswith(prefix or '')]
 
     def delete_blob(self, blob):
         del self.blobs[blob.name]
@@ -143,6 +164,8 @@ class FakeBlob(object):
         self._bucket = bucket  # type: FakeBucket
         self._exists = False
         self.__contents = io.BytesIO()
+        self.generation = None
+        self.content_encoding = None
 
         if create:
             self._create_if_not_exists()
@@ -156,6 +179,11 @@ class FakeBlob(object):
         self._bucket.register_upload(upload)
         return resumeable_upload_url
 
+    def compose(self, sources):
+        assert len(sources) <= 32, 'GCS composes at most 32 objects at a time'
+        self.upload_from_string(b''.join(source.download_as_string() for source in sources))
+        self._create_if_not_exists()
+
     def delete(self):
         self._bucket.delete_blob(self)
         self._exists = False
@@ -163,21 +191,26 @@ class FakeBlob(object):
     def download_as_string(self, start=0, end=None):
         # mimics Google's API by returning bytes, despite the method name
         # https://google-cloud-python.readthedocs.io/en/0.32.0/storage/blobs.html#google.cloud.storage.blob.Blob.download_as_string
+        # Like Google's API, the end of the range is inclusive.
+        contents = self.__contents.getvalue()
         if end is None:
-            end = self.__contents.tell()
-        self.__contents.seek(start)
-        return self.__contents.read(end - start)
+            end = len(contents) - 1
+        return contents[start:end + 1]
 
     def exists(self, client=None):
         return self._exists
 
-    def upload_from_string(self, data):
+    def upload_from_string(self, data, content_type=None, checksum=None):
         # mimics Google's API by accepting bytes or str, despite the method name
         # https://google-cloud-python.readthedocs.io/en/0.32.0/storage/blobs.html#google.cloud.storage.blob.Blob.upload_from_string
-        if isinstance(data, six.string_types):
-            data = bytes(data) if six.PY2 else bytes(data, 'utf8')
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+        if not isinstance(data, six.binary_type):
+            # like google.cloud._helpers._to_bytes
+            raise TypeError('%r could not be converted to bytes' % (data, ))
         self.__contents = io.BytesIO(data)
         self.__contents.seek(0, io.SEEK_END)
+        self.generation = (self.generation or 0) + 1
 
     def write(self, data):
         self.upload_from_string(data)
@@ -219,8 +252,8 @@ class FakeBlobTest(unittest.TestCase):
         blob.upload_from_string(contents)
         self.assertEqual(blob.download_as_string(), b'test')
         self.assertEqual(blob.download_as_string(start=2), b'st')
-        self.assertEqual(blob.download_as_string(end=2), b'te')
-        self.assertEqual(blob.download_as_string(start=2, end=3), b's')
+        self.assertEqual(blob.download_as_string(end=1), b'te')
+        self.assertEqual(blob.download_as_string(start=2, end=2), b's')
 
     def test_size(self):
         blob = FakeBlob('fake-blob', self.bucket)
@@ -304,7 +337,22 @@ class FakeBlobUpload(object):
         self._finished = False
         self.__contents = io.BytesIO()
 
-    def write(self, data):
+    @property
+    def size(self):
+        return len(self.__contents.getvalue())
+
+    @property
+    def contents(self):
+        return self.__contents.getvalue()
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def write(self, data, offset=None):
+        if offset is not None:
+            self.__contents.seek(offset)
+            self.__contents.truncate()
         self.__contents.write(data)
 
     def finish(self):
@@ -319,32 +367,126 @@ class FakeBlobUpload(object):
         self.__contents = None
 
 
+FakeRequest = namedtuple('FakeRequest', 'method url')
+
+
 class FakeResponse(object):
-    def __init__(self, status_code=200, text=None):
+    def __init__(self, status_code=200, text=None, raw=None, request=None, headers=None):
         self.status_code = status_code
         self.text = text
+        self.raw = raw
+        self.request = request
+        self.headers = headers if headers is not None else {}
+
+    def json(self):
+        raise ValueError('no JSON in fake responses')
+
+    def close(self):
+        pass
 
 
 class FakeAuthorizedSession(object):
     def __init__(self, credentials):
         self._credentials = credentials  # type: FakeCredentials
+        self.streamed_bodies = 0
 
     def delete(self, upload_url):
         upload = self._credentials.client.uploads.pop(upload_url)
         upload.terminate()
 
-    def put(self, url, data=None, headers=None):
-        upload = self._credentials.client.uploads[url]
+    def get(self, url, headers=None, stream=False):
+        match = DOWNLOAD_URL_REGEX.match(url)
+        not_found = FakeResponse(404, text='No such object', request=FakeRequest('GET', url))
+        try:
+            bucket = self._credentials.client.bucket(six.moves.urllib.parse.unquote(match.group('bucket')))
+            blob = bucket.get_blob(six.moves.urllib.parse.unquote(match.group('blob')))
+        except google.cloud.exceptions.NotFound:
+            return not_found
+        if blob.generation is None:
+            #
+            # Nothing has been uploaded to the blob yet, so it would not exist in GCS.
+            #
+            return not_found
+        if match.group('generation') and int(match.group('generation')) != blob.generation:
+            return not_found
+
+        contents = blob.download_as_string()
+        response_headers = {
+            'x-goog-generation': str(blob.generation),
+            'x-goog-hash': make_goog_hash(contents),
+        }
+        range_string = (headers or {}).get('Range')
+        if blob.content_encoding == 'gzip':
+            if 'gzip' not in (headers or {}).get('Accept-Encoding', ''):
+                #
+                # Like GCS, decompress the blob on the fly, and ignore the range.
+                #
+                contents = gzip.GzipFile(fileobj=io.BytesIO(contents)).read()
+                return FakeResponse(200, raw=io.BytesIO(contents), headers={})
+            response_headers['Content-Encoding'] = 'gzip'
+
+        if range_string is None:
+            response_headers['Content-Length'] = str(len(contents))
+            return FakeResponse(200, raw=io.BytesIO(contents), headers=response_headers)
+
+        start, end = range_string.replace('bytes=', '').split('-')
+        start = int(start)
+        end = min(int(end), len(contents) - 1) if end else len(contents) - 1
+        if start >= len(contents):
+            return FakeResponse(416, text='Requested range not satisfiable', request=FakeRequest('GET', url))
+        response_headers['Content-Range'] = 'bytes %d-%d/%d' % (start, end, len(contents))
+        return FakeResponse(206, raw=io.BytesIO(contents[start:end + 1]), headers=response_headers)
 
+    def put(self, url, data=None, headers=None):
+        upload = self._credentials.client.uploads.get(url)
+        if upload is None:
+            return FakeResponse(404, text='No such upload', request=FakeRequest('PUT', url))
+
+        content_range = headers.get('Content-Range', '')
+        if content_range.startswith('bytes */'):
+            #
+            # A status check, or a request to finalize the upload.
+            #
+            if not content_range.endswith(smart_open.gcs._UNKNOWN_FILE_SIZE):
+                upload.finish()
+            if upload.finished:
+                return FakeResponse(200)
+            return self._incomplete(upload)
+
+        offset = None
+        match = re.match(r'bytes (\d+)-', content_range)
+        if match:
+            offset = int(match.group(1))
         if data is not None:
             if hasattr(data, 'read'):
-                upload.write(data.read())
+                upload.write(data.read(), offset)
+            elif isinstance(data, (six.binary_type, memoryview)):
+                upload.write(data, offset)
             else:
-                upload.write(data)
-        if not headers.get('Content-Range', '').endswith(smart_open.gcs._UNKNOWN_FILE_SIZE):
+                #
+                # Like requests, send other iterables chunk by chunk.
+                #
+                self.streamed_bodies += 1
+                for chunk in data:
+                    upload.write(chunk, offset)
+                    offset = None
+        if not content_range.endswith(smart_open.gcs._UNKNOWN_FILE_SIZE):
+            expected_hash = headers.get('X-Goog-Hash')
+            if expected_hash and expected_hash not in make_goog_hash(upload.contents).split(','):
+                return FakeResponse(
+                    400, text='Provided checksum does not match', request=FakeRequest('PUT', url),
+                )
             upload.finish()
             return FakeResponse(200)
-        return FakeResponse(smart_open.gcs._UPLOAD_INCOMPLETE_STATUS_CODE)
+        return self._incomplete(upload)
+
+    @staticmethod
+    def _incomplete(upload):
+        """Tell the client how much of the upload we have persisted, like GCS."""
+        response_headers = {}
+        if upload.size:
+            response_headers['Range'] = 'bytes=0-%d' % (upload.size - 1)
+        return FakeResponse(smart_open.gcs._UPLOAD_INCOMPLETE_STATUS_CODE, headers=response_headers)
 
     @staticmethod
     def _blob_with_url(url, client):
@@ -407,6 +549,10 @@ def get_blob():
     return bucket.blob(BLOB_NAME)
 
 
+def get_blob_contents(blob_name):
+    return get_bucket().blob(blob_name).download_as_string()
+
+
 def cleanup_bucket():
     bucket = get_bucket()
 
@@ -660,6 +806,161 @@ class SeekableBufferedInputBaseTest(unittest.TestCase):
 
         self.assertEqual(data, content)
 
+    def test_sequential_reads_use_one_request(self):
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        real_get = FakeAuthorizedSession.get
+        with mock.patch.object(FakeAuthorizedSession, 'get', autospec=True, side_effect=real_get) as get:
+            with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', buffer_size=4, max_buffer_size=4) as fin:
+                self.assertEqual(list(fin), content.splitlines(True))
+            self.assertEqual(get.call_count, 1)
+
+            with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', buffer_size=4, max_skip_size=0) as fin:
+                fin.seek(11)
+                self.assertEqual(fin.read(3), b'in\n')
+            _, kwargs = get.call_args
+            self.assertEqual(kwargs['headers']['Range'], 'bytes=11-22')
+
+    def test_short_forward_seeks_skip_on_open_stream(self):
+        content = b'englishman\nin\nnew\nyork\n' * 10
+        put_to_bucket(contents=content)
+
+        real_get = FakeAuthorizedSession.get
+        with mock.patch.object(FakeAuthorizedSession, 'get', autospec=True, side_effect=real_get) as get:
+            with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', buffer_size=4, max_skip_size=16) as fin:
+                self.assertEqual(fin.read(3), content[:3])
+                self.assertEqual(fin.seek(2, whence=smart_open.gcs.CURRENT), 5)
+                self.assertEqual(fin.read(3), content[5:8])
+                self.assertEqual(fin.seek(20), 20)
+                self.assertEqual(fin.read(4), content[20:24])
+                self.assertEqual(get.call_count, 1)
+
+                fin.seek(100)
+                self.assertEqual(fin.read(4), content[100:104])
+                fin.seek(0)
+                self.assertEqual(fin.read(), content)
+            self.assertEqual(get.call_count, 3)
+
+    def test_open_makes_one_request(self):
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        real_get = FakeAuthorizedSession.get
+        with mock.patch.object(FakeClient, 'get_bucket') as get_bucket, \
+                mock.patch.object(FakeAuthorizedSession, 'get', autospec=True, side_effect=real_get) as get:
+            with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb') as fin:
+                self.assertEqual(get.call_count, 1)
+                self.assertEqual(fin.read(), content)
+            self.assertEqual(get.call_count, 1)
+        get_bucket.assert_not_called()
+
+    def test_known_blob_size(self):
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        real_get = FakeAuthorizedSession.get
+        with mock.patch.object(FakeAuthorizedSession, 'get', autospec=True, side_effect=real_get) as get:
+            with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', blob_size=len(content)) as fin:
+                get.assert_not_called()
+                self.assertEqual(fin.seek(0, whence=smart_open.gcs.END), len(content))
+                fin.seek(11)
+                self.assertEqual(fin.read(), b'in\nnew\nyork\n')
+            self.assertEqual(get.call_count, 1)
+
+    def test_read_empty(self):
+        put_to_bucket(contents=b'')
+
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb') as fin:
+            self.assertEqual(fin.read(), b'')
+
+    def test_range_starts_past_end(self):
+        put_to_bucket(contents=b'englishman\nin\nnew\nyork\n')
+
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', range=(100, None)) as fin:
+            self.assertEqual(fin.read(), b'')
+
+    def test_generation_is_pinned(self):
+        put_to_bucket(contents=b'englishman\nin\nnew\nyork\n')
+
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb') as fin:
+            self.assertEqual(fin.read(3), b'eng')
+            put_to_bucket(contents=b'something else entirely')
+            fin.seek(0)
+            self.assertRaises(google.cloud.exceptions.NotFound, fin.read)
+
+    def test_range(self):
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', range=(11, 18), buffer_size=4) as fin:
+            self.assertEqual(fin.read(), b'in\nnew\n')
+            self.assertEqual(fin.seek(0, whence=smart_open.gcs.END), 7)
+            fin.seek(3)
+            self.assertEqual(list(fin), [b'new\n'])
+
+    def test_range_past_end(self):
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', range=(18, 100)) as fin:
+            self.assertEqual(fin.read(), b'york\n')
+
+
+class ChunkBufferTest(unittest.TestCase):
+    def test_take_from_single_chunk_does_not_copy(self):
+        data = b'x' * 100
+        buf = smart_open.gcs._ChunkBuffer()
+        buf.write(data)
+
+        part = buf.take(60)
+        self.assertEqual([view.obj for view in part], [data])
+        self.assertEqual(len(part), 60)
+        self.assertEqual(buf.tell(), 40)
+
+        rest = buf.take()
+        self.assertEqual([view.obj for view in rest], [data])
+        self.assertEqual(part.tobytes() + rest.tobytes(), data)
+        self.assertEqual(buf.tell(), 0)
+
+    def test_take_across_chunks_does_not_copy(self):
+        chunks = (b'hello', b' ', b'world')
+        buf = smart_open.gcs._ChunkBuffer()
+        for chunk in chunks:
+            buf.write(chunk)
+
+        part = buf.take(7)
+        self.assertEqual([view.obj for view in part], list(chunks))
+        self.assertEqual(part.tobytes(), b'hello w')
+        self.assertEqual(buf.take(100).tobytes(), b'orld')
+        self.assertEqual(len(buf), 0)
+
+    def test_skip(self):
+        buf = smart_open.gcs._ChunkBuffer()
+        for chunk in (b'hello', b' ', b'world'):
+            buf.write(chunk)
+        part = buf.take()
+        self.assertEqual(part.skip(0).tobytes(), b'hello world')
+        self.assertEqual(part.skip(6).tobytes(), b'world')
+        self.assertEqual(part.skip(8).tobytes(), b'rld')
+        self.assertEqual(len(part.skip(11)), 0)
+
+    def test_requests_sends_chunks_with_content_length(self):
+        buf = smart_open.gcs._ChunkBuffer()
+        for chunk in (b'hello', b' ', b'world'):
+            buf.write(chunk)
+        request = requests.Request('PUT', 'https://example.com', data=buf.take()).prepare()
+        self.assertEqual(request.headers['Content-Length'], '11')
+        self.assertNotIn('Transfer-Encoding', request.headers)
+        self.assertEqual(b''.join(request.body), b'hello world')
+
+    def test_mutable_input_is_copied(self):
+        data = bytearray(b'hello')
+        buf = smart_open.gcs._ChunkBuffer()
+        buf.write(data)
+        data[:] = b'HELLO'
+        self.assertEqual(buf.take().tobytes(), b'hello')
+
 
 @maybe_mock_gcs
 class BufferedOutputBaseTest(unittest.TestCase):
@@ -867,6 +1168,463 @@ class BufferedOutputBaseTest(unittest.TestCase):
             with smart_open.gcs.open(BUCKET_NAME, 'key', 'rb') as fin:
                 fin.read()
 
+    def test_small_write_uses_single_request(self):
+        text = u'там за туманами, вечными, пьяными'.encode('utf-8')
+        real_create = FakeBlob.create_resumable_upload_session
+        with mock.patch.object(
+                FakeBlob, 'create_resumable_upload_session',
+                autospec=True, side_effect=real_create) as create, \
+                mock.patch.object(FakeAuthorizedSession, 'put', autospec=True) as put:
+            with smart_open.gcs.open(BUCKET_NAME, WRITE_BLOB_NAME, 'wb') as fout:
+                fout.write(text)
+
+        self.assertEqual(create.call_count, 0)
+        self.assertEqual(put.call_count, 0)
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), text)
+
+    def test_small_write_sends_bytes(self):
+        """Does the single request path pass the client bytes, as it requires?"""
+        for chunks in ([b'hello'], [b'hello', b' world'], [bytearray(b'hello'), memoryview(b' world')]):
+            with smart_open.gcs.open(BUCKET_NAME, WRITE_BLOB_NAME, 'wb') as fout:
+                for chunk in chunks:
+                    fout.write(chunk)
+            self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), b''.join(bytes(c) for c in chunks))
+
+    def test_large_write_uses_resumable_session(self):
+        min_part_size = 256 * 1024
+        expected = b't' * (min_part_size * 2 + 1)
+        real_create = FakeBlob.create_resumable_upload_session
+        with mock.patch.object(
+                FakeBlob, 'create_resumable_upload_session',
+                autospec=True, side_effect=real_create) as create:
+            with smart_open.gcs.open(BUCKET_NAME, WRITE_BLOB_NAME, 'wb', min_part_size=min_part_size) as fout:
+                fout.write(expected)
+
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), expected)
+
+    @unittest.skipIf(DISABLE_MOCKS, 'inspects the requests made to the mocks')
+    def test_parts_are_streamed_without_joining(self):
+        min_part_size = 256 * 1024
+        chunk = b'x' * 1024
+        with smart_open.gcs.open(BUCKET_NAME, WRITE_BLOB_NAME, 'wb', min_part_size=min_part_size) as fout:
+            for _ in range(min_part_size * 3 // len(chunk)):
+                fout.write(chunk)
+            streamed_bodies = fout._session.streamed_bodies
+        self.assertTrue(streamed_bodies >= 2)
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), chunk * (min_part_size * 3 // len(chunk)))
+
+
+def _fail_once(failure):
+    """Make the first upload of data fail after GCS commits half of it."""
+    real_put = FakeAuthorizedSession.put
+    state = {'failed': False}
+
+    def put(self, url, data=None, headers=None):
+        if data is None or state['failed']:
+            return real_put(self, url, data=data, headers=headers)
+        state['failed'] = True
+        half = len(data) // 2
+        start = int(headers['Content-Range'].split(' ')[1].split('-')[0])
+        real_put(self, url, data=data.tobytes()[:half], headers={
+            'Content-Range': 'bytes %d-%d/*' % (start, start + half - 1),
+            'Content-Length': str(half),
+        })
+        if isinstance(failure, Exception):
+            raise failure
+        return FakeResponse(failure, text='Service Unavailable')
+
+    return mock.patch.object(FakeAuthorizedSession, 'put', autospec=True, side_effect=put)
+
+
+@unittest.skipIf(DISABLE_MOCKS, 'failures can only be injected into mocks')
+@maybe_mock_gcs
+class ResumableUploadTest(unittest.TestCase):
+    def setUp(self):
+        ignore_resource_warnings()
+        self.part_size = smart_open.gcs._REQUIRED_CHUNK_MULTIPLE
+        self.expected = b''.join(b'%06d\n' % i for i in range(100000))
+        fd, self.checkpoint = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        os.unlink(self.checkpoint)
+        self.sleep = mock.patch('smart_open.gcs.time.sleep')
+        self.sleep.start()
+
+    def tearDown(self):
+        self.sleep.stop()
+        if os.path.isfile(self.checkpoint):
+            os.unlink(self.checkpoint)
+        cleanup_bucket()
+
+    def write(self, failure):
+        with _fail_once(failure):
+            with smart_open.gcs.open(
+                    BUCKET_NAME, WRITE_BLOB_NAME, 'wb', min_part_size=self.part_size) as fout:
+                fout.write(self.expected)
+
+    def test_recover_from_server_error(self):
+        self.write(503)
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), self.expected)
+        self.assertEqual(smart_open.gcs.time.sleep.call_count, 1)
+
+    def test_recover_from_connection_error(self):
+        self.write(requests.exceptions.ConnectionError('connection reset by peer'))
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), self.expected)
+
+    def test_permanent_failure_raises(self):
+        with self.assertRaises(smart_open.gcs.UploadFailedError):
+            self.write(403)
+
+    def test_partially_committed_part(self):
+        real_put = FakeAuthorizedSession.put
+        committed_sizes = []
+
+        kept = smart_open.gcs._REQUIRED_CHUNK_MULTIPLE
+
+        def put(self, url, data=None, headers=None):
+            if data is None or not len(data) or committed_sizes:
+                return real_put(self, url, data=data, headers=headers)
+            #
+            # Like GCS under load, keep only the first 256KB of the part.
+            #
+            committed_sizes.append(kept)
+            start = int(headers['Content-Range'].split(' ')[1].split('-')[0])
+            return real_put(self, url, data=data.tobytes()[:kept], headers={
+                'Content-Range': 'bytes %d-%d/*' % (start, start + kept - 1),
+                'Content-Length': str(kept),
+            })
+
+        with mock.patch.object(FakeAuthorizedSession, 'put', autospec=True, side_effect=put):
+            with smart_open.gcs.open(
+                    BUCKET_NAME, WRITE_BLOB_NAME, 'wb', min_part_size=self.part_size * 2) as fout:
+                fout.write(self.expected)
+
+        self.assertEqual(committed_sizes, [self.part_size])
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), self.expected)
+        self.assertEqual(smart_open.gcs.time.sleep.call_count, 0)
+
+    def test_finalize_without_data(self):
+        real_put = FakeAuthorizedSession.put
+        requests_sent = []
+        lost = []
+
+        def put(self, url, data=None, headers=None):
+            requests_sent.append(requests.Request('PUT', url, data=data, headers=headers).prepare())
+            response = real_put(self, url, data=data, headers=headers)
+            if not headers['Content-Range'].endswith('/*') and not lost:
+                #
+                # Lose the response to the final part, after GCS has persisted
+                # its data, but before it finalized the upload.
+                #
+                lost.append(url)
+                self._credentials.client.uploads[url]._finished = False
+                raise requests.exceptions.ConnectionError('connection reset by peer')
+            return response
+
+        with mock.patch.object(FakeAuthorizedSession, 'put', autospec=True, side_effect=put):
+            with smart_open.gcs.open(
+                    BUCKET_NAME, WRITE_BLOB_NAME, 'wb', min_part_size=self.part_size) as fout:
+                fout.write(self.expected)
+
+        finalize = requests_sent[-1]
+        self.assertEqual(finalize.headers['Content-Range'], 'bytes */%d' % len(self.expected))
+        self.assertEqual(finalize.headers['Content-Length'], '0')
+        self.assertNotIn('Transfer-Encoding', finalize.headers)
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), self.expected)
+
+    def test_resume_from_checkpoint(self):
+        with self.assertRaises(ValueError):
+            with smart_open.gcs.open(
+                    BUCKET_NAME, WRITE_BLOB_NAME, 'wb',
+                    min_part_size=self.part_size, checkpoint=self.checkpoint) as fout:
+                fout.write(self.expected[:self.part_size * 2 + 1])
+                raise ValueError('the caller failed')
+
+        self.assertTrue(os.path.isfile(self.checkpoint))
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), b'')
+
+        with smart_open.gcs.open(
+                BUCKET_NAME, WRITE_BLOB_NAME, 'wb',
+                min_part_size=self.part_size, checkpoint=self.checkpoint) as fout:
+            offset = fout.tell()
+            self.assertEqual(offset, self.part_size * 2)
+            fout.write(self.expected[offset:])
+
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), self.expected)
+        self.assertFalse(os.path.isfile(self.checkpoint))
+
+    def test_checkpoint_survives_crash_while_saving(self):
+        fout = smart_open.gcs.open(
+            BUCKET_NAME, WRITE_BLOB_NAME, 'wb',
+            min_part_size=self.part_size, checkpoint=self.checkpoint,
+        )
+        fout.write(self.expected[:self.part_size + 1])
+        with io.open(self.checkpoint) as fin:
+            saved = fin.read()
+
+        with mock.patch('smart_open.http._replace', side_effect=OSError('crashed')):
+            with self.assertRaises(OSError):
+                fout.write(self.expected[self.part_size + 1:self.part_size * 2 + 2])
+
+        with io.open(self.checkpoint) as fin:
+            self.assertEqual(fin.read(), saved)
+        directory = os.path.dirname(self.checkpoint)
+        self.assertEqual([f for f in os.listdir(directory) if f.startswith('.smart_open-checkpoint-')], [])
+        fout.terminate()
+
+    def test_expired_checkpoint_starts_over(self):
+        fout = smart_open.gcs.open(
+            BUCKET_NAME, WRITE_BLOB_NAME, 'wb',
+            min_part_size=self.part_size, checkpoint=self.checkpoint,
+        )
+        fout.write(self.expected[:self.part_size * 2])
+        fout.terminate()
+        with io.open(self.checkpoint, 'w') as fout_checkpoint:
+            fout_checkpoint.write(six.text_type(json.dumps({
+                'bucket': BUCKET_NAME,
+                'blob': WRITE_BLOB_NAME,
+                'url': fout._resumable_upload_url,
+                'offset': self.part_size,
+            })))
+
+        with smart_open.gcs.open(BUCKET_NAME, WRITE_BLOB_NAME, 'wb', checkpoint=self.checkpoint) as fout:
+            self.assertEqual(fout.tell(), 0)
+            fout.write(self.expected)
+
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), self.expected)
+
+    def test_checkpoint_for_another_blob_raises(self):
+        fout = smart_open.gcs.open(
+            BUCKET_NAME, WRITE_BLOB_NAME, 'wb',
+            min_part_size=self.part_size, checkpoint=self.checkpoint,
+        )
+        fout.write(self.expected[:self.part_size * 2])
+        with self.assertRaises(ValueError):
+            smart_open.gcs.open(BUCKET_NAME, 'another-blob', 'wb', checkpoint=self.checkpoint)
+        fout.terminate()
+
+
+@maybe_mock_gcs
+class IterBucketTest(unittest.TestCase):
+    def setUp(self):
+        ignore_resource_warnings()
+        self.expected = {}
+        for i in range(20):
+            blob_name = 'iter/blob-%02d' % i
+            self.expected[blob_name] = b'%d' % i
+            get_bucket().blob(blob_name).upload_from_string(self.expected[blob_name])
+        get_bucket().blob('other/blob').upload_from_string(b'other')
+
+    def tearDown(self):
+        cleanup_bucket()
+
+    def test_iter_bucket(self):
+        actual = dict(smart_open.gcs.iter_bucket(BUCKET_NAME, prefix='iter/', workers=4))
+        self.assertEqual(actual, self.expected)
+
+    def test_accept_key(self):
+        actual = dict(smart_open.gcs.iter_bucket(
+            BUCKET_NAME, prefix='iter/', accept_key=lambda name: name.endswith('1'),
+        ))
+        self.assertEqual(sorted(actual), ['iter/blob-01', 'iter/blob-11'])
+
+    def test_key_limit(self):
+        actual = dict(smart_open.gcs.iter_bucket(BUCKET_NAME, prefix='iter/', key_limit=5))
+        self.assertEqual(len(actual), 5)
+        for blob_name, content in actual.items():
+            self.assertEqual(content, self.expected[blob_name])
+
+    def test_no_workers(self):
+        actual = dict(smart_open.gcs.iter_bucket(BUCKET_NAME, prefix='iter/', workers=0))
+        self.assertEqual(actual, self.expected)
+
+    def test_workers_reuse_sessions(self):
+        session = FakeAuthorizedSession(storage_client._credentials)
+        with mock.patch('smart_open.gcs.google_requests.AuthorizedSession', return_value=session) as ctor:
+            actual = dict(smart_open.gcs.iter_bucket(BUCKET_NAME, prefix='iter/', workers=2))
+        self.assertEqual(actual, self.expected)
+        self.assertTrue(ctor.call_count <= 2)
+
+    def test_retry(self):
+        real_get = FakeAuthorizedSession.get
+        state = {'failed': False}
+
+        def get(self, url, headers=None, stream=False):
+            if not state['failed']:
+                state['failed'] = True
+                raise requests.exceptions.ConnectionError('connection reset by peer')
+            return real_get(self, url, headers=headers, stream=stream)
+
+        with mock.patch.object(FakeAuthorizedSession, 'get', autospec=True, side_effect=get):
+            actual = dict(smart_open.gcs.iter_bucket(BUCKET_NAME, prefix='iter/', workers=1))
+        self.assertEqual(actual, self.expected)
+
+    def test_give_up_after_retries(self):
+        with mock.patch.object(
+                FakeAuthorizedSession, 'get', autospec=True,
+                side_effect=requests.exceptions.ConnectionError('connection reset by peer')):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                list(smart_open.gcs.iter_bucket(BUCKET_NAME, prefix='iter/', retries=1))
+
+
+def _record_downloads(urls, ignore_range=False):
+    """Record the URL of every download request, optionally dropping the Range header."""
+    real_get = FakeAuthorizedSession.get
+
+    def get(self, url, headers=None, stream=False):
+        urls.append(url)
+        if ignore_range:
+            headers = dict(headers or {})
+            headers.pop('Range', None)
+        return real_get(self, url, headers=headers, stream=stream)
+
+    return mock.patch.object(FakeAuthorizedSession, 'get', autospec=True, side_effect=get)
+
+
+@unittest.skipIf(DISABLE_MOCKS, 'the test manipulates the mocks')
+@maybe_mock_gcs
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        ignore_resource_warnings()
+        self.content = b'englishman\nin\nnew\nyork\n' * 100
+
+    def tearDown(self):
+        cleanup_bucket()
+
+    def test_content_encoding(self):
+        put_to_bucket(contents=gzip.compress(self.content) if six.PY3 else b'')
+        get_bucket().get_blob(BLOB_NAME).content_encoding = 'gzip'
+
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', buffer_size=16) as fin:
+            self.assertFalse(fin.seekable())
+            self.assertEqual(fin.readline(), b'englishman\n')
+            self.assertEqual(fin.read(), self.content[11:])
+            self.assertEqual(fin.tell(), len(self.content))
+            self.assertRaises(io.UnsupportedOperation, fin.seek, 0)
+
+    def test_content_encoding_range(self):
+        put_to_bucket(contents=gzip.compress(self.content) if six.PY3 else b'')
+        get_bucket().get_blob(BLOB_NAME).content_encoding = 'gzip'
+        self.assertRaises(IOError, smart_open.gcs.open, BUCKET_NAME, BLOB_NAME, 'rb', range=(5, 10))
+
+    def test_range_ignored(self):
+        put_to_bucket(contents=self.content)
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', max_skip_size=0) as fin:
+            with _record_downloads([], ignore_range=True):
+                fin.seek(11)
+                self.assertRaises(IOError, fin.read, 3)
+
+    def test_api_endpoint_and_user_project(self):
+        put_to_bucket(contents=self.content)
+        connection = mock.Mock(API_BASE_URL='http://localhost:9023')
+        urls = []
+        with mock.patch.object(storage_client, '_connection', connection, create=True):
+            with _record_downloads(urls):
+                with smart_open.gcs.open(
+                        BUCKET_NAME, BLOB_NAME, 'rb', user_project='billed', max_skip_size=0) as fin:
+                    fin.seek(11)
+                    self.assertEqual(fin.read(3), b'in\n')
+
+        self.assertEqual(len(urls), 2)
+        for url in urls:
+            self.assertTrue(url.startswith('http://localhost:9023/download/storage/v1/b/'))
+            self.assertTrue(url.endswith('&userProject=billed'))
+
+
+def _corrupt_downloads():
+    """Flip the first byte of every download response."""
+    real_get = FakeAuthorizedSession.get
+
+    def get(self, url, headers=None, stream=False):
+        response = real_get(self, url, headers=headers, stream=stream)
+        if response.raw is not None:
+            data = bytearray(response.raw.read())
+            if data:
+                data[0] ^= 0xff
+            response.raw = io.BytesIO(bytes(data))
+        return response
+
+    return mock.patch.object(FakeAuthorizedSession, 'get', autospec=True, side_effect=get)
+
+
+@unittest.skipIf(DISABLE_MOCKS, 'corruption can only be injected into mocks')
+@maybe_mock_gcs
+class ChecksumTest(unittest.TestCase):
+    def setUp(self):
+        ignore_resource_warnings()
+        self.expected = b''.join(b'%06d\n' % i for i in range(100000))
+        self.part_size = smart_open.gcs._REQUIRED_CHUNK_MULTIPLE
+
+    def tearDown(self):
+        cleanup_bucket()
+
+    def test_read(self):
+        put_to_bucket(contents=self.expected)
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', verify_checksum=True) as fin:
+            self.assertIsNotNone(fin.checksum_algorithm)
+            self.assertEqual(fin.read(), self.expected)
+
+    def test_read_known_size(self):
+        put_to_bucket(contents=self.expected)
+        with smart_open.gcs.open(
+                BUCKET_NAME, BLOB_NAME, 'rb', verify_checksum=True, blob_size=len(self.expected)) as fin:
+            self.assertEqual(fin.read(), self.expected)
+            self.assertIsNotNone(fin.checksum_algorithm)
+
+    def test_read_corrupted(self):
+        put_to_bucket(contents=self.expected)
+        with _corrupt_downloads():
+            with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', verify_checksum=True) as fin:
+                with self.assertRaises(smart_open.checksums.ChecksumError):
+                    fin.read()
+
+    def test_read_corrupted_without_verification(self):
+        put_to_bucket(contents=self.expected)
+        with _corrupt_downloads():
+            with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb') as fin:
+                self.assertNotEqual(fin.read(), self.expected)
+
+    def test_range_is_not_verified(self):
+        put_to_bucket(contents=self.expected)
+        with smart_open.gcs.open(BUCKET_NAME, BLOB_NAME, 'rb', verify_checksum=True, range=(10, 20)) as fin:
+            self.assertIsNone(fin.checksum_algorithm)
+            self.assertEqual(fin.read(), self.expected[10:20])
+
+    def test_write(self):
+        real_put = FakeAuthorizedSession.put
+        with mock.patch.object(FakeAuthorizedSession, 'put', autospec=True, side_effect=real_put) as put:
+            with smart_open.gcs.open(
+                    BUCKET_NAME, WRITE_BLOB_NAME, 'wb',
+                    min_part_size=self.part_size, verify_checksum=True) as fout:
+                self.assertIsNotNone(fout.checksum_algorithm)
+                fout.write(self.expected)
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), self.expected)
+        final_headers = put.call_args[1]['headers']
+        self.assertIn(final_headers['X-Goog-Hash'], make_goog_hash(self.expected).split(','))
+
+    def test_write_corrupted(self):
+        with self.assertRaises(smart_open.gcs.UploadFailedError):
+            with smart_open.gcs.open(
+                    BUCKET_NAME, WRITE_BLOB_NAME, 'wb',
+                    min_part_size=self.part_size, verify_checksum=True) as fout:
+                fout.write(self.expected)
+                fout._hasher.update(b'data that never got uploaded')
+
+    def test_write_single_request(self):
+        real_upload = FakeBlob.upload_from_string
+        with mock.patch.object(
+                FakeBlob, 'upload_from_string', autospec=True, side_effect=real_upload) as upload:
+            with smart_open.gcs.open(BUCKET_NAME, WRITE_BLOB_NAME, 'wb', verify_checksum=True) as fout:
+                fout.write(b'hello')
+        self.assertEqual(upload.call_args[1]['checksum'], fout._hasher.name)
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), b'hello')
+
+    def test_composite_upload_not_supported(self):
+        with self.assertRaises(ValueError):
+            smart_open.gcs.open(
+                BUCKET_NAME, WRITE_BLOB_NAME, 'wb', composite_upload=True, verify_checksum=True,
+            )
+
 
 @maybe_mock_gcs
 class OpenTest(unittest.TestCase):
@@ -901,3 +1659,66 @@ class MakeRangeStringTest(unittest.TestCase):
 if __name__ == '__main__':
     logging.basicConfig(format='%(asctime)s : %(levelname)s : %(message)s', level=logging.INFO)
     unittest.main()
+
+
+@maybe_mock_gcs
+class CompositeWriterTest(unittest.TestCase):
+    def setUp(self):
+        ignore_resource_warnings()
+
+    def tearDown(self):
+        cleanup_bucket()
+
+    def assert_only_blob(self, expected):
+        blobs = get_bucket().list_blobs()
+        self.assertEqual([blob.name for blob in blobs], [WRITE_BLOB_NAME])
+        self.assertEqual(blobs[0].download_as_string(), expected)
+
+    def test_small(self):
+        with smart_open.gcs.open(BUCKET_NAME, WRITE_BLOB_NAME, 'wb', composite_upload=True) as fout:
+            fout.write(b'hello world')
+        self.assert_only_blob(b'hello world')
+
+    def test_empty(self):
+        with smart_open.gcs.open(BUCKET_NAME, WRITE_BLOB_NAME, 'wb', composite_upload=True):
+            pass
+        self.assert_only_blob(b'')
+
+    def test_components(self):
+        expected = b''.join(b'line %d\n' % i for i in range(20))
+        with smart_open.gcs.open(
+            BUCKET_NAME, WRITE_BLOB_NAME, 'wb',
+            composite_upload=True, component_size=10, composite_workers=3,
+        ) as fout:
+            for i in range(20):
+                fout.write(b'line %d\n' % i)
+            self.assertEqual(fout.tell(), len(expected))
+            self.assertTrue(len(fout._components) > 1)
+        self.assert_only_blob(expected)
+
+    def test_hierarchical_compose(self):
+        expected = bytes(bytearray(range(100)))
+        with smart_open.gcs.open(
+            BUCKET_NAME, WRITE_BLOB_NAME, 'wb', composite_upload=True, component_size=1,
+        ) as fout:
+            for i in range(len(expected)):
+                fout.write(expected[i:i + 1])
+        self.assert_only_blob(expected)
+
+    def test_terminate(self):
+        try:
+            with smart_open.gcs.open(
+                BUCKET_NAME, WRITE_BLOB_NAME, 'wb', composite_upload=True, component_size=10,
+            ) as fout:
+                fout.write(b'x' * 100)
+                raise ValueError('oops')
+        except ValueError:
+            pass
+
+        #
+        # Our fake bucket creates the destination blob as soon as we refer to it,
+        # so just make sure that it's empty, and that no components remain.
+        #
+        blobs = get_bucket().list_blobs()
+        self.assertEqual([blob.name for blob in blobs if blob.name != WRITE_BLOB_NAME], [])
+        self.assertEqual(get_blob_contents(WRITE_BLOB_NAME), b'')
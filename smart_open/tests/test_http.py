@@ -5,10 +5,22 @@
 # This code is distributed under the terms and conditions
 # from the MIT License (MIT).
 #
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
+import zlib
 
+import mock
+import requests
 import responses
+from six.moves import BaseHTTPServer, socketserver
 
+import smart_open
 import smart_open.http
 import smart_open.s3
 
@@ -37,6 +49,18 @@ def request_callback(request):
     return (200, HEADERS, BYTES[start:end])
 
 
+def partial_content_callback(request):
+    start, end = request.headers['range'].replace('bytes=', '').split('-', 1)
+    start = int(start)
+    end = int(end) + 1 if end else len(BYTES)
+    body = BYTES[start:end]
+    headers = {
+        'Content-Length': str(len(body)),
+        'Content-Range': 'bytes %d-%d/%d' % (start, start + len(body) - 1, len(BYTES)),
+    }
+    return (206, headers, body)
+
+
 class HttpTest(unittest.TestCase):
 
     @responses.activate
@@ -147,3 +171,672 @@ class HttpTest(unittest.TestCase):
             fin.seek(-10, whence=smart_open.s3.CURRENT)
             read_bytes_2 = fin.read(size=10)
             self.assertEqual(read_bytes_1, read_bytes_2)
+
+    @responses.activate
+    def test_range(self):
+        responses.add_callback(responses.GET, URL, callback=partial_content_callback)
+
+        with smart_open.http.open(URL, 'rb', range=(10, 20)) as fin:
+            self.assertEqual(fin.read(100), BYTES[10:20])
+            self.assertEqual(fin.seek(5), 5)
+            self.assertEqual(fin.read(100), BYTES[15:20])
+
+        range_headers = [call.request.headers['range'] for call in responses.calls]
+        self.assertEqual(range_headers, ['bytes=10-19', 'bytes=15-19'])
+
+    @responses.activate
+    def test_readline(self):
+        body = b'first line\nsecond line\n\nlast line'
+        responses.add(responses.GET, URL, body=body, stream=True)
+
+        reader = smart_open.http.SeekableBufferedInputBase(URL, buffer_size=4)
+        self.assertEqual(reader.readline(), b'first line\n')
+        self.assertEqual(reader.readline(3), b'sec')
+        self.assertEqual(reader.readline(limit=100), b'ond line\n')
+        self.assertEqual(reader.tell(), len(b'first line\nsecond line\n'))
+        self.assertEqual(list(reader), [b'\n', b'last line'])
+        self.assertEqual(reader.readline(), b'')
+
+    @responses.activate
+    def test_readline_does_not_read_bytewise(self):
+        body = b''.join(b'line %d\n' % i for i in range(1000))
+        responses.add(responses.GET, URL, body=body, stream=True)
+
+        reader = smart_open.http.SeekableBufferedInputBase(URL)
+        with mock.patch.object(reader, 'read', side_effect=AssertionError):
+            lines = list(reader)
+        self.assertEqual(lines, body.splitlines(True))
+
+    @responses.activate
+    def test_range_not_supported(self):
+        responses.add(responses.GET, URL, body=BYTES, stream=True)
+        self.assertRaises(IOError, smart_open.http.open, URL, 'rb', range=(10, 20))
+
+
+def gzip_compress(data):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as fout:
+        fout.write(data)
+    return buf.getvalue()
+
+
+class CompressedTransferTest(unittest.TestCase):
+    def setUp(self):
+        self.text = b''.join(b'{"id": %d, "name": "row"}\n' % i for i in range(1000))
+
+    def add_response(self, encoding, body):
+        headers = {'Content-Encoding': encoding, 'Accept-Ranges': 'bytes'}
+        responses.add(responses.GET, URL, body=body, headers=headers, stream=True)
+
+    @responses.activate
+    def test_gzip(self):
+        self.add_response('gzip', gzip_compress(self.text))
+        with smart_open.http.open(URL, 'rb', compress_transfer=True, buffer_size=1000) as fin:
+            self.assertFalse(fin.seekable())
+            line = fin.readline()
+            self.assertEqual(line, self.text.splitlines(True)[0])
+            self.assertEqual(fin.read(), self.text[len(line):])
+            self.assertEqual(fin.tell(), len(self.text))
+
+    @responses.activate
+    def test_deflate(self):
+        self.add_response('deflate', zlib.compress(self.text))
+        with smart_open.http.open(URL, 'rb', compress_transfer=True, buffer_size=1000) as fin:
+            self.assertEqual(fin.read(100), self.text[:100])
+            self.assertEqual(fin.read(), self.text[100:])
+
+    @responses.activate
+    def test_seek_forward(self):
+        self.add_response('gzip', gzip_compress(self.text))
+        with smart_open.http.open(URL, 'rb', compress_transfer=True, buffer_size=1000) as fin:
+            self.assertEqual(fin.read(10), self.text[:10])
+            self.assertEqual(fin.seek(5000), 5000)
+            self.assertEqual(fin.read(10), self.text[5000:5010])
+            self.assertEqual(fin.seek(10, whence=smart_open.s3.CURRENT), 5020)
+            self.assertEqual(fin.read(10), self.text[5020:5030])
+            self.assertRaises(OSError, fin.seek, 0)
+            self.assertRaises(OSError, fin.seek, 0, whence=smart_open.s3.END)
+
+        call, = responses.calls
+        self.assertEqual(call.request.headers['Accept-Encoding'], 'gzip, deflate')
+
+    @responses.activate
+    def test_uncompressed_response(self):
+        responses.add_callback(responses.GET, URL, callback=request_callback)
+        with smart_open.http.open(URL, 'rb', compress_transfer=True) as fin:
+            self.assertTrue(fin.seekable())
+            fin.seek(10)
+            self.assertEqual(fin.read(10), BYTES[10:20])
+
+    def test_range(self):
+        self.assertRaises(
+            ValueError, smart_open.http.open, URL, 'rb', compress_transfer=True, range=(0, 10),
+        )
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='smart_open-cache-')
+        self.cache = smart_open.http.Cache(self.directory)
+        smart_open.http.close_sessions()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def add_response(self, body=BYTES, status=200, **headers):
+        responses.add(responses.GET, URL, body=body, status=status, headers=headers, stream=True)
+
+    def read(self, url=URL):
+        with self.cache.open(url) as fin:
+            return fin.read()
+
+    @responses.activate
+    def test_fresh_copy_makes_no_request(self):
+        self.add_response(**{'Cache-Control': 'max-age=3600'})
+        self.assertEqual(self.read(), BYTES)
+        self.assertEqual(self.read(), BYTES)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_revalidate(self):
+        self.add_response(ETag='"v1"', **{'Last-Modified': 'Mon, 19 Oct 2026 00:00:00 GMT'})
+        self.assertEqual(self.read(), BYTES)
+
+        responses.replace(responses.GET, URL, body=b'', status=304)
+        self.assertEqual(self.read(), BYTES)
+
+        request = responses.calls[1].request
+        self.assertEqual(request.headers['If-None-Match'], '"v1"')
+        self.assertEqual(request.headers['If-Modified-Since'], 'Mon, 19 Oct 2026 00:00:00 GMT')
+
+    @responses.activate
+    def test_changed_resource(self):
+        self.add_response(ETag='"v1"')
+        self.assertEqual(self.read(), BYTES)
+
+        responses.replace(responses.GET, URL, body=b'changed', headers={'ETag': '"v2"'}, stream=True)
+        self.assertEqual(self.read(), b'changed')
+        self.assertEqual(responses.calls[1].request.headers['If-None-Match'], '"v1"')
+
+    @responses.activate
+    def test_no_store(self):
+        self.add_response(**{'Cache-Control': 'no-store, max-age=3600'})
+        self.assertEqual(self.read(), BYTES)
+        self.assertEqual(self.read(), BYTES)
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    @responses.activate
+    def test_evicts_least_recently_used(self):
+        cache = smart_open.http.Cache(self.directory, max_size=2 * len(BYTES))
+        for path in ('/a', '/b', '/c'):
+            responses.add(responses.GET, URL + path, body=BYTES, stream=True)
+
+        for path in ('/a', '/b'):
+            cache.open(URL + path).close()
+        past = time.time() - 60
+        os.utime(cache._paths(URL + '/a')[0], (past, past))
+        cache.open(URL + '/c').close()
+
+        self.assertFalse(os.path.exists(cache._paths(URL + '/a')[0]))
+        self.assertFalse(os.path.exists(cache._paths(URL + '/a')[1]))
+        self.assertTrue(os.path.exists(cache._paths(URL + '/b')[0]))
+        self.assertTrue(os.path.exists(cache._paths(URL + '/c')[0]))
+
+    @responses.activate
+    def test_error(self):
+        self.add_response(body=b'missing', status=404)
+        self.assertRaises(requests.HTTPError, self.read)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    @responses.activate
+    def test_smart_open(self):
+        self.add_response(**{'Cache-Control': 'max-age=3600'})
+        params = {'cache': self.cache}
+        for _ in range(2):
+            with smart_open.open(URL, 'rb', transport_params=params) as fin:
+                fin.seek(10)
+                self.assertEqual(fin.read(10), BYTES[10:20])
+        self.assertEqual(len(responses.calls), 1)
+
+
+class FakeHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves the server's data over keep-alive connections, honouring Range.
+
+    Records the method and Range of each download in the server's requests,
+    and the method, headers and body of each upload in its uploads.
+
+    Each number in the server's breaks makes a download break off after
+    sending that many bytes.  Honours If-Range against the server's etag."""
+    protocol_version = 'HTTP/1.1'
+
+    def handle(self):
+        self.server.connections += 1
+        BaseHTTPServer.BaseHTTPRequestHandler.handle(self)
+
+    def do_HEAD(self):
+        self.server.requests.append((self.command, self.headers.get('range')))
+        self.send_response(self.server.head_status)
+        if self.server.head_status == 200:
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('Content-Length', str(len(self.server.data)))
+        else:
+            self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.requests.append((self.command, self.headers.get('range')))
+        with self.server.lock:
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+        try:
+            self._send_data()
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def _send_data(self):
+        data = self.server.data
+        start, stop = 0, len(data)
+        status = 200
+        if 'range' in self.headers and self.headers.get('If-Range', self.server.etag) == self.server.etag:
+            first, last = self.headers['range'].replace('bytes=', '').split('-')
+            start = int(first)
+            if last:
+                stop = min(stop, int(last) + 1)
+            status = 206
+            time.sleep(self.server.range_delay)
+        self.send_response(status)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', self.server.etag)
+        if self.server.chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(stop - start))
+        if status == 206:
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, stop - 1, len(data)))
+        self.end_headers()
+
+        body = data[start:stop]
+        if self.server.chunked:
+            self.wfile.write(b'%x\r\n' % len(body))
+        if self.server.breaks:
+            self.wfile.write(body[:self.server.breaks.pop(0)])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+        if self.server.chunked:
+            self.wfile.write(b'\r\n0\r\n\r\n')
+
+    def do_PUT(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+                if size == 0:
+                    break
+            body = b''.join(parts)
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.uploads.append((self.command, dict(self.headers), body))
+
+        self.send_response(self.server.upload_status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_POST = do_PUT
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        #
+        # Clients close the connections they cannot reuse.
+        #
+        pass
+
+
+class ServerTest(unittest.TestCase):
+    """Runs a FakeServer in the background for each test."""
+    def setUp(self):
+        smart_open.http.close_sessions()
+        self.server = FakeServer(('127.0.0.1', 0), FakeHandler)
+        self.server.data = os.urandom(2 * 1024**2)
+        self.server.connections = 0
+        self.server.requests = []
+        self.server.head_status = 200
+        self.server.etag = '"v1"'
+        self.server.chunked = False
+        self.server.breaks = []
+        self.server.uploads = []
+        self.server.upload_status = 201
+        self.server.lock = threading.Lock()
+        self.server.active = self.server.max_active = 0
+        self.server.range_delay = 0
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = 'http://127.0.0.1:%d/data' % self.server.server_address[1]
+
+    def tearDown(self):
+        smart_open.http.close_sessions()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ConnectionReuseTest(ServerTest):
+    def test_seeks_reuse_connection(self):
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb', max_skip_size=0) as fin:
+            self.assertEqual(fin.read(10), data[:10])
+            for position in (1024**2, 100, 1500000, 300, 1024**2 + 10):
+                fin.seek(position)
+                self.assertEqual(fin.read(10), data[position:position + 10])
+
+        #
+        # Only the initial response, which streams the entire resource, is
+        # too large to drain.  After that, each seek only leaves a small
+        # remainder of its bounded range unread.
+        #
+        self.assertEqual(self.server.connections, 2)
+
+    def test_short_forward_seeks_skip_on_open_stream(self):
+        data = self.server.data
+        with mock.patch.object(smart_open.http, '_release_response',
+                               wraps=smart_open.http._release_response) as release:
+            with smart_open.http.open(self.url, 'rb', buffer_size=1024, max_skip_size=64 * 1024) as fin:
+                for position in range(0, len(data), 10000):
+                    fin.seek(position)
+                    self.assertEqual(fin.read(10), data[position:position + 10])
+                self.assertEqual(release.call_count, 0)
+
+    def test_read_across_ranges(self):
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb') as fin:
+            fin.seek(1000)
+            self.assertEqual(fin.read(1024**2), data[1000:1000 + 1024**2])
+            fin.seek(5)
+            self.assertEqual(fin.read(), data[5:])
+            self.assertEqual(fin.read(), b'')
+
+
+@mock.patch.object(smart_open.http, '_RESUME_SLEEP_SECONDS', 0)
+class ResumeTest(ServerTest):
+    def test_resume_cut_short(self):
+        self.server.breaks = [100000, 300000]
+        with smart_open.http.open(self.url, 'rb') as fin:
+            self.assertEqual(fin.read(), self.server.data)
+        self.assertEqual(
+            self.server.requests,
+            [('GET', None), ('GET', 'bytes=100000-'), ('GET', 'bytes=400000-')],
+        )
+
+    def test_resume_broken_chunks(self):
+        self.server.chunked = True
+        self.server.breaks = [100000]
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb', buffer_size=1024, lazy=True) as fin:
+            self.assertEqual(fin.read(10), data[:10])
+            self.assertEqual(fin.read(500000), data[10:500010])
+            self.assertEqual(fin.read(), data[500010:])
+
+    def test_readers_sharing_headers(self):
+        data = self.server.data
+        params = {'headers': {'Accept-Encoding': 'identity'}, 'max_skip_size': 0}
+        self.server.etag = '"a"'
+        with smart_open.open(self.url + '/a', 'rb', transport_params=params) as fin_a:
+            self.server.etag = '"b"'
+            with smart_open.open(self.url + '/b', 'rb', transport_params=params) as fin_b:
+                fin_b.seek(1000)
+                self.assertEqual(fin_b.read(10), data[1000:1010])
+                self.server.etag = '"a"'
+                fin_a.seek(2000)
+                self.assertEqual(fin_a.read(10), data[2000:2010])
+        self.assertEqual(params['headers'], {'Accept-Encoding': 'identity'})
+
+    def test_give_up(self):
+        self.server.breaks = [100000, 0, 0]
+        with smart_open.http.open(self.url, 'rb', max_resumes=2) as fin:
+            self.assertRaises(IOError, fin.read)
+
+    def test_resource_changed(self):
+        self.server.breaks = [100000]
+        with smart_open.http.open(self.url, 'rb', buffer_size=1024) as fin:
+            fin.read(10)
+            self.server.etag = '"v2"'
+            self.assertRaises(IOError, fin.read)
+
+    def test_resumes_reset_after_progress(self):
+        self.server.breaks = [100000, 100000, 100000]
+        with smart_open.http.open(self.url, 'rb', max_resumes=1) as fin:
+            self.assertEqual(fin.read(), self.server.data)
+
+
+@mock.patch.object(smart_open.http, '_RESUME_SLEEP_SECONDS', 0)
+class IterUrlsTest(ServerTest):
+    def test_iter_urls(self):
+        urls = ['%s/%d' % (self.url, i) for i in range(10)]
+        results = dict(smart_open.http.iter_urls(urls, workers=4))
+        self.assertEqual(sorted(results), sorted(urls))
+        for content in results.values():
+            self.assertEqual(content, self.server.data)
+        self.assertLessEqual(self.server.connections, 4)
+
+    def test_map_fn(self):
+        urls = ['%s/%d' % (self.url, i) for i in range(10)]
+        results = smart_open.http.iter_urls(urls, workers=4, map_fn=lambda url, content: (url, len(content)))
+        self.assertEqual(sorted(results), sorted((url, len(self.server.data)) for url in urls))
+
+    def test_per_host_limit(self):
+        self.server.range_delay = 0.05
+        urls = ['%s/%d' % (self.url, i) for i in range(10)]
+        results = list(smart_open.http.iter_urls(
+            urls, workers=8, per_host=2, headers={'range': 'bytes=0-99'},
+        ))
+        self.assertEqual(len(results), 10)
+        self.assertLessEqual(self.server.max_active, 2)
+
+    def test_retries(self):
+        self.server.breaks = [100, 1000]
+        results = list(smart_open.http.iter_urls([self.url], workers=1))
+        self.assertEqual(results, [(self.url, self.server.data)])
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_give_up(self):
+        self.server.breaks = [100, 100]
+        iterator = smart_open.http.iter_urls([self.url], workers=1, retries=1)
+        self.assertRaises(IOError, list, iterator)
+
+
+class LazyOpenTest(ServerTest):
+    def test_seek_to_end(self):
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb', lazy=True) as fin:
+            self.assertTrue(fin.seekable())
+            self.assertEqual(self.server.requests, [('HEAD', None)])
+            fin.seek(-22, whence=smart_open.s3.END)
+            self.assertEqual(fin.read(), data[-22:])
+
+        self.assertEqual(
+            self.server.requests, [('HEAD', None), ('GET', 'bytes=%d-' % (len(data) - 22))],
+        )
+
+    def test_read_from_start(self):
+        with smart_open.http.open(self.url, 'rb', lazy=True) as fin:
+            self.assertEqual(fin.read(), self.server.data)
+        self.assertEqual(self.server.requests, [('HEAD', None), ('GET', 'bytes=0-')])
+
+    def test_head_not_allowed(self):
+        self.server.head_status = 405
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb', lazy=True) as fin:
+            fin.seek(1000)
+            self.assertEqual(fin.read(10), data[1000:1010])
+        self.assertEqual(self.server.requests[:2], [('HEAD', None), ('GET', 'bytes=0-0')])
+
+    def test_range(self):
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb', lazy=True, range=(100, 200)) as fin:
+            self.assertEqual(fin.seek(0, whence=smart_open.s3.END), 100)
+            fin.seek(90)
+            self.assertEqual(fin.read(), data[190:200])
+        self.assertEqual(self.server.requests, [('HEAD', None), ('GET', 'bytes=190-199')])
+
+    @responses.activate
+    def test_range_requests_unsupported(self):
+        responses.add(responses.HEAD, URL, headers={'Content-Length': str(len(BYTES))})
+        responses.add(responses.GET, URL, body=BYTES, stream=True)
+        with smart_open.http.open(URL, 'rb', lazy=True) as fin:
+            self.assertFalse(fin.seekable())
+            self.assertEqual(fin.read(), BYTES)
+
+    def test_compress_transfer(self):
+        self.assertRaises(
+            ValueError, smart_open.http.open, self.url, 'rb', lazy=True, compress_transfer=True,
+        )
+
+
+@unittest.skipIf(not smart_open.http._CONCURRENT_FUTURES, 'needs concurrent.futures')
+class ParallelDownloadTest(ServerTest):
+    def test_read(self):
+        self.server.range_delay = 0.05
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb', connections=4, segment_size=256 * 1024) as fin:
+            self.assertEqual(fin.read(100), data[:100])
+            self.assertEqual(fin.read(), data[100:])
+            self.assertEqual(fin.tell(), len(data))
+        self.assertGreater(self.server.max_active, 1)
+        self.assertLessEqual(self.server.max_active, 4)
+
+    def test_seek(self):
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb', connections=4, segment_size=64 * 1024) as fin:
+            self.assertEqual(fin.read(10), data[:10])
+            fin.seek(1500000)
+            self.assertEqual(fin.read(10), data[1500000:1500010])
+            fin.seek(100)
+            self.assertEqual(fin.read(1024**2), data[100:100 + 1024**2])
+            self.assertEqual(fin.read(), data[100 + 1024**2:])
+
+    def test_small_resource(self):
+        data = self.server.data
+        with smart_open.http.open(self.url, 'rb', connections=4, segment_size=len(data) * 2) as fin:
+            self.assertEqual(fin.read(), data)
+
+    @responses.activate
+    def test_ranges_not_supported(self):
+        responses.add(responses.GET, URL, body=BYTES, stream=True)
+        with smart_open.http.open(URL, 'rb', connections=4, segment_size=16) as fin:
+            self.assertFalse(fin.seekable())
+            self.assertEqual(fin.read(), BYTES)
+        self.assertEqual(len(responses.calls), 1)
+
+
+class WriterTest(ServerTest):
+    def test_chunked(self):
+        data = self.server.data
+        with smart_open.http.open(self.url, 'wb', buffer_size=64 * 1024) as fout:
+            for i in range(0, len(data), 10000):
+                fout.write(data[i:i + 10000])
+            self.assertEqual(fout.tell(), len(data))
+
+        (method, headers, body), = self.server.uploads
+        self.assertEqual(method, 'PUT')
+        self.assertEqual(headers['Transfer-Encoding'], 'chunked')
+        self.assertEqual(body, data)
+
+    def test_content_length(self):
+        data = self.server.data
+        with smart_open.http.open(
+                self.url, 'wb', method='POST', content_length=len(data),
+                headers={'Content-Type': 'application/octet-stream'}) as fout:
+            fout.write(data[:1000])
+            fout.write(memoryview(data)[1000:])
+
+        (method, headers, body), = self.server.uploads
+        self.assertEqual(method, 'POST')
+        self.assertEqual(headers['Content-Length'], str(len(data)))
+        self.assertEqual(headers['Content-Type'], 'application/octet-stream')
+        self.assertNotIn('Transfer-Encoding', headers)
+        self.assertEqual(body, data)
+
+    def test_small_output_is_sent_in_one_request(self):
+        with smart_open.open(self.url, 'wb') as fout:
+            fout.write(b'hello')
+
+        (method, headers, body), = self.server.uploads
+        self.assertEqual(headers['Content-Length'], '5')
+        self.assertEqual(body, b'hello')
+
+    def test_wrong_content_length(self):
+        fout = smart_open.http.open(self.url, 'wb', content_length=5)
+        self.assertRaises(ValueError, fout.write, b'too long')
+        fout.write(b'1234')
+        self.assertRaises(ValueError, fout.close)
+        self.assertEqual(self.server.uploads, [])
+
+    def test_rejected(self):
+        self.server.upload_status = 403
+        fout = smart_open.http.open(self.url, 'wb', buffer_size=1024)
+        fout.write(self.server.data)
+        self.assertRaises(requests.HTTPError, fout.close)
+
+    def test_terminate_on_exception(self):
+        with self.assertRaises(ZeroDivisionError):
+            with smart_open.http.open(self.url, 'wb', buffer_size=1024) as fout:
+                fout.write(self.server.data)
+                1 / 0
+        self.assertEqual(self.server.uploads, [])
+
+    def test_shared_session_does_not_retry(self):
+        fout = smart_open.http.open(self.url, 'wb')
+        self.assertEqual(fout._session.get_adapter(self.url).max_retries.total, 0)
+        fout.terminate()
+
+
+class SessionTest(unittest.TestCase):
+    def setUp(self):
+        smart_open.http.close_sessions()
+
+    def test_shared_per_host_and_auth(self):
+        session = smart_open.http.get_session(URL + '/foo')
+        self.assertIs(smart_open.http.get_session(URL + '/bar'), session)
+        self.assertIsNot(smart_open.http.get_session(HTTPS_URL), session)
+        self.assertIsNot(smart_open.http.get_session(URL, user='me', password='pass'), session)
+
+    def test_pool_configuration(self):
+        session = smart_open.http.get_session(URL, pool_size=3, retries=5)
+        adapter = session.get_adapter(URL)
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(adapter.max_retries.total, 5)
+
+    def test_auth_reuse(self):
+        session = smart_open.http.get_session(URL, user='me', password='pass')
+        self.assertEqual(session.auth, ('me', 'pass'))
+        self.assertIs(smart_open.http.get_session(URL, user='me', password='pass'), session)
+
+    def test_key_does_not_contain_password(self):
+        smart_open.http.get_session(URL, user='me', password='secret')
+        key, = smart_open.http._SESSIONS
+        self.assertNotIn('secret', repr(key))
+
+    def test_least_recently_used_session_is_closed(self):
+        with mock.patch('smart_open.http.MAX_SESSIONS', 2):
+            first = smart_open.http.get_session('http://first')
+            second = smart_open.http.get_session('http://second')
+            self.assertIs(smart_open.http.get_session('http://first'), first)
+
+            with mock.patch.object(second, 'close') as close:
+                smart_open.http.get_session('http://third')
+            close.assert_called_once_with()
+
+        self.assertEqual(len(smart_open.http._SESSIONS), 2)
+        self.assertIs(smart_open.http.get_session('http://first'), first)
+
+    def test_close_sessions(self):
+        session = smart_open.http.get_session(URL)
+        with mock.patch.object(session, 'close') as close:
+            smart_open.http.close_sessions()
+        close.assert_called_once_with()
+        self.assertEqual(smart_open.http._SESSIONS, {})
+        self.assertIsNot(smart_open.http.get_session(URL), session)
+
+    @responses.activate
+    def test_seek_reuses_session(self):
+        responses.add_callback(responses.GET, URL, callback=request_callback)
+        reader = smart_open.http.SeekableBufferedInputBase(
+            URL, user='me', password='pass', max_skip_size=0,
+        )
+        self.assertIs(reader.session, smart_open.http.get_session(URL, user='me', password='pass'))
+
+        with mock.patch.object(reader.session, 'get', wraps=reader.session.get) as get:
+            reader.seek(10)
+            self.assertEqual(reader.read(10), BYTES[10:20])
+        self.assertEqual(get.call_count, 1)
+
+        for call in responses.calls:
+            self.assertTrue(call.request.headers['Authorization'].startswith('Basic '))
+
+    @responses.activate
+    def test_user_session(self):
+        responses.add_callback(responses.GET, URL, callback=request_callback)
+        session = requests.Session()
+        session.headers['X-Custom'] = 'yes'
+
+        with smart_open.http.open(
+                URL, 'rb', session=session, user='me', password='pass', max_skip_size=0) as fin:
+            self.assertIs(fin.session, session)
+            fin.seek(10)
+            self.assertEqual(fin.read(10), BYTES[10:20])
+
+        self.assertEqual(len(responses.calls), 2)
+        for call in responses.calls:
+            self.assertEqual(call.request.headers['X-Custom'], 'yes')
+            self.assertTrue(call.request.headers['Authorization'].startswith('Basic '))
+        self.assertEqual(smart_open.http._SESSIONS, {})
@@ -5,8 +5,11 @@
 # This code is distributed under the terms and conditions
 # from the MIT License (MIT).
 #
+import base64
 import gzip
+import hashlib
 import io
+import itertools
 import logging
 import os
 import time
@@ -21,6 +24,7 @@ import moto
 import six
 
 import smart_open
+import smart_open.checksums
 import smart_open.s3
 
 # To reduce spurious errors due to S3's eventually-consistent behavior
@@ -284,6 +288,112 @@ class SeekableBufferedInputBaseTest(unittest.TestCase):
             actual = [line.rstrip() for line in fin]
         self.assertEqual(expected, actual)
 
+    def test_metadata(self):
+        """Does the reader expose the metadata of the object it is reading?"""
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+        expected = boto3.resource('s3').Object(BUCKET_NAME, KEY_NAME)
+
+        with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb') as fin:
+            self.assertEqual(fin.etag, expected.e_tag)
+            self.assertEqual(fin.last_modified, expected.last_modified)
+            self.assertIsNone(fin.version_id)
+
+    def test_range_requests_are_conditional(self):
+        """Are range requests made after the first one pinned to the ETag?"""
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        with mock.patch('smart_open.s3._get', wraps=smart_open.s3._get) as get:
+            with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', max_skip_size=0) as fin:
+                fin.seek(11)
+                self.assertEqual(fin.read(3), b'in\n')
+
+        self.assertEqual(get.call_count, 2)
+        _, kwargs = get.call_args
+        self.assertEqual(kwargs['IfMatch'], fin.etag)
+        self.assertEqual(kwargs['Range'], 'bytes=11-')
+
+    def test_range(self):
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        with mock.patch('smart_open.s3._get', wraps=smart_open.s3._get) as get:
+            with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', range=(11, 18)) as fin:
+                self.assertEqual(fin.read(), b'in\nnew\n')
+                self.assertEqual(fin.tell(), 7)
+                self.assertEqual(fin.seek(0, whence=smart_open.s3.END), 7)
+                fin.seek(3)
+                self.assertEqual(list(fin), [b'new\n'])
+
+        for _, kwargs in get.call_args_list:
+            self.assertTrue(kwargs['Range'].startswith('bytes='))
+            self.assertTrue(kwargs['Range'].endswith('-17'))
+
+    def test_range_until_end(self):
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', range=(18, None)) as fin:
+            self.assertEqual(fin.read(), b'york\n')
+
+    def test_empty_range(self):
+        put_to_bucket(contents=b'englishman\nin\nnew\nyork\n')
+
+        with mock.patch('smart_open.s3._get', wraps=smart_open.s3._get) as get:
+            with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', range=(5, 5)) as fin:
+                self.assertEqual(fin.read(), b'')
+        self.assertEqual(get.call_count, 0)
+
+    def test_first_read_reuses_initial_request(self):
+        content = b'englishman\nin\nnew\nyork\n'
+        put_to_bucket(contents=content)
+
+        with mock.patch('smart_open.s3._get', wraps=smart_open.s3._get) as get:
+            with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb') as fin:
+                self.assertEqual(fin.read(), content)
+            with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', range=(11, 18)) as fin:
+                self.assertEqual(fin.read(), b'in\nnew\n')
+        self.assertEqual(get.call_count, 2)
+
+    def test_short_forward_seeks_skip_on_open_stream(self):
+        content = b'englishman\nin\nnew\nyork\n' * 10
+        put_to_bucket(contents=content)
+
+        with mock.patch('smart_open.s3._get', wraps=smart_open.s3._get) as get:
+            with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', buffer_size=4, max_skip_size=16) as fin:
+                self.assertEqual(fin.read(3), content[:3])
+                self.assertEqual(fin.seek(2, whence=smart_open.s3.CURRENT), 5)
+                self.assertEqual(fin.read(3), content[5:8])
+                self.assertEqual(fin.seek(20), 20)
+                self.assertEqual(fin.read(4), content[20:24])
+                self.assertEqual(get.call_count, 1)
+
+                #
+                # Long and backward seeks need a new request.
+                #
+                fin.seek(100)
+                self.assertEqual(fin.read(4), content[100:104])
+                fin.seek(0)
+                self.assertEqual(fin.read(), content)
+        self.assertEqual(get.call_count, 3)
+
+    def test_buffer_grows_while_reading_sequentially(self):
+        content = b'englishman\nin\nnew\nyork\n' * 10
+        put_to_bucket(contents=content)
+
+        with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', buffer_size=4, max_buffer_size=64) as fin:
+            self.assertEqual(list(fin), content.splitlines(True))
+            self.assertEqual(fin._buffer.chunk_size, 64)
+
+            fin.seek(0)
+            self.assertEqual(fin._buffer.chunk_size, 4)
+            self.assertEqual(fin.read(), content)
+
+    def test_invalid_range(self):
+        put_to_bucket(contents=b'englishman\nin\nnew\nyork\n')
+        self.assertRaises(ValueError, smart_open.s3.open, BUCKET_NAME, KEY_NAME, 'rb', range=(5, 4))
+
 
 @moto.mock_s3
 class MultipartWriterTest(unittest.TestCase):
@@ -416,6 +526,40 @@ class MultipartWriterTest(unittest.TestCase):
         fout.flush()
         fout.close()
 
+    def test_small_write_does_not_initiate_multipart_upload(self):
+        """Do outputs smaller than min_part_size get written with a single request?"""
+        contents = b'the spice melange\n'
+
+        with smart_open.s3.MultipartWriter(BUCKET_NAME, WRITE_KEY_NAME) as fout:
+            fout.write(contents)
+            self.assertIsNone(fout._mp)
+
+        output = list(smart_open.smart_open("s3://{}/{}".format(BUCKET_NAME, WRITE_KEY_NAME), "rb"))
+        self.assertEqual(output, [contents])
+
+    def test_multipart_upload_initiated_lazily(self):
+        """Is the multipart upload initiated only once the first part is full?"""
+        with smart_open.s3.MultipartWriter(BUCKET_NAME, WRITE_KEY_NAME, min_part_size=10) as fout:
+            fout.write(b"test")
+            self.assertIsNone(fout._mp)
+
+            fout.write(b"testtest\n")
+            self.assertIsNotNone(fout._mp)
+            self.assertEqual(fout._total_parts, 1)
+
+        output = list(smart_open.smart_open("s3://{}/{}".format(BUCKET_NAME, WRITE_KEY_NAME)))
+        self.assertEqual(output, [b"testtesttest\n"])
+
+    def test_terminate_before_upload(self):
+        """Does terminating a stream that never uploaded anything leave no trace?"""
+        fout = smart_open.s3.open(BUCKET_NAME, WRITE_KEY_NAME, 'wb')
+        fout.write(b'hello')
+        fout.terminate()
+        self.assertTrue(fout.closed)
+
+        with self.assertRaises(IOError):
+            smart_open.s3.open(BUCKET_NAME, WRITE_KEY_NAME, 'rb')
+
     def test_to_boto3(self):
         contents = b'the spice melange\n'
 
@@ -507,6 +651,16 @@ class SinglepartWriterTest(unittest.TestCase):
             with smart_open.s3.open('thisbucketdoesntexist', 'mykey', 'wb', multipart_upload=False) as fout:
                 fout.write(expected)
 
+    def test_single_request(self):
+        expected = u"выйду ночью в поле с конём".encode('utf-8')
+        with mock.patch('botocore.client.BaseClient._make_api_call',
+                        side_effect=botocore.client.BaseClient._make_api_call, autospec=True) as call:
+            with smart_open.s3.open(BUCKET_NAME, WRITE_KEY_NAME, 'wb', multipart_upload=False) as fout:
+                fout.write(expected)
+                self.assertEqual(call.call_count, 0)
+            self.assertEqual([args[1] for args, _ in call.call_args_list], ['PutObject'])
+        self.assertEqual(list(smart_open.s3.open(BUCKET_NAME, WRITE_KEY_NAME, 'rb')), [expected])
+
     def test_double_close(self):
         text = u'там за туманами, вечными, пьяными'.encode('utf-8')
         fout = smart_open.s3.open(BUCKET_NAME, 'key', 'wb', multipart_upload=False)
@@ -522,6 +676,97 @@ class SinglepartWriterTest(unittest.TestCase):
         fout.close()
 
 
+def _b64md5(data):
+    return base64.b64encode(hashlib.md5(data).digest()).decode('ascii')
+
+
+@moto.mock_s3
+class ChecksumTest(unittest.TestCase):
+    def setUp(self):
+        ignore_resource_warnings()
+        self.expected = b''.join(b'%06d\n' % i for i in range(10000))
+
+    def tearDown(self):
+        cleanup_bucket()
+
+    def test_read(self):
+        put_to_bucket(contents=self.expected)
+        with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', verify_checksum=True) as fin:
+            self.assertEqual(fin.checksum_algorithm, 'md5 (hashlib)')
+            self.assertEqual(fin.read(), self.expected)
+
+    def test_read_in_chunks(self):
+        put_to_bucket(contents=self.expected)
+        with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', verify_checksum=True, buffer_size=1000) as fin:
+            self.assertEqual(b''.join(iter(lambda: fin.read(777), b'')), self.expected)
+
+    def test_read_corrupted(self):
+        put_to_bucket(contents=self.expected)
+        real_read = smart_open.s3._SeekableRawReader._read_from_body
+
+        def read_from_body(self, size=-1):
+            return real_read(self, size).replace(b'5', b'6')
+
+        with mock.patch.object(smart_open.s3._SeekableRawReader, '_read_from_body', read_from_body):
+            with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', verify_checksum=True) as fin:
+                with self.assertRaises(smart_open.checksums.ChecksumError):
+                    fin.read()
+
+    def test_short_forward_seek_is_verified(self):
+        put_to_bucket(contents=self.expected)
+        real_read = smart_open.s3._SeekableRawReader._read_from_body
+
+        def read_from_body(self, size=-1):
+            return real_read(self, size).replace(b'000001', b'999999')
+
+        with mock.patch.object(smart_open.s3._SeekableRawReader, '_read_from_body', read_from_body):
+            with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', verify_checksum=True, buffer_size=10) as fin:
+                fin.seek(100)
+                with self.assertRaises(smart_open.checksums.ChecksumError):
+                    fin.read()
+
+    def test_range_is_not_verified(self):
+        put_to_bucket(contents=self.expected)
+        with smart_open.s3.open(BUCKET_NAME, KEY_NAME, 'rb', verify_checksum=True, range=(0, 10)) as fin:
+            self.assertIsNone(fin.checksum_algorithm)
+            self.assertEqual(fin.read(), self.expected[:10])
+
+    def test_etag_to_md5(self):
+        md5 = hashlib.md5(b'hello')
+        self.assertEqual(smart_open.s3._etag_to_md5({'ETag': '"%s"' % md5.hexdigest()}), md5.digest())
+        self.assertIsNone(smart_open.s3._etag_to_md5({'ETag': '"%s-2"' % md5.hexdigest()}))
+        self.assertIsNone(smart_open.s3._etag_to_md5({}))
+        self.assertIsNone(smart_open.s3._etag_to_md5({
+            'ETag': '"%s"' % md5.hexdigest(),
+            'ServerSideEncryption': 'aws:kms',
+        }))
+
+    def test_multipart_writer_sends_content_md5(self):
+        part_size = smart_open.s3.MIN_MIN_PART_SIZE
+        first_part = b'a' * part_size
+        second_part = b'b' * 100
+        real_retry = smart_open.s3._retry_if_failed
+        with mock.patch('smart_open.s3._retry_if_failed', side_effect=real_retry) as retry:
+            with smart_open.s3.open(
+                    BUCKET_NAME, WRITE_KEY_NAME, 'wb', min_part_size=part_size, verify_checksum=True) as fout:
+                self.assertEqual(fout.checksum_algorithm, 'md5 (hashlib)')
+                fout.write(first_part)
+                fout.write(second_part)
+
+        sent = [call[0][0].keywords.get('ContentMD5') for call in retry.call_args_list]
+        self.assertEqual([md5 for md5 in sent if md5], [_b64md5(first_part), _b64md5(second_part)])
+
+        with smart_open.s3.open(BUCKET_NAME, WRITE_KEY_NAME, 'rb') as fin:
+            self.assertEqual(fin.read(), first_part + second_part)
+
+    def test_small_write_sends_content_md5(self):
+        real_retry = smart_open.s3._retry_if_failed
+        with mock.patch('smart_open.s3._retry_if_failed', side_effect=real_retry) as retry:
+            with smart_open.s3.open(BUCKET_NAME, WRITE_KEY_NAME, 'wb', verify_checksum=True) as fout:
+                fout.write(self.expected)
+        self.assertEqual(retry.call_args[0][0].keywords['ContentMD5'], _b64md5(self.expected))
+
+
 class ClampTest(unittest.TestCase):
     def test(self):
         self.assertEqual(smart_open.s3.clamp(5, 0, 10), 5)
@@ -636,6 +881,34 @@ class IterBucketConcurrentFuturesTest(unittest.TestCase):
         self.assertEqual(sorted(keys), sorted(expected))
 
 
+@unittest.skipIf(not smart_open.s3._CONCURRENT_FUTURES, 'concurrent.futures unavailable')
+class ConcurrentFuturesPoolTest(unittest.TestCase):
+    def test_imap_unordered(self):
+        pool = smart_open.s3.ConcurrentFuturesPool(max_workers=4)
+        try:
+            actual = list(pool.imap_unordered(lambda x: x * 2, range(100)))
+        finally:
+            pool.terminate()
+        self.assertEqual(sorted(actual), [x * 2 for x in range(100)])
+
+    def test_window_is_bounded(self):
+        submitted = []
+
+        def items():
+            for i in itertools.count():
+                submitted.append(i)
+                yield i
+
+        pool = smart_open.s3.ConcurrentFuturesPool(max_workers=2, window=4)
+        try:
+            results = pool.imap_unordered(lambda x: x, items())
+            actual = [next(results) for _ in range(10)]
+        finally:
+            pool.terminate()
+        self.assertEqual(len(actual), 10)
+        self.assertTrue(len(submitted) <= 14)
+
+
 @moto.mock_s3
 @unittest.skipIf(not smart_open.s3._MULTIPROCESSING, 'multiprocessing unavailable')
 class IterBucketMultiprocessingTest(unittest.TestCase):
@@ -119,6 +119,19 @@ class TestVersionId(unittest.TestCase):
             actual = fin.read()
         self.assertEqual(actual, self.test_ver1)
 
+    def test_version_pinned_after_open(self):
+        """Does the reader keep reading the version it opened, even if the key gets overwritten?"""
+        with open(self.url, 'rb') as fin:
+            self.assertEqual(fin.version_id, self.versions[1])
+            self.assertEqual(fin.read(6), self.test_ver2[:6])
+
+            bucket = boto3.resource('s3').Bucket(BUCKET_NAME)
+            bucket.put_object(Key=self.key, Body=u"String version 3.0".encode('utf8'))
+
+            fin.seek(0)
+            actual = fin.read()
+        self.assertEqual(actual, self.test_ver2)
+
 
 if __name__ == '__main__':
     unittest.main()
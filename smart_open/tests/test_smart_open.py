@@ -940,14 +940,16 @@ class SmartOpenS3KwargsTest(unittest.TestCase):
 
     @mock.patch('boto3.Session')
     def test_s3_upload(self, mock_session):
-        smart_open.open(
+        fout = smart_open.open(
             "s3://bucket/key", 'wb', transport_params={
                 'multipart_upload_kwargs': {
                     'ServerSideEncryption': 'AES256',
                     'ContentType': 'application/json',
-                }
+                },
+                'min_part_size': 10,
             }
         )
+        fout.write(b'more than ten bytes')
 
         # Locate the s3.Object instance (mock)
         s3_resource = mock_session.return_value.resource.return_value
@@ -960,6 +962,32 @@ class SmartOpenS3KwargsTest(unittest.TestCase):
             ContentType='application/json'
         )
 
+    @mock.patch('boto3.Session')
+    def test_s3_upload_small(self, mock_session):
+        with smart_open.open(
+            "s3://bucket/key", 'wb', transport_params={
+                'multipart_upload_kwargs': {
+                    'ServerSideEncryption': 'AES256',
+                    'ContentType': 'application/json',
+                }
+            }
+        ) as fout:
+            fout.write(b'hello')
+
+        s3_resource = mock_session.return_value.resource.return_value
+        s3_object = s3_resource.Object.return_value
+
+        #
+        # Small outputs should not initiate a multipart upload, but they
+        # should still get the upload kwargs.
+        #
+        s3_object.initiate_multipart_upload.assert_not_called()
+        s3_object.put.assert_called_with(
+            Body=mock.ANY,
+            ServerSideEncryption='AES256',
+            ContentType='application/json'
+        )
+
     def test_session_read_mode(self):
         """
         Read stream should use a custom boto3.Session
@@ -1028,7 +1056,7 @@ class SmartOpenTest(unittest.TestCase):
 
         # correct write modes, incorrect scheme
         self.assertRaises(NotImplementedError, smart_open.smart_open, "hdfs:///blah.txt", "wb+")
-        self.assertRaises(NotImplementedError, smart_open.smart_open, "http:///blah.txt", "w")
+        self.assertRaises(NotImplementedError, smart_open.smart_open, "http:///blah.txt", "wb+")
         self.assertRaises(NotImplementedError, smart_open.smart_open, "s3://bucket/key", "wb+")
 
     def test_write_utf8(self):
@@ -1185,7 +1213,7 @@ class WebHdfsWriteTest(unittest.TestCase):
             "http://127.0.0.1:8440/file",
             status=201,
         )
-        smart_open.smart_open("webhdfs://127.0.0.1:8440/path/file", 'wb')
+        smart_open.smart_open("webhdfs://127.0.0.1:8440/path/file", 'wb').close()
 
         assert len(responses.calls) == 2
         path, params = responses.calls[0].request.url.split("?")
@@ -1205,31 +1233,21 @@ class WebHdfsWriteTest(unittest.TestCase):
             "http://127.0.0.1:8440/webhdfs/v1/path/file",
             callback=request_callback,
         )
-        responses.add(responses.PUT, "http://127.0.0.1:8440/file", status=201)
-        smart_open_object = smart_open.smart_open("webhdfs://127.0.0.1:8440/path/file", 'wb')
 
         def write_callback(request):
             assert request.body == u"žluťoučký koníček".encode('utf8')
             headers = {}
-            return 200, headers, ""
+            return 201, headers, ""
+
+        responses.add_callback(responses.PUT, "http://127.0.0.1:8440/file", callback=write_callback)
+        smart_open_object = smart_open.smart_open("webhdfs://127.0.0.1:8440/path/file", 'wb')
 
         test_string = u"žluťoučký koníček".encode('utf8')
-        responses.add_callback(
-            responses.POST,
-            "http://127.0.0.1:8440/webhdfs/v1/path/file",
-            callback=request_callback,
-        )
-        responses.add_callback(
-            responses.POST,
-            "http://127.0.0.1:8440/file",
-            callback=write_callback,
-        )
         smart_open_object.write(test_string)
         smart_open_object.close()
 
-        assert len(responses.calls) == 4
-        assert responses.calls[2].request.url == "http://127.0.0.1:8440/webhdfs/v1/path/file?op=APPEND"  # noqa
-        assert responses.calls[3].request.url == "http://127.0.0.1:8440/file"
+        assert len(responses.calls) == 2
+        assert responses.calls[1].request.url == "http://127.0.0.1:8440/file"
 
 
 class CompressionFormatTest(unittest.TestCase):
@@ -479,10 +479,11 @@ class SmartOpenS3KwargsTest(unittest.TestCase):
 
     @mock.patch('boto3.Session')
     def test_s3_upload(self, mock_session):
-        smart_open.smart_open("s3://bucket/key", 'wb', s3_upload={
+        fout = smart_open.smart_open("s3://bucket/key", 'wb', s3_upload={
             'ServerSideEncryption': 'AES256',
             'ContentType': 'application/json'
-        })
+        }, min_part_size=10)
+        fout.write(b'more than ten bytes')
 
         # Locate the s3.Object instance (mock)
         s3_resource = mock_session.return_value.resource.return_value
@@ -497,10 +498,11 @@ class SmartOpenS3KwargsTest(unittest.TestCase):
 
     @mock.patch('boto3.Session')
     def test_s3_upload_is_none(self, mock_session):
-        smart_open.smart_open("s3://bucket/key", 'wb', s3_upload=None)
+        with smart_open.smart_open("s3://bucket/key", 'wb', s3_upload=None) as fout:
+            fout.write(b'hello')
         s3_resource = mock_session.return_value.resource.return_value
         s3_object = s3_resource.Object.return_value
-        s3_object.initiate_multipart_upload.assert_called()
+        s3_object.put.assert_called()
 
     def test_session_read_mode(self):
         """
@@ -571,7 +573,7 @@ class SmartOpenTest(unittest.TestCase):
 
         # correct write modes, incorrect scheme
         self.assertRaises(NotImplementedError, smart_open.smart_open, "hdfs:///blah.txt", "wb+")
-        self.assertRaises(NotImplementedError, smart_open.smart_open, "http:///blah.txt", "w")
+        self.assertRaises(NotImplementedError, smart_open.smart_open, "http:///blah.txt", "wb+")
         self.assertRaises(NotImplementedError, smart_open.smart_open, "s3://bucket/key", "wb+")
 
     def test_write_utf8(self):
@@ -722,7 +724,7 @@ class WebHdfsWriteTest(unittest.TestCase):
             callback=request_callback,
         )
         responses.add(responses.PUT, "http://127.0.0.1:8440/file", status=201)
-        smart_open.smart_open("webhdfs://127.0.0.1:8440/path/file", 'wb')
+        smart_open.smart_open("webhdfs://127.0.0.1:8440/path/file", 'wb').close()
 
         assert len(responses.calls) == 2
         path, params = responses.calls[0].request.url.split("?")
@@ -742,31 +744,21 @@ class WebHdfsWriteTest(unittest.TestCase):
             "http://127.0.0.1:8440/webhdfs/v1/path/file",
             callback=request_callback,
         )
-        responses.add(responses.PUT, "http://127.0.0.1:8440/file", status=201)
-        smart_open_object = smart_open.smart_open("webhdfs://127.0.0.1:8440/path/file", 'wb')
 
         def write_callback(request):
             assert request.body == u"žluťoučký koníček".encode('utf8')
             headers = {}
-            return 200, headers, ""
+            return 201, headers, ""
+
+        responses.add_callback(responses.PUT, "http://127.0.0.1:8440/file", callback=write_callback)
+        smart_open_object = smart_open.smart_open("webhdfs://127.0.0.1:8440/path/file", 'wb')
 
         test_string = u"žluťoučký koníček".encode('utf8')
-        responses.add_callback(
-            responses.POST,
-            "http://127.0.0.1:8440/webhdfs/v1/path/file",
-            callback=request_callback,
-        )
-        responses.add_callback(
-            responses.POST,
-            "http://127.0.0.1:8440/file",
-            callback=write_callback,
-        )
         smart_open_object.write(test_string)
         smart_open_object.close()
 
-        assert len(responses.calls) == 4
-        assert responses.calls[2].request.url == "http://127.0.0.1:8440/webhdfs/v1/path/file?op=APPEND"  # noqa
-        assert responses.calls[3].request.url == "http://127.0.0.1:8440/file"
+        assert len(responses.calls) == 2
+        assert responses.calls[1].request.url == "http://127.0.0.1:8440/file"
 
 
 @mock.patch('warnings.warn', mock.Mock())
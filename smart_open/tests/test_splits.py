@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Radim Rehurek <me@radimrehurek.com>
+#
+# This code is distributed under the terms and conditions
+# from the MIT License (MIT).
+#
+import io
+import os
+import pickle
+import tempfile
+import unittest
+
+import boto3
+import moto
+
+import smart_open
+import smart_open.splits
+
+BUCKET_NAME = 'test-smartopen-splits'
+KEY_NAME = 'lines.txt'
+
+
+def _upper(line):
+    return line.upper()
+
+
+class SplitTest(unittest.TestCase):
+    def setUp(self):
+        self.lines = [('line %d %s\n' % (i, 'x' * (i % 7))).encode('utf-8') for i in range(100)]
+        self.contents = b''.join(self.lines)
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'wb') as fout:
+            fout.write(self.contents)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def read_splits(self, splits):
+        result = []
+        for s in splits:
+            with s.open() as fin:
+                result.append(list(fin))
+        return result
+
+    def test_splits_cover_object(self):
+        splits = smart_open.split(self.path, 4)
+        self.assertEqual(len(splits), 4)
+        self.assertEqual(splits[0].start, 0)
+        self.assertEqual(splits[-1].stop, len(self.contents))
+        for left, right in zip(splits, splits[1:]):
+            self.assertEqual(left.stop, right.start)
+
+    def test_splits_are_line_aligned(self):
+        for n in (1, 2, 3, 7, 16):
+            splits = smart_open.split(self.path, n, probe_size=5)
+            lines = [line for chunk in self.read_splits(splits) for line in chunk]
+            self.assertEqual(lines, self.lines)
+
+    def test_more_splits_than_lines(self):
+        splits = smart_open.split(self.path, 1000)
+        self.assertEqual(len(splits), len(self.lines))
+        self.assertEqual(self.read_splits(splits), [[line] for line in self.lines])
+
+    def test_boundary_on_nominal_position(self):
+        with open(self.path, 'wb') as fout:
+            fout.write(b'aaa\nbbb\n')
+        splits = smart_open.split(self.path, 2)
+        self.assertEqual([(s.start, s.stop) for s in splits], [(0, 4), (4, 8)])
+
+    def test_multibyte_terminator(self):
+        with open(self.path, 'wb') as fout:
+            fout.write(b'aaaa\r\nbbbb\r\ncccc\r\ndddd')
+        splits = smart_open.split(self.path, 4, line_terminator=b'\r\n', probe_size=1)
+        self.assertEqual([(s.start, s.stop) for s in splits], [(0, 6), (6, 12), (12, 18), (18, 22)])
+
+    def test_no_trailing_terminator(self):
+        with open(self.path, 'wb') as fout:
+            fout.write(b'aaa\nbbb')
+        splits = smart_open.split(self.path, 2)
+        self.assertEqual(self.read_splits(splits), [[b'aaa\n'], [b'bbb']])
+
+    def test_empty(self):
+        with open(self.path, 'wb'):
+            pass
+        self.assertEqual(smart_open.split(self.path, 4), [])
+        self.assertEqual(list(smart_open.map_lines(self.path, len, workers=2)), [])
+
+    def test_compressed_raises(self):
+        self.assertRaises(ValueError, smart_open.split, 's3://bucket/key.gz', 2)
+
+    def test_pickle(self):
+        split = smart_open.split(self.path, 2)[1]
+        self.assertEqual(pickle.loads(pickle.dumps(split)), split)
+
+    def test_bounded_reader(self):
+        split = smart_open.split(self.path, 2)[1]
+        with split.open() as fin:
+            self.assertEqual(fin.read(), self.contents[split.start:split.stop])
+            self.assertEqual(fin.read(), b'')
+            self.assertEqual(fin.seek(0), 0)
+            self.assertEqual(fin.read(5), self.contents[split.start:split.start + 5])
+            self.assertEqual(fin.tell(), 5)
+
+    def test_bounded_reader_line_terminator(self):
+        fileobj = io.BytesIO(b'xxaa\r\nbb\r\ncc\r\nyy')
+        reader = smart_open.splits.BoundedReader(fileobj, 2, 14, line_terminator=b'\r\n', buffer_size=3)
+        self.assertEqual(list(reader), [b'aa\r\n', b'bb\r\n', b'cc\r\n'])
+
+    def test_bounded_reader_readline_limit(self):
+        fileobj = io.BytesIO(b'abcdef\nghi\n')
+        reader = smart_open.splits.BoundedReader(fileobj, 0, 11, buffer_size=2)
+        self.assertEqual(reader.readline(4), b'abcd')
+        self.assertEqual(reader.readline(), b'ef\n')
+        self.assertEqual(reader.tell(), 7)
+        self.assertEqual(reader.read(), b'ghi\n')
+
+    def test_bounded_reader_unaligned_window(self):
+        fileobj = io.BytesIO(b'abc\ndef\n')
+        reader = smart_open.splits.BoundedReader(fileobj, 1, 6)
+        self.assertEqual(list(reader), [b'bc\n', b'de'])
+
+    def test_max_split_size(self):
+        splits = smart_open.split(self.path, 2, max_split_size=100)
+        self.assertGreaterEqual(len(splits), len(self.contents) // 100)
+        self.assertEqual(b''.join(b''.join(lines) for lines in self.read_splits(splits)), self.contents)
+
+
+@moto.mock_s3
+class SplitS3Test(unittest.TestCase):
+    def setUp(self):
+        s3 = boto3.resource('s3')
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        self.contents = b''.join(b'line %d\n' % i for i in range(50))
+        s3.Object(BUCKET_NAME, KEY_NAME).put(Body=self.contents)
+
+    def test_split(self):
+        uri = 's3://%s/%s' % (BUCKET_NAME, KEY_NAME)
+        splits = smart_open.split(uri, 3)
+        self.assertEqual(len(splits), 3)
+
+        actual = b''
+        for s in splits:
+            with s.open() as fin:
+                data = fin.read()
+            self.assertTrue(data.endswith(b'\n'))
+            actual += data
+        self.assertEqual(actual, self.contents)
+
+
+class MapLinesTest(unittest.TestCase):
+    def setUp(self):
+        self.lines = [('line %d\n' % i).encode('utf-8') for i in range(200)]
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'wb') as fout:
+            fout.write(b''.join(self.lines))
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_map_lines(self):
+        actual = list(smart_open.map_lines(self.path, _upper, workers=4))
+        self.assertEqual(sorted(actual), sorted(line.upper() for line in self.lines))
+
+    def test_map_lines_line_terminator(self):
+        with open(self.path, 'wb') as fout:
+            fout.write(b'aa;bb;cc;dd;')
+        actual = list(smart_open.map_lines(self.path, bytes, workers=3, line_terminator=b';'))
+        self.assertEqual(sorted(actual), [b'aa;', b'bb;', b'cc;', b'dd;'])
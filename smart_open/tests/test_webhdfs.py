@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Radim Rehurek <me@radimrehurek.com>
+#
+# This code is distributed under the terms and conditions
+# from the MIT License (MIT).
+#
+import json
+import unittest
+
+import mock
+import requests
+import responses
+from six.moves.urllib import parse as urlparse
+
+import smart_open.http
+import smart_open.webhdfs
+
+URL = 'http://namenode:50070/webhdfs/v1/path/file'
+DATANODE_URL = 'http://datanode:50075/webhdfs/v1/path/file'
+BYTES = b'line1\nline2\n'
+DATA = bytes(bytearray(range(256))) * 4096
+
+
+def redirect_callback(request):
+    return (307, {'location': DATANODE_URL}, b'')
+
+
+class ReaderTest(unittest.TestCase):
+    @responses.activate
+    def test_readline(self):
+        body = b'first line\nsecond line\n\nlast line'
+        responses.add(responses.GET, URL, body=body, stream=True)
+
+        fin = smart_open.webhdfs.BufferedInputBase(URL, buffer_size=4)
+        self.assertEqual(fin.readline(), b'first line\n')
+        self.assertEqual(fin.readline(3), b'sec')
+        self.assertEqual(fin.readline(limit=100), b'ond line\n')
+        self.assertEqual(list(fin), [b'\n', b'last line'])
+        self.assertEqual(fin.readline(), b'')
+
+    @responses.activate
+    def test_read_after_readline(self):
+        responses.add(responses.GET, URL, body=BYTES, stream=True)
+        with smart_open.webhdfs.open(URL, 'rb') as fin:
+            self.assertEqual(fin.readline(), b'line1\n')
+            self.assertEqual(fin.read(3), b'lin')
+            self.assertEqual(fin.read(), b'e2\n')
+
+
+class FakeNamenode(object):
+    """Answers OPEN (with offset and length) and GETFILESTATUS for DATA.
+
+    Each number in breaks cuts the next OPEN response short after that many bytes."""
+    def __init__(self, breaks=()):
+        self.breaks = list(breaks)
+        self.opens = []
+        responses.add_callback(responses.GET, URL, callback=self)
+
+    def __call__(self, request):
+        params = dict(urlparse.parse_qsl(urlparse.urlsplit(request.url).query))
+        if params['op'] == 'GETFILESTATUS':
+            return (200, {}, json.dumps({'FileStatus': {'length': len(DATA)}}))
+
+        offset = int(params['offset'])
+        length = int(params['length']) if 'length' in params else None
+        self.opens.append((offset, length))
+        body = DATA[offset:] if length is None else DATA[offset:offset + length]
+        headers = {'Content-Length': str(len(body))}
+        if self.breaks:
+            body = body[:self.breaks.pop(0)]
+        return (200, headers, body)
+
+
+class SeekTest(unittest.TestCase):
+    def setUp(self):
+        smart_open.http.close_sessions()
+
+    @responses.activate
+    def test_seek(self):
+        namenode = FakeNamenode()
+        with smart_open.webhdfs.open(URL, 'rb') as fin:
+            self.assertTrue(fin.seekable())
+            self.assertEqual(fin.read(10), DATA[:10])
+            self.assertEqual(fin.seek(500000), 500000)
+            self.assertEqual(fin.tell(), 500000)
+            self.assertEqual(fin.read(10), DATA[500000:500010])
+            self.assertEqual(fin.seek(-10, whence=smart_open.webhdfs.END), len(DATA) - 10)
+            self.assertEqual(fin.read(), DATA[-10:])
+            self.assertEqual(fin.read(), b'')
+
+        self.assertEqual(namenode.opens, [(0, None), (500000, 256 * 1024), (len(DATA) - 10, None)])
+
+    @responses.activate
+    def test_seek_within_buffer(self):
+        namenode = FakeNamenode()
+        with smart_open.webhdfs.BufferedInputBase(URL, buffer_size=1024) as fin:
+            self.assertEqual(fin.read(10), DATA[:10])
+            self.assertEqual(fin.seek(100, whence=smart_open.webhdfs.CURRENT), 110)
+            self.assertEqual(fin.read(10), DATA[110:120])
+        self.assertEqual(namenode.opens, [(0, None)])
+
+    @responses.activate
+    def test_read_across_ranges(self):
+        FakeNamenode()
+        with smart_open.webhdfs.open(URL, 'rb') as fin:
+            fin.seek(1000)
+            self.assertEqual(fin.read(600000), DATA[1000:601000])
+            fin.seek(5)
+            self.assertEqual(fin.readline(), DATA[5:11])
+            self.assertEqual(fin.read(), DATA[11:])
+
+    @responses.activate
+    def test_seek_past_end(self):
+        FakeNamenode()
+        with smart_open.webhdfs.open(URL, 'rb') as fin:
+            self.assertEqual(fin.seek(len(DATA) + 10), len(DATA))
+            self.assertEqual(fin.read(), b'')
+
+    @responses.activate
+    @mock.patch.object(smart_open.http, '_RESUME_SLEEP_SECONDS', 0)
+    def test_resume(self):
+        namenode = FakeNamenode(breaks=[1000, 5000])
+        with smart_open.webhdfs.open(URL, 'rb') as fin:
+            self.assertEqual(fin.read(), DATA)
+        self.assertEqual(namenode.opens, [(0, None), (1000, None), (6000, None)])
+
+    @responses.activate
+    @mock.patch.object(smart_open.http, '_RESUME_SLEEP_SECONDS', 0)
+    def test_give_up(self):
+        FakeNamenode(breaks=[1000, 0, 0])
+        with smart_open.webhdfs.open(URL, 'rb', max_resumes=2) as fin:
+            self.assertRaises(IOError, fin.read)
+
+
+class WriterTest(unittest.TestCase):
+    def setUp(self):
+        smart_open.http.close_sessions()
+        self.bodies = []
+        responses.add_callback(responses.PUT, URL, callback=redirect_callback)
+        responses.add_callback(responses.POST, URL, callback=redirect_callback)
+
+    def datanode_callback(self, status):
+        def callback(request):
+            body = request.body or b''
+            if hasattr(body, 'read'):
+                body = body.read()
+            elif not isinstance(body, bytes):
+                body = b''.join(body)
+            self.bodies.append((request.method, body))
+            return (status, {}, b'')
+        return callback
+
+    @responses.activate
+    def test_stream(self):
+        responses.add_callback(responses.PUT, DATANODE_URL, callback=self.datanode_callback(201))
+        with smart_open.webhdfs.BufferedOutputBase(URL, buffer_size=1024) as fout:
+            for i in range(0, len(DATA), 1000):
+                fout.write(DATA[i:i + 1000])
+
+        self.assertEqual(self.bodies, [('PUT', DATA)])
+        datanode_request = responses.calls[1].request
+        self.assertEqual(datanode_request.headers['Transfer-Encoding'], 'chunked')
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_stream_rejected(self):
+        responses.add(responses.PUT, DATANODE_URL, status=403, body=b'denied')
+        fout = smart_open.webhdfs.open(URL, 'wb')
+        fout.write(BYTES)
+        with self.assertRaises(smart_open.webhdfs.WebHdfsException) as context:
+            fout.close()
+        self.assertEqual(context.exception.status_code, 403)
+
+    @responses.activate
+    def test_exception_cancels_stream(self):
+        responses.add_callback(responses.PUT, DATANODE_URL, callback=self.datanode_callback(201))
+        with self.assertRaises(ValueError):
+            with smart_open.webhdfs.open(URL, 'wb') as fout:
+                fout.write(BYTES)
+                raise ValueError('oops')
+        self.assertEqual(self.bodies, [])
+
+    @responses.activate
+    def test_append_parts(self):
+        responses.add_callback(responses.PUT, DATANODE_URL, callback=self.datanode_callback(201))
+        responses.add_callback(responses.POST, DATANODE_URL, callback=self.datanode_callback(200))
+        with smart_open.webhdfs.open(URL, 'wb', chunked=False, min_part_size=5) as fout:
+            for part in (b'12345', b'6789', b'0', b'abc'):
+                fout.write(part)
+
+        self.assertEqual(
+            self.bodies,
+            [('PUT', b''), ('POST', b'12345'), ('POST', b'67890'), ('POST', b'abc')],
+        )
+        namenode_calls = [call for call in responses.calls if call.request.url.startswith(URL)]
+        self.assertEqual(len(namenode_calls), 2)
+
+
+class SessionTest(unittest.TestCase):
+    def setUp(self):
+        smart_open.http.close_sessions()
+
+    @responses.activate
+    def test_read_uses_shared_session(self):
+        responses.add(responses.GET, URL, body=BYTES, stream=True)
+        with smart_open.webhdfs.open(URL, 'rb') as fin:
+            self.assertIs(fin._session, smart_open.http.get_session(URL))
+            self.assertEqual(fin.read(), BYTES)
+
+    @responses.activate
+    def test_write_uses_user_session(self):
+        responses.add_callback(responses.PUT, URL, callback=redirect_callback)
+        responses.add(responses.PUT, DATANODE_URL, status=201)
+
+        session = requests.Session()
+        session.headers['X-Custom'] = 'yes'
+        with smart_open.webhdfs.open(URL, 'wb', session=session) as fout:
+            fout.write(BYTES)
+
+        self.assertEqual(len(responses.calls), 2)
+        for call in responses.calls:
+            self.assertEqual(call.request.headers['X-Custom'], 'yes')
+        self.assertEqual(responses.calls[-1].request.body, BYTES)
+        self.assertEqual(smart_open.http._SESSIONS, {})
+
+    @responses.activate
+    def test_write_shares_sessions_per_host(self):
+        responses.add_callback(responses.PUT, URL, callback=redirect_callback)
+        responses.add(responses.PUT, DATANODE_URL, status=201)
+        responses.add_callback(responses.POST, URL, callback=redirect_callback)
+        responses.add(responses.POST, DATANODE_URL, status=200)
+
+        for _ in range(2):
+            with smart_open.webhdfs.open(URL, 'wb') as fout:
+                fout.write(BYTES)
+
+        hosts = sorted(key[1] for key in smart_open.http._SESSIONS)
+        self.assertEqual(hosts, ['datanode:50075', 'namenode:50070'])
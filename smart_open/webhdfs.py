@@ -14,11 +14,14 @@ The main entry point is the :func:`~smart_open.webhdfs.open` function.
 
 import io
 import logging
+import time
 
-import requests
 import six
 from six.moves.urllib import parse as urlparse
 
+from smart_open import bytebuffer
+from smart_open import http as smart_open_http
+
 if six.PY2:
     import httplib
 else:
@@ -28,21 +31,52 @@ logger = logging.getLogger(__name__)
 
 WEBHDFS_MIN_PART_SIZE = 50 * 1024**2  # minimum part size for HDFS multipart uploads
 
+START = 0
+CURRENT = 1
+END = 2
+WHENCE_CHOICES = (START, CURRENT, END)
+
+_HEADERS = {'content-type': 'application/octet-stream'}
+
 
-def open(http_uri, mode, min_part_size=WEBHDFS_MIN_PART_SIZE):
+def open(http_uri, mode, min_part_size=WEBHDFS_MIN_PART_SIZE, session=None,
+         pool_size=smart_open_http.DEFAULT_POOL_SIZE, retries=smart_open_http.DEFAULT_RETRIES,
+         max_resumes=smart_open_http.DEFAULT_MAX_RESUMES, chunked=True):
     """
     Parameters
     ----------
     http_uri: str
         webhdfs url converted to http REST url
     min_part_size: int, optional
+        The size of the parts we append to the file, if chunked is False.
         For writing only.
+    session: requests.Session, optional
+        The session to send requests with, to the namenode and the datanodes.
+        If None, we use the sessions shared with the other streams talking to
+        the same hosts.
+    pool_size: int, optional
+        The maximum number of keep-alive connections each shared session keeps
+        open to its host.  Ignored if you pass your own session.
+    retries: int, optional
+        How many times the shared sessions retry failed connections, and
+        requests that failed with a transient server error.
+        Ignored if you pass your own session.
+    max_resumes: int, optional
+        If the connection breaks while reading, request the rest of the file
+        again, with exponential backoff, up to this many times in a row.
+        For reading only.
+    chunked: bool, optional
+        If True, stream the file to the datanode in a single CREATE request,
+        with chunked transfer encoding.  Otherwise, create an empty file and
+        APPEND the data in parts of min_part_size bytes, for clusters that
+        do not accept chunked uploads.  For writing only.
 
     """
+    kwargs = dict(session=session, pool_size=pool_size, retries=retries)
     if mode == 'rb':
-        return BufferedInputBase(http_uri)
+        return BufferedInputBase(http_uri, max_resumes=max_resumes, **kwargs)
     elif mode == 'wb':
-        return BufferedOutputBase(http_uri, min_part_size=min_part_size)
+        return BufferedOutputBase(http_uri, min_part_size=min_part_size, chunked=chunked, **kwargs)
     else:
         raise NotImplementedError("webhdfs support for mode %r not implemented" % mode)
 
@@ -70,15 +104,52 @@ def convert_to_http_uri(parsed_uri):
     )
 
 
+def _get_session(uri, session, pool_size, retries):
+    if session is not None:
+        return session
+    return smart_open_http.get_session(uri, pool_size=pool_size, retries=retries)
+
+
 class BufferedInputBase(io.BufferedIOBase):
-    def __init__(self, uri):
+    """Reads a file from WebHDFS.
+
+    Implements the io.BufferedIOBase interface of the standard library.
+
+    Reads the file sequentially with a single OPEN request, which we split
+    into bounded requests (with the offset and length parameters of OPEN)
+    after seeking, so that random access does not leave large responses
+    unread.  If the connection breaks, we request the rest of the file again,
+    up to max_resumes times in a row.
+    """
+
+    def __init__(self, uri, session=None, pool_size=smart_open_http.DEFAULT_POOL_SIZE,
+                 retries=smart_open_http.DEFAULT_RETRIES,
+                 buffer_size=smart_open_http.DEFAULT_BUFFER_SIZE,
+                 max_resumes=smart_open_http.DEFAULT_MAX_RESUMES):
         self._uri = uri
+        self._session = _get_session(uri, session, pool_size, retries)
+        self._buffer_size = buffer_size
+        self._buffer = bytebuffer.ByteBuffer(buffer_size)
+        self._current_pos = 0
+        self._max_resumes = max_resumes
+        self._resumes = 0
+        self._eof = False
 
-        payload = {"op": "OPEN", "offset": 0}
-        self._response = requests.get(self._uri, params=payload, stream=True)
-        if self._response.status_code != httplib.OK:
-            raise WebHdfsException.from_response(self._response)
-        self._buf = b''
+        #
+        # The size of the file, once we know it.
+        #
+        self._length = None
+
+        #
+        # The size of the next bounded range we request, or None to request
+        # everything up to the end of the file.
+        #
+        self._range_size = None
+
+        self._response = None
+        self._read_iter = None
+        self._response_bounded = False
+        self._open_response(0)
 
     #
     # Override some methods from io.IOBase.
@@ -86,6 +157,8 @@ class BufferedInputBase(io.BufferedIOBase):
     def close(self):
         """Flush and close this stream."""
         logger.debug("close: called")
+        self._release_response()
+        self._eof = True
 
     def readable(self):
         """Return True if the stream can be read from."""
@@ -95,7 +168,49 @@ class BufferedInputBase(io.BufferedIOBase):
         """If False, seek(), tell() and truncate() will raise IOError.
 
         We offer only seek support, and no truncate support."""
-        return False
+        return True
+
+    def seek(self, offset, whence=START):
+        """Seek to the specified position.
+
+        :param int offset: The offset in bytes.
+        :param int whence: Where the offset is from.
+
+        Returns the position after seeking."""
+        if whence not in WHENCE_CHOICES:
+            raise ValueError('invalid whence, expected one of %r' % (WHENCE_CHOICES,))
+
+        if whence == START:
+            new_pos = offset
+        elif whence == CURRENT:
+            new_pos = self._current_pos + offset
+        else:
+            new_pos = self._file_length() + offset
+        new_pos = max(0, min(new_pos, self._file_length()))
+
+        distance = new_pos - self._current_pos
+        if 0 <= distance <= len(self._buffer):
+            self._read_from_buffer(distance)
+            return self._current_pos
+
+        #
+        # We request the data at the new position on the next read, in small
+        # ranges at first, in case the caller seeks again soon.
+        #
+        self._current_pos = new_pos
+        self._release_response()
+        self._buffer.empty()
+        self._range_size = smart_open_http._MIN_RANGE_SIZE
+        self._eof = False
+        return self._current_pos
+
+    def tell(self):
+        """Return the current position within the file."""
+        return self._current_pos
+
+    def truncate(self, size=None):
+        """Unsupported."""
+        raise io.UnsupportedOperation
 
     #
     # io.BufferedIOBase methods.
@@ -104,22 +219,25 @@ class BufferedInputBase(io.BufferedIOBase):
         """Unsupported."""
         raise io.UnsupportedOperation
 
-    def read(self, size=None):
-        if size is None:
-            self._buf, retval = b'', self._buf + self._response.raw.read()
-            return retval
-        elif size < len(self._buf):
-            self._buf, retval = self._buf[size:], self._buf[:size]
-            return retval
-
-        try:
-            while len(self._buf) < size:
-                self._buf += self._response.raw.read(io.DEFAULT_BUFFER_SIZE)
-        except StopIteration:
-            pass
-
-        self._buf, retval = self._buf[size:], self._buf[:size]
-        return retval
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = [self._read_from_buffer(-1)]
+            while self._ensure_response():
+                try:
+                    for chunk in self._read_iter:
+                        chunks.append(chunk)
+                        self._current_pos += len(chunk)
+                        self._resumes = 0
+                except smart_open_http._BROKEN_STREAM_ERRORS as error:
+                    self._resume(error)
+                    continue
+                self._end_of_response()
+            return b''.join(chunks)
+
+        while len(self._buffer) < size:
+            if not self._fill_buffer():
+                break
+        return self._read_from_buffer(size)
 
     def read1(self, size=-1):
         """This is the same as read()."""
@@ -134,37 +252,204 @@ class BufferedInputBase(io.BufferedIOBase):
         b[:len(data)] = data
         return len(data)
 
-    def readline(self):
-        self._buf, retval = b'', self._buf + self._response.raw.readline()
-        return retval
+    def readline(self, limit=-1):
+        """Read up to and including the next newline, but at most limit bytes
+        if limit is not negative.  Returns the bytes read."""
+        if limit is None:
+            limit = -1
+
+        #
+        # A single line may span multiple buffers.
+        #
+        line = io.BytesIO()
+        while limit < 0 or line.tell() < limit:
+            index = self._buffer.find(b'\n')
+            size = len(self._buffer) if index == -1 else index + 1
+            if limit >= 0:
+                size = min(size, limit - line.tell())
+            line.write(self._read_from_buffer(size))
+
+            if index != -1 or not self._fill_buffer():
+                break
+
+        return line.getvalue()
+
+    def _read_from_buffer(self, size):
+        part = self._buffer.read(size)
+        self._current_pos += len(part)
+        return part
+
+    def _fill_buffer(self):
+        """Read more data into the buffer.  Returns False at the end of the file."""
+        while self._ensure_response():
+            try:
+                filled = self._buffer.fill(self._read_iter)
+            except smart_open_http._BROKEN_STREAM_ERRORS as error:
+                self._resume(error)
+                continue
+            if filled:
+                self._resumes = 0
+                return True
+            self._end_of_response()
+        return False
+
+    def _ensure_response(self):
+        """Make sure there is a response to read from.
+
+        Returns False at the end of the file."""
+        if self._response is not None:
+            return True
+        elif self._eof:
+            return False
+        position = self._current_pos + len(self._buffer)
+        if position >= self._file_length():
+            self._eof = True
+            return False
+        self._open_response(position)
+        return True
+
+    def _open_response(self, position):
+        """Request the data of the file from position onwards."""
+        payload = {"op": "OPEN", "offset": position}
+        self._response_bounded = False
+        if self._range_size is not None:
+            if self._length is None or position + self._range_size < self._length:
+                payload["length"] = self._range_size
+                self._response_bounded = True
+            self._range_size = min(2 * self._range_size, smart_open_http._MAX_RANGE_SIZE)
+
+        response = self._session.get(self._uri, params=payload, stream=True)
+        if response.status_code != httplib.OK:
+            raise WebHdfsException.from_response(response)
+
+        if (
+            self._length is None
+            and not self._response_bounded
+            and smart_open_http._content_encoding(response) is None
+            and 'Content-Length' in response.headers
+        ):
+            self._length = position + int(response.headers['Content-Length'])
+
+        self._response = response
+        self._read_iter = response.iter_content(self._buffer_size)
+
+    def _end_of_response(self):
+        """Handle the current response running out of data."""
+        position = self._current_pos + len(self._buffer)
+        if self._response_bounded or self._length is None:
+            self._eof = not self._response_bounded
+            self._release_response()
+        elif position < self._length:
+            self._resume(IOError(
+                '%r ended after %d of %d bytes' % (self._uri, position, self._length)
+            ))
+        else:
+            self._eof = True
+            self._release_response()
+
+    def _resume(self, error):
+        """Request the rest of the data after the connection broke.
+
+        Raises error if we have already tried too often."""
+        self._release_response()
+        while True:
+            if self._resumes >= self._max_resumes:
+                raise error
+
+            sleep_seconds = smart_open_http._RESUME_SLEEP_SECONDS * 2 ** self._resumes
+            self._resumes += 1
+            position = self._current_pos + len(self._buffer)
+            logger.warning(
+                'reading %r broke off at byte %d (%s), resuming in %d seconds',
+                self._uri, position, error, sleep_seconds,
+            )
+            time.sleep(sleep_seconds)
+
+            try:
+                self._open_response(position)
+            except smart_open_http._BROKEN_STREAM_ERRORS as e:
+                error = e
+            else:
+                return
+
+    def _release_response(self):
+        smart_open_http._release_response(self._response)
+        self._response = None
+        self._read_iter = None
+
+    def _file_length(self):
+        """Return the size of the file, asking the namenode if we do not know it yet."""
+        if self._length is None:
+            response = self._session.get(self._uri, params={"op": "GETFILESTATUS"})
+            if response.status_code != httplib.OK:
+                raise WebHdfsException.from_response(response)
+            self._length = response.json()["FileStatus"]["length"]
+        return self._length
 
 
 class BufferedOutputBase(io.BufferedIOBase):
-    def __init__(self, uri, min_part_size=WEBHDFS_MIN_PART_SIZE):
+    """Writes a file to WebHDFS.
+
+    Implements the io.BufferedIOBase interface of the standard library.
+
+    By default, we stream the entire file to the datanode in the body of a
+    single CREATE request, with chunked transfer encoding, from a bounded
+    buffer (see :class:`smart_open.http.BufferedOutputBase`).  The namenode
+    is only involved once, to redirect us to the datanode.
+
+    If chunked is False, we create an empty file instead, and APPEND parts
+    of min_part_size bytes to it, for clusters that do not accept chunked
+    uploads.  We ask the namenode for the datanode to append to once, and
+    send all the parts there.
+    """
+
+    def __init__(self, uri, min_part_size=WEBHDFS_MIN_PART_SIZE, session=None,
+                 pool_size=smart_open_http.DEFAULT_POOL_SIZE,
+                 retries=smart_open_http.DEFAULT_RETRIES, chunked=True,
+                 buffer_size=smart_open_http.DEFAULT_BUFFER_SIZE):
         """
         Parameters
         ----------
         min_part_size: int, optional
-            For writing only.
+            The size of the parts we append, if chunked is False.
+        session: requests.Session, optional
+            The session to send requests with.
+        pool_size: int, optional
+            The size of the connection pools of the shared sessions.
+        retries: int, optional
+            How many times the shared sessions retry failed requests.
+        chunked: bool, optional
+            If True, stream the file in a single request.  Otherwise, upload
+            it in parts.
+        buffer_size: int, optional
+            The size of the chunks we stream, if chunked is True.
 
         """
         self._uri = uri
+        self._user_session = session
+        self._pool_size = pool_size
+        self._retries = retries
         self._closed = False
         self.min_part_size = min_part_size
-        # creating empty file first
-        payload = {"op": "CREATE", "overwrite": True}
-        init_response = requests.put(self._uri, params=payload, allow_redirects=False)
-        if not init_response.status_code == httplib.TEMPORARY_REDIRECT:
-            raise WebHdfsException.from_response(init_response)
-        uri = init_response.headers['location']
-        response = requests.put(uri, data="", headers={'content-type': 'application/octet-stream'})
-        if not response.status_code == httplib.CREATED:
-            raise WebHdfsException.from_response(response)
-        self.lines = []
         self.parts = 0
-        self.chunk_bytes = 0
         self.total_size = 0
 
+        location = self._redirect('PUT', {"op": "CREATE", "overwrite": True})
+        if chunked:
+            self._stream = _DatanodeWriter(
+                location, headers=_HEADERS.copy(), buffer_size=buffer_size,
+                session=session, pool_size=pool_size,
+            )
+        else:
+            self._stream = None
+            # creating empty file first
+            response = self._session(location).put(location, data=b"", headers=_HEADERS)
+            if not response.status_code == httplib.CREATED:
+                raise WebHdfsException.from_response(response)
+
+        self._part = io.BytesIO()
+        self._append_location = None
+
         #
         # This member is part of the io.BufferedIOBase interface.
         #
@@ -183,16 +468,42 @@ class BufferedOutputBase(io.BufferedIOBase):
     def detach(self):
         raise io.UnsupportedOperation("detach() not supported")
 
-    def _upload(self, data):
-        payload = {"op": "APPEND"}
-        init_response = requests.post(self._uri, params=payload, allow_redirects=False)
-        if not init_response.status_code == httplib.TEMPORARY_REDIRECT:
-            raise WebHdfsException.from_response(init_response)
-        uri = init_response.headers['location']
-        response = requests.post(uri, data=data,
-                                 headers={'content-type': 'application/octet-stream'})
+    def _session(self, uri):
+        #
+        # The namenode redirects us to the datanodes, so we may end up
+        # talking to several hosts, each with its own shared session.
+        #
+        return _get_session(uri, self._user_session, self._pool_size, self._retries)
+
+    def _redirect(self, method, payload):
+        """Ask the namenode which datanode to send the data to."""
+        response = self._session(self._uri).request(
+            method, self._uri, params=payload, allow_redirects=False,
+        )
+        if not response.status_code == httplib.TEMPORARY_REDIRECT:
+            raise WebHdfsException.from_response(response)
+        return response.headers['location']
+
+    def _upload_part(self):
+        logger.info(
+            "uploading part #%i, %i bytes (total %.3fGB)",
+            self.parts, self._part.tell(), self.total_size / 1024.0 ** 3
+        )
+        if self._append_location is None:
+            self._append_location = self._redirect('POST', {"op": "APPEND"})
+
+        #
+        # requests sends the part straight from the buffer.
+        #
+        self._part.seek(0)
+        response = self._session(self._append_location).post(
+            self._append_location, data=self._part, headers=_HEADERS,
+        )
         if not response.status_code == httplib.OK:
             raise WebHdfsException.from_response(response)
+        logger.debug("upload of part #%i finished", self.parts)
+        self.parts += 1
+        self._part = io.BytesIO()
 
     def write(self, b):
         """
@@ -205,36 +516,56 @@ class BufferedOutputBase(io.BufferedIOBase):
         if not isinstance(b, six.binary_type):
             raise TypeError("input must be a binary string")
 
-        self.lines.append(b)
-        self.chunk_bytes += len(b)
         self.total_size += len(b)
-
-        if self.chunk_bytes >= self.min_part_size:
-            buff = b"".join(self.lines)
-            logger.info(
-                "uploading part #%i, %i bytes (total %.3fGB)",
-                self.parts, len(buff), self.total_size / 1024.0 ** 3
-            )
-            self._upload(buff)
-            logger.debug("upload of part #%i finished", self.parts)
-            self.parts += 1
-            self.lines, self.chunk_bytes = [], 0
+        if self._stream is not None:
+            self._stream.write(b)
+        else:
+            self._part.write(b)
+            if self._part.tell() >= self.min_part_size:
+                self._upload_part()
+        return len(b)
 
     def close(self):
-        buff = b"".join(self.lines)
-        if buff:
-            logger.info(
-                "uploading last part #%i, %i bytes (total %.3fGB)",
-                self.parts, len(buff), self.total_size / 1024.0 ** 3
-            )
-            self._upload(buff)
-            logger.debug("upload of last part #%i finished", self.parts)
+        if self._closed:
+            return
         self._closed = True
+        if self._stream is not None:
+            self._stream.close()
+        elif self._part.tell():
+            self._upload_part()
+
+    def terminate(self):
+        """Cancel the upload.  A streamed file ends up incomplete, or missing."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._stream is not None:
+            self._stream.terminate()
+        self._part = io.BytesIO()
 
     @property
     def closed(self):
         return self._closed
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.terminate()
+        else:
+            self.close()
+
+
+class _DatanodeWriter(smart_open_http.BufferedOutputBase):
+    """Streams the body of a CREATE request to a datanode."""
+
+    def _check_response(self):
+        if self._error is not None:
+            raise self._error
+        if self._response.status_code != httplib.CREATED:
+            raise WebHdfsException.from_response(self._response)
+
 
 class WebHdfsException(Exception):
     def __init__(self, msg="", status_code=None):